@@ -14,6 +14,7 @@ from mcp.client.stdio import stdio_client
 import boto3
 
 from config import Config
+from logging_config import LazyJson
 from models import Message, Tool, Conversation
 
 
@@ -64,7 +65,7 @@ class MCPClient:
                 input_schema=tool.inputSchema
             ) for tool in response.tools
         ]
-        self.logger.info(f"Available tools: {[tool.name for tool in self.available_tools]}")
+        self.logger.info("Available tools: %s", [tool.name for tool in self.available_tools])
 
     async def shutdown(self):
         self.logger.info("Closing connection and cleaning up resources")
@@ -99,7 +100,7 @@ class MCPClient:
                 self.logger.info("Keyboard interrupt detected")
                 break
             except Exception as e:
-                self.logger.exception(f"Error processing query: {str(e)}")
+                self.logger.exception("Error processing query: %s", e)
                 print(f"\nError: {str(e)}")
 
     async def _get_welcome_message(self) -> str:
@@ -116,7 +117,7 @@ class MCPClient:
                 welcome_text = self._extract_text(assistant_message['content'])
                 return welcome_text
         except Exception as e:
-            self.logger.warning(f"Failed to generate welcome message: {str(e)}")
+            self.logger.warning("Failed to generate welcome message: %s", e)
             # Fall back to a default greeting if model call fails
             return "Welcome! I'm your customer service representative from the power corporation. How may I assist you today with your power outage or billing inquiries?"
     
@@ -124,7 +125,7 @@ class MCPClient:
         # Use the existing conversation context instead of creating a new one
         self.conversation.add_user(query)
         bedrock_tools = Message.to_bedrock_format(self.available_tools)
-        self.logger.debug(f"Sending query to model with conversation context: {len(self.conversation.messages)} messages")
+        self.logger.debug("Sending query to model with conversation context: %d messages", len(self.conversation.messages))
         response = await self._call_bedrock_model(self.conversation.to_list(), bedrock_tools)
 
         if response.get('stopReason') == 'tool_use':
@@ -142,7 +143,7 @@ class MCPClient:
         self.logger.info("Model requested tool use")
 
         tool_uses = [item['toolUse'] for item in initial_response['output']['message']['content'] if 'toolUse' in item]
-        self.logger.info(f"Number of tools requested: {len(tool_uses)}")
+        self.logger.info("Number of tools requested: %d", len(tool_uses))
 
         # Add tool use to conversation context
         self.conversation.add_tool_use(tool_uses)
@@ -152,7 +153,7 @@ class MCPClient:
         # Add tool results to conversation context
         self.conversation.add_tool_results(tool_results)
 
-        self.logger.debug(f"Sending tool results to model: {json.dumps(tool_results)}")
+        self.logger.debug("Sending tool results to model: %s", LazyJson(tool_results))
         final_response = await self._call_bedrock_model(self.conversation.to_list(), bedrock_tools)
 
         if final_response.get('stopReason') == 'tool_use':
@@ -173,6 +174,8 @@ class MCPClient:
                 for item in result['toolResult']['content']:
                     if 'text' in item:
                         combined_results += item['text'] + "\n\n"
+                    elif 'json' in item:
+                        combined_results += json.dumps(item['json']) + "\n\n"
         return combined_results.strip() if combined_results else "No response generated after tool use."
 
     async def _execute_tools(self, tool_uses: List[Dict]) -> List[Dict]:
@@ -186,7 +189,7 @@ class MCPClient:
             tool = next((t for t in self.available_tools if t.name == tool_name), None)
             if not tool:
                 error_msg = f"Tool '{tool_name}' is not available."
-                self.logger.warning(error_msg)
+                self.logger.warning("Tool '%s' is not available", tool_name)
                 tool_results.append({
                     "toolResult": {
                         "toolUseId": tool_use_id,
@@ -197,7 +200,7 @@ class MCPClient:
 
             validation_error = self._validate_tool_input(tool.input_schema, tool_args)
             if validation_error:
-                self.logger.warning(f"Invalid input for tool '{tool_name}': {validation_error}")
+                self.logger.warning("Invalid input for tool '%s': %s", tool_name, validation_error)
                 tool_results.append({
                     "toolResult": {
                         "toolUseId": tool_use_id,
@@ -207,17 +210,17 @@ class MCPClient:
                 continue
 
             try:
-                self.logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
+                self.logger.info("Calling tool: %s", tool_name, extra={"tool": tool_name})
+                self.logger.debug("Arguments for %s: %s", tool_name, LazyJson(tool_args))
                 result = await self.session.call_tool(tool_name, tool_args)
-                result_text = self._extract_text_from_tool_result(result)
                 tool_results.append({
                     "toolResult": {
                         "toolUseId": tool_use_id,
-                        "content": [{"text": result_text}]
+                        "content": [self._tool_result_content(result)]
                     }
                 })
             except Exception as e:
-                self.logger.warning(f"Tool '{tool_name}' failed: {str(e)}", exc_info=True)
+                self.logger.warning("Tool '%s' failed: %s", tool_name, e, exc_info=True)
                 tool_results.append({
                     "toolResult": {
                         "toolUseId": tool_use_id,
@@ -238,6 +241,13 @@ class MCPClient:
         except ValidationError as e:
             return str(e)
 
+    def _tool_result_content(self, result) -> Dict[str, Any]:
+        """Prefer the tool's structured output, which is far smaller than its prose."""
+        structured = getattr(result, "structuredContent", None)
+        if self.config.use_structured_tool_output and structured is not None and not result.isError:
+            return {"json": structured}
+        return {"text": self._extract_text_from_tool_result(result)}
+
     def _extract_text_from_tool_result(self, result) -> str:
         result_text = ""
         for content_item in result.content:
@@ -28,6 +28,17 @@ class Config:
     temperature: float = float(os.environ.get("TEMPERATURE", "0"))
     # top_p: float = float(os.environ.get("TOP_P", "1.0"))
     
+    # Send structured tool output to the model instead of the prose text when available
+    use_structured_tool_output: bool = os.environ.get("USE_STRUCTURED_TOOL_OUTPUT", "true").lower() == "true"
+    
+    # Logging configuration
+    log_level: str = os.environ.get("LOG_LEVEL", "INFO")
+    log_format: str = os.environ.get("LOG_FORMAT", "text")  # text or json
+    # Keep one in this many INFO records per message
+    log_sample_rate: int = int(os.environ.get("LOG_SAMPLE_RATE", "1"))
+    # Records buffered for the writer thread before new ones are dropped
+    log_queue_size: int = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    
     # System prompt for the model
     system_prompt: str = "You are a call center voice assistant, working for a power corporartion in India to assist its customers regarding queries related to power outage and billing details." \
     "                     DO NOT answers any another questions."
\ No newline at end of file
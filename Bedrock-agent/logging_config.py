@@ -0,0 +1,151 @@
+"""
+Non-blocking logging for the MCP client application.
+
+Records go through a bounded queue to a background writer thread, so
+logging never waits on I/O. A record's arguments are merged into its
+message, and its traceback rendered, when it is logged; the writer thread
+only lays out the line and writes it. Log with %-style arguments rather
+than f-strings so records below the level are never formatted.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Tuple
+
+from config import Config
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+# Distinct message templates tracked for sampling before the counts restart
+_MAX_SAMPLED_TEMPLATES = 4096
+
+# Renders tracebacks when records are queued; the writer's formatters lay out the line
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class LazyJson:
+    """Log argument rendered as JSON only if the record passes the level and sampling filters.
+
+    The rendering then happens at the call site, with the rest of the message,
+    not in the writer thread.
+    """
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, default=str, ensure_ascii=False)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep the first and then one in every ``rate`` INFO records of each message template."""
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counts: Dict[Tuple[str, Any], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno != logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= _MAX_SAMPLED_TEMPLATES:
+                self._counts.clear()
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue records for the writer thread, dropping them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # As QueueHandler does, render the message and traceback now, so the queued copy
+        # holds no references to the caller's objects; the writer formats the line
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriter(QueueListener):
+    """Queue listener whose stop gives up on a stuck stream instead of hanging."""
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def configure_logging(config: Config) -> LogWriter:
+    """Route all logging through a bounded queue and a writer thread on stderr."""
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if config.log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=config.log_queue_size))
+    if config.log_sample_rate > 1:
+        handler.addFilter(SamplingFilter(config.log_sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, config.log_level.upper(), logging.INFO))
+
+    writer = LogWriter(handler.queue, output, respect_handler_level=True)
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
@@ -11,35 +11,28 @@ import logging
 
 from client import MCPClient
 from config import Config
-
-
-def setup_logging():
-    """Configure application logging."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    )
+from logging_config import configure_logging
 
 
 async def main():
     """Main entry point for the MCP client application."""
-    setup_logging()
-    logger = logging.getLogger("mcp_client")
-    
     # Load configuration
     config = Config()
     
+    configure_logging(config)
+    logger = logging.getLogger("mcp_client")
+    
     logger.info("Starting MCP Client")
     client = MCPClient(config)
     
     try:
-        logger.info(f"Connecting to MCP server at: {config.server_script_path}")
+        logger.info("Connecting to MCP server at: %s", config.server_script_path)
         await client.connect()
         logger.info("Connection established")
         
         await client.run_interactive_chat()
     except Exception as e:
-        logger.exception(f"Error in main application: {str(e)}")
+        logger.exception("Error in main application: %s", e)
     finally:
         logger.info("Shutting down client")
         await client.shutdown()
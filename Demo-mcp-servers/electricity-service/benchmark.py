@@ -0,0 +1,368 @@
+"""Load-generation benchmark for the electricity service MCP server.
+
+Spawns the server over stdio once per client session, drives a configurable
+mix of tool calls from N concurrent sessions and reports throughput, latency
+percentiles and the server processes' CPU time and peak RSS.
+
+Tool calls are sent without the MCP client's validation of structured
+results against the tools' output schemas, which costs far more than the
+server's handling of a lookup, so the latencies reflect the server. Server
+CPU time covers the load window only, read from each server's
+``process_cpu_seconds_total`` metric when the load starts and ends.
+
+    python benchmark.py --sessions 8 --duration 20 --output run.json
+    python benchmark.py --sessions 8 --duration 20 --compare run.json
+
+With --startup-runs it instead measures cold starts: the time from spawning
+the server to its answer to initialize, and to the answer to a first tool
+call, failing if the median first call exceeds --startup-budget-ms.
+
+    python benchmark.py --startup-runs 20 --startup-budget-ms 1500
+"""
+
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+import click
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+
+from electricity_service.data.billing_data import BILLING_DATABASE
+from electricity_service.data.outage_data import OUTAGE_DATABASE
+from electricity_service.server.server import METRICS_URI
+
+# Lookups that are well-formed but unknown to the server
+MISSING_AREAS = ["Atlantis", "Sector 99", "Noida Extension"]
+MISSING_METERS = ["UP0000000000", "UP9999999999"]
+
+# Lookups the server must reject
+INVALID_ARGUMENTS = {
+    "check_outage": [{"area": ""}, {}],
+    "check_billing_status": [{"meter_number": "12345"}, {"meter_number": "XX7284651023"}, {}],
+}
+
+# Metrics where a larger value is a regression, with the threshold applied to them
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "cpu_seconds_per_1k")
+
+# The server is started from the project directory, wherever the benchmark is run from
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass
+class BenchmarkResult:
+    """Summary of a benchmark run."""
+
+    sessions: int
+    duration_seconds: float
+    requests: int
+    errors: int
+    requests_per_second: float
+    p50_ms: float
+    p99_ms: float
+    server_cpu_seconds: float
+    cpu_seconds_per_1k: float
+    server_max_rss_mb: float
+    by_tool: Dict[str, int] = field(default_factory=dict)
+    errors_by_tool: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class StartupResult:
+    """Summary of cold-start measurements."""
+
+    runs: int
+    initialize_p50_ms: float
+    initialize_max_ms: float
+    first_call_p50_ms: float
+    first_call_max_ms: float
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Get a percentile of a list of samples by nearest rank.
+
+    Args:
+        samples: The samples, in any order.
+        pct: Percentile between 0 and 100.
+
+    Returns:
+        The percentile value, or 0.0 if there are no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse a tool mix such as ``check_outage=0.7,check_billing_status=0.3``.
+
+    Args:
+        mix: Comma-separated tool=weight pairs.
+
+    Returns:
+        A dictionary of tool name to weight.
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - set(INVALID_ARGUMENTS)
+    if unknown:
+        raise click.BadParameter(f"Unknown tools in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def make_call(rng: random.Random, mix: Dict[str, float], miss_rate: float,
+              invalid_rate: float) -> Tuple[str, Dict[str, Any]]:
+    """Pick the next tool call according to the configured mix.
+
+    Returns:
+        Tuple of (tool name, arguments).
+    """
+    name = rng.choices(list(mix), weights=list(mix.values()))[0]
+    roll = rng.random()
+    if roll < invalid_rate:
+        return name, rng.choice(INVALID_ARGUMENTS[name])
+    missing = roll < invalid_rate + miss_rate
+    if name == "check_outage":
+        areas = MISSING_AREAS if missing else [o["area"] for o in OUTAGE_DATABASE.values()]
+        return name, {"area": rng.choice(areas)}
+    meters = MISSING_METERS if missing else list(BILLING_DATABASE)
+    return name, {"meter_number": rng.choice(meters)}
+
+
+class LoadState:
+    """State shared by the client sessions of one run."""
+
+    def __init__(self, sessions: int, duration: float):
+        self.sessions = sessions
+        self.duration = duration
+        self.ready = 0
+        self.go = anyio.Event()
+        self.started_at = 0.0
+        self.deadline = 0.0
+        self.latencies: List[float] = []
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.cpu_seconds = 0.0
+
+    def session_ready(self) -> None:
+        """Start the clock once every session has initialized."""
+        self.ready += 1
+        if self.ready == self.sessions:
+            self.started_at = time.monotonic()
+            self.deadline = self.started_at + self.duration
+            self.go.set()
+
+
+async def call_tool(session: ClientSession, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+    """Call a tool without validating its structured result against the output schema.
+
+    ClientSession.call_tool validates every result with jsonschema, which
+    takes several times longer than the server's handling of the call.
+    """
+    return await session.send_request(
+        types.ClientRequest(
+            types.CallToolRequest(params=types.CallToolRequestParams(name=name, arguments=arguments))
+        ),
+        types.CallToolResult,
+    )
+
+
+async def read_server_cpu(session: ClientSession) -> float:
+    """Read the server process's CPU time from its metrics resource."""
+    result = await session.read_resource(METRICS_URI)
+    for line in result.contents[0].text.splitlines():
+        if line.startswith("process_cpu_seconds_total "):
+            return float(line.split()[1])
+    raise RuntimeError("The server does not report process_cpu_seconds_total")
+
+
+def server_parameters(server_args: List[str]) -> StdioServerParameters:
+    """Parameters to spawn a server process with the given extra arguments."""
+    return StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(PROJECT_DIR, "main.py"), "--log-level", "WARNING", *server_args],
+        cwd=PROJECT_DIR,
+    )
+
+
+async def run_session(server: StdioServerParameters, state: LoadState, rng: random.Random,
+                      mix: Dict[str, float], miss_rate: float, invalid_rate: float) -> None:
+    """Drive one client session until the deadline."""
+    async with stdio_client(server) as (read, write), ClientSession(read, write) as session:
+        await session.initialize()
+        await session.list_tools()
+        state.session_ready()
+        await state.go.wait()
+        cpu_start = await read_server_cpu(session)
+
+        while time.monotonic() < state.deadline:
+            name, arguments = make_call(rng, mix, miss_rate, invalid_rate)
+            start = time.perf_counter()
+            try:
+                result = await call_tool(session, name, arguments)
+            except Exception:
+                result = None
+            if result is None or result.isError:
+                state.errors[name] = state.errors.get(name, 0) + 1
+                continue
+            state.latencies.append(time.perf_counter() - start)
+            state.counts[name] = state.counts.get(name, 0) + 1
+
+        state.cpu_seconds += await read_server_cpu(session) - cpu_start
+
+
+async def run_benchmark(sessions: int, duration: float, mix: Dict[str, float], miss_rate: float,
+                        invalid_rate: float, seed: int, server_args: List[str]) -> BenchmarkResult:
+    """Run the benchmark and summarize it.
+
+    Requests and latencies count successful calls; calls that raised or
+    returned an error result are counted per tool in ``errors_by_tool``.
+    Server CPU time covers the load window of every server process; peak
+    RSS is taken from the reaped server processes.
+    """
+    server = server_parameters(server_args)
+    state = LoadState(sessions, duration)
+
+    async with anyio.create_task_group() as tg:
+        for i in range(sessions):
+            tg.start_soon(run_session, server, state, random.Random(seed + i), mix, miss_rate, invalid_rate)
+    elapsed = max(time.monotonic(), state.deadline) - state.started_at if state.started_at else 0.0
+
+    # Server processes have exited and been reaped by now, so their peak RSS is accounted;
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    latencies = state.latencies
+    cpu = state.cpu_seconds
+    return BenchmarkResult(
+        sessions=sessions,
+        duration_seconds=round(elapsed, 3),
+        requests=len(latencies),
+        errors=sum(state.errors.values()),
+        requests_per_second=round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000, 3),
+        server_cpu_seconds=round(cpu, 3),
+        cpu_seconds_per_1k=round(cpu / len(latencies) * 1000, 4) if latencies else 0.0,
+        server_max_rss_mb=round(rss_mb, 1),
+        by_tool=state.counts,
+        errors_by_tool=state.errors,
+    )
+
+
+async def run_startup(runs: int, server_args: List[str]) -> StartupResult:
+    """Spawn the server repeatedly and time its first responses.
+
+    Each run spawns a fresh server process, as a new stdio client does, and
+    times initialize and then a first check_billing_status call, which
+    includes any data loading left until first use.
+    """
+    server = server_parameters(server_args)
+    meter = next(iter(BILLING_DATABASE))
+    initialize: List[float] = []
+    first_call: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        async with stdio_client(server) as (read, write), ClientSession(read, write) as session:
+            await session.initialize()
+            initialize.append(time.perf_counter() - start)
+            await session.call_tool("check_billing_status", {"meter_number": meter})
+            first_call.append(time.perf_counter() - start)
+    return StartupResult(
+        runs=runs,
+        initialize_p50_ms=round(percentile(initialize, 50) * 1000, 1),
+        initialize_max_ms=round(max(initialize) * 1000, 1),
+        first_call_p50_ms=round(percentile(first_call, 50) * 1000, 1),
+        first_call_max_ms=round(max(first_call) * 1000, 1),
+    )
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    max_regression: float) -> List[str]:
+    """Compare a run against a baseline.
+
+    Args:
+        current: The current run's results.
+        baseline: The baseline run's results.
+        max_regression: Allowed relative regression (0.1 for 10%).
+
+    Returns:
+        A list of regression descriptions; empty if within budget.
+    """
+    regressions = []
+    if current["requests_per_second"] < baseline["requests_per_second"] * (1 - max_regression):
+        regressions.append(
+            f"requests_per_second {baseline['requests_per_second']} -> {current['requests_per_second']}"
+        )
+    for metric in LOWER_IS_BETTER:
+        if baseline[metric] and current[metric] > baseline[metric] * (1 + max_regression):
+            regressions.append(f"{metric} {baseline[metric]} -> {current[metric]}")
+    return regressions
+
+
+@click.command()
+@click.option("--sessions", default=4, help="Number of concurrent client sessions")
+@click.option("--duration", default=10.0, help="Seconds to drive load for")
+@click.option("--mix", default="check_outage=0.5,check_billing_status=0.5", help="Tool mix as tool=weight pairs")
+@click.option("--miss-rate", default=0.1, help="Fraction of calls for unknown areas or meters")
+@click.option("--invalid-rate", default=0.05, help="Fraction of calls with invalid arguments")
+@click.option("--seed", default=0, help="Random seed for the call sequence")
+@click.option("--server-arg", "server_args", multiple=True, help="Extra argument passed to main.py (repeatable)")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write results as JSON")
+@click.option("--compare", type=click.Path(exists=True, dir_okay=False), default=None, help="Baseline JSON to compare against")
+@click.option("--max-regression", default=0.1, help="Allowed relative regression when comparing")
+@click.option("--startup-runs", default=0, help="Measure this many cold starts instead of driving load")
+@click.option("--startup-budget-ms", type=float, default=None, help="Fail if the median cold start to first call exceeds this")
+def bench(sessions: int, duration: float, mix: str, miss_rate: float, invalid_rate: float,
+          seed: int, server_args: Tuple[str, ...], output: Optional[str], compare: Optional[str],
+          max_regression: float, startup_runs: int, startup_budget_ms: Optional[float]):
+    """Benchmark the electricity service server."""
+    if startup_runs:
+        startup = asdict(anyio.run(run_startup, startup_runs, list(server_args)))
+        click.echo(json.dumps(startup, indent=2))
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                json.dump(startup, f, indent=2)
+        if startup_budget_ms is not None:
+            if startup["first_call_p50_ms"] > startup_budget_ms:
+                click.echo(f"Cold start {startup['first_call_p50_ms']} ms exceeds budget of {startup_budget_ms} ms", err=True)
+                sys.exit(1)
+            click.echo(f"Cold start within budget of {startup_budget_ms} ms", err=True)
+        return
+
+    result = anyio.run(
+        run_benchmark, sessions, duration, parse_mix(mix), miss_rate, invalid_rate, seed, list(server_args)
+    )
+    summary = asdict(result)
+    click.echo(json.dumps(summary, indent=2))
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    if compare:
+        with open(compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(summary, baseline, max_regression)
+        if regressions:
+            click.echo("Regressions beyond {:.0%}:".format(max_regression), err=True)
+            for regression in regressions:
+                click.echo(f"- {regression}", err=True)
+            sys.exit(1)
+        click.echo("No regressions beyond {:.0%}".format(max_regression), err=True)
+
+
+if __name__ == "__main__":
+    bench()
@@ -1,12 +1,18 @@
 """Data and utilities for billing information."""
 
 import re
-from typing import Dict, Optional, Pattern
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
 
-# Valid meter number pattern
-METER_PATTERN: Pattern = re.compile(r"^UP\d{10}$", re.IGNORECASE)
+import numpy as np
 
-# More realistic billing database with Indian-style meter numbers
+# Valid meter number pattern: a two-letter utility prefix followed by 10 digits
+METER_PATTERN: Pattern = re.compile(r"^[A-Z]{2}\d{10}$", re.IGNORECASE)
+
+# More realistic billing database with Indian-style meter numbers; "service_area"
+# is the outage area key of the feeder serving the meter
 BILLING_DATABASE: Dict[str, Dict[str, str]] = {
     "UP7284651023": {
         "customer_name": "Rajesh Sharma",
@@ -15,7 +21,8 @@ BILLING_DATABASE: Dict[str, Dict[str, str]] = {
         "status": "Pending",
         "last_reading": "8723",
         "consumption": "342 units",
-        "connection_type": "Domestic"
+        "connection_type": "Domestic",
+        "service_area": "sector-18"
     },
     "UP7291382456": {
         "customer_name": "Priya Patel",
@@ -24,7 +31,8 @@ BILLING_DATABASE: Dict[str, Dict[str, str]] = {
         "status": "Paid",
         "last_reading": "6218",
         "consumption": "187 units",
-        "connection_type": "Domestic"
+        "connection_type": "Domestic",
+        "service_area": "rajendra-nagar"
     },
     "UP7265893147": {
         "customer_name": "Sunil Verma",
@@ -33,7 +41,8 @@ BILLING_DATABASE: Dict[str, Dict[str, str]] = {
         "status": "Pending",
         "last_reading": "12983",
         "consumption": "256 units",
-        "connection_type": "Domestic"
+        "connection_type": "Domestic",
+        "service_area": "vasundhara"
     },
     "UP7234129876": {
         "customer_name": "Kavita Gupta",
@@ -42,7 +51,8 @@ BILLING_DATABASE: Dict[str, Dict[str, str]] = {
         "status": "Overdue",
         "last_reading": "45621",
         "consumption": "528 units",
-        "connection_type": "Domestic"  
+        "connection_type": "Domestic",
+        "service_area": "indirapuram"
     },
     "UP7287654238": {
         "customer_name": "Axis Bank (Branch 142)",
@@ -51,11 +61,371 @@ BILLING_DATABASE: Dict[str, Dict[str, str]] = {
         "status": "Pending",
         "last_reading": "82641",
         "consumption": "1245 units",
-        "connection_type": "Commercial"
+        "connection_type": "Commercial",
+        "service_area": "sector-18"
     }
 }
 
 
+# Bill statuses in code order; the store keeps the code, not the string
+STATUS_NAMES: Tuple[str, ...] = ("Pending", "Paid", "Overdue")
+STATUS_PENDING, STATUS_PAID, STATUS_OVERDUE = range(len(STATUS_NAMES))
+
+
+def parse_amount(amount: str) -> int:
+    """Parse a display amount such as "₹2,345.50" into paise.
+    
+    Args:
+        amount: The display amount.
+        
+    Returns:
+        The amount in paise.
+    """
+    rupees, _, paise = amount.replace("₹", "").replace(",", "").strip().partition(".")
+    return int(rupees or 0) * 100 + int((paise + "00")[:2])
+
+
+def format_amount(paise: int) -> str:
+    """Format an amount in paise for display, e.g. "₹2,345.50".
+    
+    Args:
+        paise: The amount in paise.
+        
+    Returns:
+        The display amount.
+    """
+    rupees, paise = divmod(int(paise), 100)
+    return f"₹{rupees:,}.{paise:02d}"
+
+
+def parse_units(consumption: str) -> int:
+    """Parse a display consumption such as "342 units" into units."""
+    return int(consumption.split()[0])
+
+
+@dataclass(frozen=True)
+class BillingStore:
+    """Billing records held column-wise in NumPy arrays.
+    
+    Row ``i`` of every column describes the meter ``meters[i]``. Amounts are
+    integer paise and statuses and connection types are small integer codes,
+    so roll-ups over all meters are single vectorized scans instead of
+    per-record parsing of display strings. Meters are sorted and found by
+    binary search, so no per-meter index has to be built before the first
+    lookup and the columns can be memory-mapped from a data snapshot. Each
+    meter's service area (its outage area key) is kept as a code alongside,
+    so one row lookup joins a bill with the area to check for outages.
+    """
+    
+    meters: np.ndarray
+    customer_names: np.ndarray
+    amount_paise: np.ndarray
+    consumption_units: np.ndarray
+    last_reading: np.ndarray
+    due_date: np.ndarray
+    status: np.ndarray
+    connection_type: np.ndarray
+    connection_types: Tuple[str, ...]
+    service_area: np.ndarray
+    service_areas: Tuple[str, ...]
+    
+    @classmethod
+    def from_records(cls, records: Dict[str, Dict[str, str]]) -> "BillingStore":
+        """Build a store from display-string records keyed by meter number.
+        
+        Args:
+            records: Billing records as in BILLING_DATABASE.
+            
+        Returns:
+            The columnar store.
+        """
+        meters = sorted(meter.upper() for meter in records)
+        rows = [records[meter] for meter in sorted(records, key=str.upper)]
+        connection_types = tuple(sorted({row["connection_type"] for row in rows}))
+        type_codes = {name: code for code, name in enumerate(connection_types)}
+        # Code 0 is "no known service area"
+        service_areas = ("", *sorted({row.get("service_area", "") for row in rows} - {""}))
+        area_codes = {name: code for code, name in enumerate(service_areas)}
+        status_codes = {name: code for code, name in enumerate(STATUS_NAMES)}
+        return cls(
+            meters=np.array(meters, dtype="U12"),
+            customer_names=np.array([row["customer_name"] for row in rows], dtype=str),
+            amount_paise=np.array([parse_amount(row["due_amount"]) for row in rows], dtype=np.int64),
+            consumption_units=np.array([parse_units(row["consumption"]) for row in rows], dtype=np.int32),
+            last_reading=np.array([int(row["last_reading"]) for row in rows], dtype=np.int64),
+            due_date=np.array([row["due_date"] for row in rows], dtype="datetime64[D]"),
+            status=np.array([status_codes[row["status"]] for row in rows], dtype=np.uint8),
+            connection_type=np.array([type_codes[row["connection_type"]] for row in rows], dtype=np.uint8),
+            connection_types=connection_types,
+            service_area=np.array([area_codes[row.get("service_area", "")] for row in rows], dtype=np.uint32),
+            service_areas=service_areas,
+        )
+    
+    def __len__(self) -> int:
+        return len(self.meters)
+    
+    def record(self, meter_number: str) -> Optional[Dict[str, str]]:
+        """Get one meter's billing record in display form.
+        
+        Args:
+            meter_number: Normalized (upper-case) meter number.
+            
+        Returns:
+            The record with the same fields as BILLING_DATABASE, or None;
+            "service_area" is omitted when the meter's area is not known.
+        """
+        i = int(np.searchsorted(self.meters, meter_number))
+        if i == len(self.meters) or self.meters[i] != meter_number:
+            return None
+        record = {
+            "customer_name": str(self.customer_names[i]),
+            "due_amount": format_amount(self.amount_paise[i]),
+            "due_date": str(self.due_date[i]),
+            "status": STATUS_NAMES[self.status[i]],
+            "last_reading": str(self.last_reading[i]),
+            "consumption": f"{self.consumption_units[i]} units",
+            "connection_type": self.connection_types[self.connection_type[i]],
+        }
+        if self.service_area[i]:
+            record["service_area"] = self.service_areas[self.service_area[i]]
+        return record
+    
+    def overdue_mask(self, today: np.datetime64) -> np.ndarray:
+        """Select bills marked overdue or still pending past their due date."""
+        return (self.status == STATUS_OVERDUE) | ((self.status == STATUS_PENDING) & (self.due_date < today))
+    
+    def overdue_by_connection_type(self, today: Optional[date] = None) -> Dict[str, Tuple[int, int]]:
+        """Total the overdue amounts per connection type.
+        
+        Args:
+            today: Reference date for pending bills past due; defaults to today.
+            
+        Returns:
+            (meter count, total paise) keyed by connection type.
+        """
+        mask = self.overdue_mask(np.datetime64(today or date.today(), "D"))
+        types = self.connection_type[mask]
+        amounts = self.amount_paise[mask]
+        size = len(self.connection_types)
+        counts = np.bincount(types, minlength=size)
+        # Summed per code in int64; bincount weights would round through float64
+        totals = [int(amounts[types == code].sum()) for code in range(size)]
+        return {name: (int(counts[code]), totals[code]) for code, name in enumerate(self.connection_types)}
+    
+    def due_within(
+        self,
+        days: int,
+        today: Optional[date] = None,
+        connection_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], int]:
+        """Find unpaid meters whose bill falls due in the next ``days`` days.
+        
+        Args:
+            days: Window length in days, counted from today inclusive.
+            today: Start of the window; defaults to today.
+            connection_type: Only include this connection type, if given.
+            limit: Return at most this many meters.
+            
+        Returns:
+            Tuple of (meter numbers ordered by due date, total matching count).
+        """
+        start = np.datetime64(today or date.today(), "D")
+        mask = (self.due_date >= start) & (self.due_date <= start + np.timedelta64(days, "D"))
+        mask &= self.status != STATUS_PAID
+        if connection_type is not None:
+            if connection_type not in self.connection_types:
+                return [], 0
+            mask &= self.connection_type == self.connection_types.index(connection_type)
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(self.due_date[rows], kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return self.meters[rows].tolist(), int(mask.sum())
+    
+    def locate(self, meters: np.ndarray) -> np.ndarray:
+        """Find the rows of an array of normalized meter numbers.
+        
+        Args:
+            meters: Upper-case meter numbers.
+            
+        Returns:
+            The row of each meter, or -1 where the meter is unknown.
+        """
+        if not len(self.meters):
+            return np.full(len(meters), -1, dtype=np.int64)
+        rows = np.searchsorted(self.meters, meters)
+        rows = np.minimum(rows, len(self.meters) - 1)
+        return np.where(self.meters[rows] == meters, rows, -1)
+    
+    def with_readings(self, meters: np.ndarray, readings: np.ndarray) -> Tuple["BillingStore", Dict[str, int]]:
+        """Apply a batch of cumulative meter readings to a copy of the store.
+        
+        Each meter's consumption grows by the advance of its register, and
+        its last reading becomes the highest reading in the batch. Readings
+        below the current register value (late or replayed) are ignored.
+        
+        Args:
+            meters: Upper-case meter numbers, one per reading.
+            readings: Cumulative register readings in units.
+            
+        Returns:
+            Tuple of (new store, counts of "applied", "stale" and
+            "unknown_meter" readings).
+        """
+        rows = self.locate(meters)
+        known = rows >= 0
+        rows, readings = rows[known], np.asarray(readings, dtype=np.int64)[known]
+        stale = int((readings < self.last_reading[rows]).sum())
+        # Keep the highest reading per meter: sort by (row, reading), take each run's last
+        order = np.lexsort((readings, rows))
+        rows, readings = rows[order], readings[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = rows[1:] != rows[:-1]
+        rows, readings = rows[last], readings[last]
+        advance = readings > self.last_reading[rows]
+        rows, readings = rows[advance], readings[advance]
+        
+        last_reading = self.last_reading.copy()
+        consumption = self.consumption_units.copy()
+        consumption[rows] += (readings - last_reading[rows]).astype(consumption.dtype)
+        last_reading[rows] = readings
+        counts = {
+            "applied": int(known.sum()) - stale,
+            "stale": stale,
+            "unknown_meter": len(known) - int(known.sum()),
+        }
+        return replace(self, last_reading=last_reading, consumption_units=consumption), counts
+    
+    def with_meter_state(
+        self,
+        meters: np.ndarray,
+        last_reading: np.ndarray,
+        consumption_units: np.ndarray,
+    ) -> "BillingStore":
+        """Overwrite the reading columns of the given meters, e.g. from a checkpoint.
+        
+        Args:
+            meters: Upper-case meter numbers.
+            last_reading: Last register reading per meter.
+            consumption_units: Consumption per meter.
+            
+        Returns:
+            The new store; meters it does not hold are skipped.
+        """
+        rows = self.locate(meters)
+        known = rows >= 0
+        last = self.last_reading.copy()
+        consumption = self.consumption_units.copy()
+        last[rows[known]] = np.asarray(last_reading)[known]
+        consumption[rows[known]] = np.asarray(consumption_units)[known]
+        return replace(self, last_reading=last, consumption_units=consumption)
+
+
+def _load_builtin_store() -> BillingStore:
+    """Build the store from the built-in records."""
+    return BillingStore.from_records(BILLING_DATABASE)
+
+
+# Built on first use by _store_loader, so importing this module stays cheap
+_store: Optional[BillingStore] = None
+_store_loader: Callable[[], BillingStore] = _load_builtin_store
+_publish_lock = threading.Lock()
+_publish_listeners: List[Callable[[], None]] = []
+
+
+def _current_store() -> BillingStore:
+    """Get the published store, loading it first if needed; hold _publish_lock."""
+    global _store
+    if _store is None:
+        _store = _store_loader()
+    return _store
+
+
+def set_billing_loader(loader: Callable[[], BillingStore]) -> None:
+    """Replace how the billing store is loaded, e.g. from a data snapshot.
+    
+    The store is loaded on the next get_billing_store() call; call it
+    straight away to load before serving.
+    
+    Args:
+        loader: Builds the initial store.
+    """
+    global _store, _store_loader
+    with _publish_lock:
+        _store_loader = loader
+        _store = None
+    _notify_listeners()
+
+
+def add_billing_listener(listener: Callable[[], None]) -> None:
+    """Call a function whenever a new billing store is published.
+    
+    Args:
+        listener: Called with no arguments after each publish, e.g. to
+            forget cached lookup misses.
+    """
+    _publish_listeners.append(listener)
+
+
+def _notify_listeners() -> None:
+    """Tell the listeners a new billing store was published."""
+    for listener in _publish_listeners:
+        listener()
+
+
+def billing_store_loaded() -> bool:
+    """Whether the billing store has been loaded."""
+    return _store is not None
+
+
+def get_billing_store() -> BillingStore:
+    """Get the currently published billing store, loading it on first use.
+    
+    Returns:
+        The current BillingStore; it is never modified once published.
+    """
+    store = _store
+    if store is None:
+        with _publish_lock:
+            store = _current_store()
+    return store
+
+
+def apply_meter_readings(meters: np.ndarray, readings: np.ndarray) -> Dict[str, int]:
+    """Apply a batch of meter readings and atomically publish the new store.
+    
+    Writers are serialized with a lock; readers never take it.
+    
+    Args:
+        meters: Upper-case meter numbers, one per reading.
+        readings: Cumulative register readings in units.
+        
+    Returns:
+        Counts of "applied", "stale" and "unknown_meter" readings.
+    """
+    global _store
+    with _publish_lock:
+        _store, counts = _current_store().with_readings(meters, readings)
+    if counts["applied"]:
+        _notify_listeners()
+    return counts
+
+
+def restore_meter_state(meters: np.ndarray, last_reading: np.ndarray, consumption_units: np.ndarray) -> None:
+    """Publish a store with meter reading state restored from a checkpoint.
+    
+    Args:
+        meters: Upper-case meter numbers.
+        last_reading: Last register reading per meter.
+        consumption_units: Consumption per meter.
+    """
+    global _store
+    with _publish_lock:
+        _store = _current_store().with_meter_state(meters, last_reading, consumption_units)
+    _notify_listeners()
+
+
 def validate_meter_number(meter_number: str) -> bool:
     """Validate the format of a meter number.
     
@@ -77,4 +447,4 @@ def find_billing_by_meter(meter_number: str) -> Optional[Dict[str, str]]:
     Returns:
         Billing information if found, None otherwise.
     """
-    return BILLING_DATABASE.get(meter_number.upper())
\ No newline at end of file
+    return get_billing_store().record(meter_number.upper())
\ No newline at end of file
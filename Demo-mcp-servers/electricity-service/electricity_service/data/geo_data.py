@@ -0,0 +1,170 @@
+"""Geographic data and a spatial index for locating outages by coordinates or PIN code."""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A polygon as a list of (latitude, longitude) vertices
+Polygon = List[Tuple[float, float]]
+
+# Feeder areas, keyed like the outage database, split into block boundaries
+FEEDER_BLOCKS: Dict[str, Dict[str, Polygon]] = {
+    "sector-18": {
+        "A": [(28.5700, 77.3180), (28.5740, 77.3180), (28.5740, 77.3240), (28.5700, 77.3240)],
+        "B": [(28.5700, 77.3240), (28.5740, 77.3240), (28.5740, 77.3300), (28.5700, 77.3300)],
+        "C": [(28.5660, 77.3180), (28.5700, 77.3180), (28.5700, 77.3240), (28.5660, 77.3240)],
+        "D": [(28.5660, 77.3240), (28.5700, 77.3240), (28.5700, 77.3300), (28.5660, 77.3300)],
+    },
+    "indirapuram": {
+        "Vaibhav Khand": [(28.6350, 77.3600), (28.6500, 77.3600), (28.6500, 77.3700), (28.6350, 77.3700)],
+        "Abhay Khand": [(28.6350, 77.3700), (28.6500, 77.3700), (28.6480, 77.3800), (28.6370, 77.3800)],
+    },
+    "vasundhara": {
+        "Sectors 1-5": [(28.6550, 77.3650), (28.6700, 77.3650), (28.6700, 77.3850), (28.6600, 77.3900),
+                        (28.6550, 77.3850)],
+    },
+    "rajendra-nagar": {
+        "Main road, 1st to 5th cross": [(28.6800, 77.3450), (28.6950, 77.3480), (28.6950, 77.3650),
+                                        (28.6800, 77.3620)],
+    },
+}
+
+# PIN codes and the feeder areas they cover
+PIN_CODE_AREAS: Dict[str, List[str]] = {
+    "201301": ["sector-18"],
+    "201014": ["indirapuram"],
+    "201012": ["vasundhara"],
+    "201005": ["rajendra-nagar"],
+}
+
+# Grid cell size in degrees (roughly 1 km at these latitudes)
+GRID_CELL_SIZE = 0.01
+
+
+@dataclass(frozen=True)
+class BlockShape:
+    """A block boundary with its precomputed bounding box."""
+
+    area_key: str
+    block: str
+    polygon: Tuple[Tuple[float, float], ...]
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Check whether a point lies inside the block (ray casting).
+
+        Args:
+            lat: Latitude of the point.
+            lon: Longitude of the point.
+
+        Returns:
+            True if the point is inside the polygon, False otherwise.
+        """
+        if not (self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon):
+            return False
+        inside = False
+        vertices = self.polygon
+        j = len(vertices) - 1
+        for i in range(len(vertices)):
+            lat_i, lon_i = vertices[i]
+            lat_j, lon_j = vertices[j]
+            if (lon_i > lon) != (lon_j > lon):
+                crossing = lat_i + (lon - lon_i) * (lat_j - lat_i) / (lon_j - lon_i)
+                if lat < crossing:
+                    inside = not inside
+            j = i
+        return inside
+
+
+class GridIndex:
+    """A uniform grid over block bounding boxes.
+
+    Each cell lists the blocks whose bounding box overlaps it, so a point
+    query checks only the handful of polygons in its own cell.
+    """
+
+    def __init__(self, blocks: Dict[str, Dict[str, Polygon]], cell_size: float = GRID_CELL_SIZE):
+        """Build the index.
+
+        Args:
+            blocks: Block polygons keyed by area key, then block name.
+            cell_size: Grid cell size in degrees.
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[BlockShape]] = {}
+        for area_key, area_blocks in blocks.items():
+            for block, polygon in area_blocks.items():
+                lats = [lat for lat, _ in polygon]
+                lons = [lon for _, lon in polygon]
+                shape = BlockShape(area_key, block, tuple(polygon), min(lats), min(lons), max(lats), max(lons))
+                for cell in self._cells_for_box(shape.min_lat, shape.min_lon, shape.max_lat, shape.max_lon):
+                    self.cells.setdefault(cell, []).append(shape)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Get the grid cell containing a point."""
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def _cells_for_box(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        """Yield every grid cell overlapping a bounding box."""
+        row_start, col_start = self._cell(min_lat, min_lon)
+        row_end, col_end = self._cell(max_lat, max_lon)
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                yield row, col
+
+    def query(self, lat: float, lon: float) -> List[BlockShape]:
+        """Find the blocks containing a point.
+
+        Args:
+            lat: Latitude of the point.
+            lon: Longitude of the point.
+
+        Returns:
+            The matching blocks, possibly empty.
+        """
+        return [shape for shape in self.cells.get(self._cell(lat, lon), ()) if shape.contains(lat, lon)]
+
+
+# Built once, on first use
+_geo_index: Optional[GridIndex] = None
+
+
+def get_geo_index() -> GridIndex:
+    """Get the feeder block index, building it on first use.
+
+    Returns:
+        The GridIndex over FEEDER_BLOCKS.
+    """
+    global _geo_index
+    if _geo_index is None:
+        # Racing builders produce identical indexes, so no lock is needed
+        _geo_index = GridIndex(FEEDER_BLOCKS)
+    return _geo_index
+
+
+def find_blocks_by_location(latitude: float, longitude: float) -> List[Tuple[str, str]]:
+    """Find the feeder areas and blocks containing a point.
+
+    Args:
+        latitude: Latitude in decimal degrees.
+        longitude: Longitude in decimal degrees.
+
+    Returns:
+        A list of (area key, block name) pairs.
+    """
+    return [(shape.area_key, shape.block) for shape in get_geo_index().query(latitude, longitude)]
+
+
+def find_areas_by_pin_code(pin_code: str) -> Optional[Sequence[str]]:
+    """Find the feeder areas covering a PIN code.
+
+    Args:
+        pin_code: Six-digit PIN code.
+
+    Returns:
+        A list of area keys if the PIN code is known, None otherwise.
+    """
+    return PIN_CODE_AREAS.get(pin_code.strip())
@@ -0,0 +1,471 @@
+"""Smart-meter reading ingestion: write-ahead log, micro-batch apply and compaction.
+
+Readings arrive as text lines of ``meter_number,reading`` (extra fields are
+ignored) from a tailed file, a TCP socket or the in-process queue. Each batch
+is appended to a write-ahead log before it is acknowledged, then applied to the
+billing store in micro-batches, so tool calls always read a complete published
+store. The log is periodically compacted into a checkpoint of every meter's
+reading state, which bounds both its size and the replay time on restart.
+How far each tailed file has been read is logged and checkpointed with the
+readings, so a restart resumes where the last logged batch ended.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import anyio
+import numpy as np
+from anyio.abc import SocketStream
+from anyio.streams.memory import MemoryObjectReceiveStream
+
+from electricity_service.data.billing_data import (
+    BillingStore,
+    apply_meter_readings,
+    get_billing_store,
+    restore_meter_state,
+)
+from electricity_service.utils.metrics import (
+    READING_APPLY_LATENCY,
+    READINGS_INGESTED,
+    READINGS_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+LOG_NAME = "readings.wal"
+CHECKPOINT_NAME = "readings-checkpoint.npz"
+
+# Marks a log line recording how far a tailed file has been read
+SOURCE_MARKER = "#source"
+
+# A parsed batch: upper-case meter numbers and their readings
+ReadingBatch = Tuple[np.ndarray, np.ndarray]
+# How far each tailed file, by absolute path, has been read
+SourceOffsets = Dict[str, int]
+
+
+def parse_readings(lines: Iterable[str]) -> Tuple[ReadingBatch, int]:
+    """Parse ``meter_number,reading`` lines into arrays.
+    
+    Args:
+        lines: Text lines; blank lines are skipped.
+        
+    Returns:
+        Tuple of ((meters, readings), number of malformed lines).
+    """
+    meters: List[str] = []
+    readings: List[int] = []
+    malformed = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        fields = line.split(",")
+        try:
+            reading = int(fields[1])
+        except (IndexError, ValueError):
+            malformed += 1
+            continue
+        meters.append(fields[0].strip().upper())
+        readings.append(reading)
+    return (np.array(meters, dtype="U12"), np.array(readings, dtype=np.int64)), malformed
+
+
+class ReadingLog:
+    """An append-only log of reading batches with a compacting checkpoint.
+    
+    Each reading is one ``seq<TAB>meter<TAB>reading`` line, where ``seq``
+    numbers the batch. A batch read from a tailed file ends with a
+    ``seq<TAB>#source<TAB>offset<TAB>path`` line giving the file offset after
+    it. A torn final line from a crash fails to parse and is skipped on
+    replay.
+    """
+    
+    def __init__(self, directory: str, fsync: bool = False):
+        """Open (or create) the log in a directory.
+        
+        Args:
+            directory: Directory holding the log and checkpoint.
+            fsync: If True, fsync after every append rather than only flushing
+                to the OS; slower, but survives power loss as well as crashes.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / LOG_NAME
+        self.checkpoint_path = self.directory / CHECKPOINT_NAME
+        self.fsync = fsync
+        self._file = open(self.path, "a", encoding="utf-8")
+    
+    def size(self) -> int:
+        """Get the log's size in bytes."""
+        return self._file.tell()
+    
+    def append(self, seq: int, batch: ReadingBatch, sources: Optional[SourceOffsets] = None) -> None:
+        """Append a batch to the log.
+        
+        Args:
+            seq: The batch sequence number.
+            batch: The meters and readings.
+            sources: Offsets of the tailed files after this batch, if it was
+                read from one.
+        """
+        self._file.write(_format_batch(seq, batch, sources))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+    
+    def replay(self, after_seq: int = 0) -> Iterator[Tuple[int, ReadingBatch, SourceOffsets]]:
+        """Read back the batches logged after a sequence number.
+        
+        Args:
+            after_seq: Skip batches up to and including this sequence number.
+            
+        Yields:
+            (sequence number, batch, source offsets) in log order.
+        """
+        current, meters, readings, sources = None, [], [], {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t", 3)
+                try:
+                    seq = int(fields[0])
+                    if fields[1] == SOURCE_MARKER:
+                        offset, path, meter, reading = int(fields[2]), fields[3], None, None
+                    else:
+                        meter, reading = fields[1], int(fields[2])
+                except (IndexError, ValueError):
+                    logger.warning("Skipping unreadable reading log line: %r", line)
+                    continue
+                if seq <= after_seq:
+                    continue
+                if seq != current and current is not None:
+                    yield current, (np.array(meters, dtype="U12"), np.array(readings, dtype=np.int64)), sources
+                    meters, readings, sources = [], [], {}
+                current = seq
+                if meter is None:
+                    sources[path] = offset
+                else:
+                    meters.append(meter)
+                    readings.append(reading)
+        if current is not None:
+            yield current, (np.array(meters, dtype="U12"), np.array(readings, dtype=np.int64)), sources
+    
+    def load_checkpoint(self) -> Optional[Tuple[int, np.ndarray, np.ndarray, np.ndarray, SourceOffsets]]:
+        """Load the checkpoint, if one exists.
+        
+        Returns:
+            Tuple of (sequence number, meters, last readings, consumption,
+            source offsets), or None.
+        """
+        if not self.checkpoint_path.exists():
+            return None
+        with np.load(self.checkpoint_path) as data:
+            sources = {}
+            if "source_paths" in data:
+                sources = dict(zip(data["source_paths"].tolist(), data["source_offsets"].tolist()))
+            return int(data["seq"]), data["meters"], data["last_reading"], data["consumption_units"], sources
+    
+    def compact(self, store: BillingStore, seq: int, sources: Optional[SourceOffsets] = None) -> None:
+        """Checkpoint a store and drop the log entries it already includes.
+        
+        The checkpoint is written to a temporary file and renamed into place,
+        so a crash leaves either the old or the new checkpoint. Entries
+        logged after ``seq`` are kept.
+        
+        Args:
+            store: The store with every batch up to ``seq`` applied.
+            seq: The last applied batch sequence number.
+            sources: Offsets of the tailed files as of ``seq``.
+        """
+        sources = sources or {}
+        tmp = self.checkpoint_path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            seq=np.int64(seq),
+            meters=store.meters,
+            last_reading=store.last_reading,
+            consumption_units=store.consumption_units,
+            source_paths=np.array(list(sources), dtype=str),
+            source_offsets=np.array(list(sources.values()), dtype=np.int64),
+        )
+        os.replace(tmp, self.checkpoint_path)
+        
+        self._file.close()
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as out:
+            for batch_seq, batch, batch_sources in self.replay(after_seq=seq):
+                out.write(_format_batch(batch_seq, batch, batch_sources))
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+    
+    def close(self) -> None:
+        """Close the log file."""
+        self._file.close()
+
+
+class ReadingIngestor:
+    """Accept reading batches, log them and apply them to the billing store.
+    
+    Logging happens when a batch is submitted; applying happens in a single
+    background loop that drains everything pending every ``apply_interval``
+    seconds, so the store is republished a few times a second however many
+    batches arrive. Blocking work (file I/O and array updates) runs in worker
+    threads to keep tool calls responsive.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        apply_interval: float = 0.2,
+        compact_every: int = 1_000_000,
+        max_pending: int = 500_000,
+        fsync: bool = False,
+    ):
+        """Initialize the ingestor.
+        
+        Args:
+            directory: Directory for the write-ahead log and checkpoint.
+            apply_interval: Seconds between micro-batch applies.
+            compact_every: Compact the log after this many applied readings.
+            max_pending: Logged-but-unapplied readings above which submitters
+                wait for the next apply (backpressure).
+            fsync: Whether to fsync the log after every batch.
+        """
+        self.log = ReadingLog(directory, fsync=fsync)
+        self.apply_interval = apply_interval
+        self.compact_every = compact_every
+        self.max_pending = max_pending
+        self.sources: List = []
+        # How far each tailed file has been logged, restored by recover()
+        self.source_offsets: SourceOffsets = {}
+        # Guards the sequence counter, the log and the pending list
+        self._lock = threading.Lock()
+        self._next_seq = 1
+        self._applied_seq = 0
+        self._applied_sources: SourceOffsets = {}
+        self._pending: List[Tuple[int, ReadingBatch, Optional[SourceOffsets]]] = []
+        self._pending_count = 0
+        self._since_compaction = 0
+        self._recovered = False
+        # Set after each apply; created in run() because it needs an event loop
+        self._applied: Optional[anyio.Event] = None
+    
+    def recover(self) -> int:
+        """Restore the billing store from the checkpoint and replay the log.
+        
+        Also restores how far each tailed file was read. Call it before
+        serving, so tool calls never see the store without the logged
+        readings; run() calls it if it has not been called yet.
+        
+        Returns:
+            The number of replayed readings.
+        """
+        after_seq = 0
+        sources: SourceOffsets = {}
+        checkpoint = self.log.load_checkpoint()
+        if checkpoint is not None:
+            after_seq, meters, last_reading, consumption, sources = checkpoint
+            restore_meter_state(meters, last_reading, consumption)
+        replayed = 0
+        for seq, (meters, readings), batch_sources in self.log.replay(after_seq):
+            if len(meters):
+                apply_meter_readings(meters, readings)
+            sources.update(batch_sources)
+            replayed += len(meters)
+            after_seq = seq
+        self._next_seq = self._applied_seq = after_seq
+        self._next_seq += 1
+        self.source_offsets = dict(sources)
+        self._applied_sources = sources
+        self._recovered = True
+        logger.info("Recovered meter readings up to batch %d (%d replayed)", after_seq, replayed)
+        return replayed
+    
+    def _log_batch(self, lines: Sequence[str], source: Optional[Tuple[str, int]] = None) -> int:
+        """Parse and log a batch and queue it for applying (worker thread)."""
+        batch, malformed = parse_readings(lines)
+        if malformed:
+            READINGS_INGESTED.inc("malformed", amount=malformed)
+        # A file's position is logged even without valid readings, so it is not read again
+        if not len(batch[0]) and source is None:
+            return 0
+        sources = dict([source]) if source is not None else None
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self.log.append(seq, batch, sources)
+            self._pending.append((seq, batch, sources))
+            self._pending_count += len(batch[0])
+            READINGS_PENDING.set(self._pending_count)
+            if sources:
+                self.source_offsets.update(sources)
+        READINGS_INGESTED.inc("received", amount=len(batch[0]))
+        return len(batch[0])
+    
+    async def submit(self, lines: Sequence[str], source: Optional[Tuple[str, int]] = None) -> int:
+        """Log a batch of reading lines; this is the in-process queue interface.
+        
+        Returns once the batch is durable in the log. It becomes visible to
+        tool calls at the next micro-batch apply.
+        
+        Args:
+            lines: ``meter_number,reading`` lines.
+            source: (path, offset after these lines) for lines read from a
+                tailed file, logged with the batch.
+            
+        Returns:
+            The number of readings accepted.
+        """
+        while self._pending_count >= self.max_pending and self._applied is not None:
+            await self._applied.wait()
+        return await anyio.to_thread.run_sync(self._log_batch, lines, source)
+    
+    def _apply_pending(self) -> int:
+        """Apply every pending batch and compact if due (worker thread)."""
+        with self._lock:
+            pending, self._pending, self._pending_count = self._pending, [], 0
+            READINGS_PENDING.set(0)
+        if not pending:
+            return 0
+        start = time.perf_counter()
+        meters = np.concatenate([batch[0] for _, batch, _ in pending])
+        readings = np.concatenate([batch[1] for _, batch, _ in pending])
+        counts = apply_meter_readings(meters, readings) if len(meters) else {}
+        self._applied_seq = pending[-1][0]
+        for _, _, sources in pending:
+            if sources:
+                self._applied_sources.update(sources)
+        READING_APPLY_LATENCY.observe(time.perf_counter() - start)
+        for result, count in counts.items():
+            READINGS_INGESTED.inc(result, amount=count)
+        
+        self._since_compaction += len(meters)
+        if self._since_compaction >= self.compact_every:
+            with self._lock:
+                self.log.compact(get_billing_store(), self._applied_seq, self._applied_sources)
+            self._since_compaction = 0
+            logger.info("Compacted meter reading log at batch %d", self._applied_seq)
+        return len(meters)
+    
+    async def run(self) -> None:
+        """Apply micro-batches and run the sources until cancelled, recovering first if needed."""
+        if not self._recovered:
+            await anyio.to_thread.run_sync(self.recover)
+        self._applied = anyio.Event()
+        async with anyio.create_task_group() as tg:
+            for source in self.sources:
+                tg.start_soon(source)
+            try:
+                while True:
+                    await anyio.sleep(self.apply_interval)
+                    await anyio.to_thread.run_sync(self._apply_pending)
+                    self._applied.set()
+                    self._applied = anyio.Event()
+            finally:
+                self.log.close()
+    
+    def add_file_source(self, path: str, poll_interval: float = 0.5) -> None:
+        """Tail a file of reading lines.
+        
+        Reading resumes at the offset logged with the last batch from the
+        file, so lines appended while the service was down are not lost. A
+        file without a logged offset is read from the start; readings are
+        cumulative, so reading old lines again does not change the store.
+        
+        Args:
+            path: The file to follow.
+            poll_interval: Seconds between checks for new lines.
+        """
+        key = os.path.abspath(path)
+        
+        async def follow() -> None:
+            offset = self.source_offsets.get(key, 0)
+            while True:
+                lines, new_offset = await anyio.to_thread.run_sync(_read_new_lines, path, offset)
+                if new_offset != offset:
+                    await self.submit(lines, source=(key, new_offset))
+                    offset = new_offset
+                await anyio.sleep(poll_interval)
+        
+        self.sources.append(follow)
+    
+    def add_socket_source(self, port: int, host: str = "127.0.0.1", max_line: int = 1024) -> None:
+        """Accept reading lines from TCP clients.
+        
+        Args:
+            port: Port to listen on.
+            host: Interface to bind; defaults to localhost only.
+            max_line: Longest accepted line in bytes; a client sending a
+                longer one is disconnected.
+        """
+        
+        async def handle(stream: SocketStream) -> None:
+            async with stream:
+                buffer = b""
+                async for chunk in stream:
+                    buffer += chunk
+                    complete, _, buffer = buffer.rpartition(b"\n")
+                    lines = complete.split(b"\n") if complete else []
+                    if len(buffer) > max_line or any(len(line) > max_line for line in lines):
+                        READINGS_INGESTED.inc("malformed")
+                        logger.warning("Dropping meter reading connection: line longer than %d bytes", max_line)
+                        return
+                    if lines:
+                        await self.submit([line.decode("utf-8", "replace") for line in lines])
+                if buffer:
+                    await self.submit([buffer.decode("utf-8", "replace")])
+        
+        async def serve() -> None:
+            listener = await anyio.create_tcp_listener(local_host=host, local_port=port)
+            logger.info("Accepting meter readings on %s:%d", host, port)
+            await listener.serve(handle)
+        
+        self.sources.append(serve)
+    
+    def add_queue_source(self, receive: MemoryObjectReceiveStream) -> None:
+        """Consume batches of reading lines from an in-process memory stream.
+        
+        Args:
+            receive: Stream of line batches, e.g. from a message-queue consumer.
+        """
+        
+        async def consume() -> None:
+            async with receive:
+                async for lines in receive:
+                    await self.submit(lines)
+        
+        self.sources.append(consume)
+
+
+def _format_batch(seq: int, batch: ReadingBatch, sources: Optional[SourceOffsets] = None) -> str:
+    """Format a batch as reading log lines."""
+    meters, readings = batch
+    lines = [f"{seq}\t{m}\t{r}\n" for m, r in zip(meters.tolist(), readings.tolist())]
+    lines.extend(f"{seq}\t{SOURCE_MARKER}\t{offset}\t{path}\n" for path, offset in (sources or {}).items())
+    return "".join(lines)
+
+
+def _read_new_lines(path: str, offset: int) -> Tuple[List[str], int]:
+    """Read the complete lines appended to a file since an offset.
+    
+    Returns:
+        Tuple of (new lines, offset after the last complete line).
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], offset
+    if size < offset:
+        # Truncated or replaced: start over
+        offset = 0
+    if size == offset:
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    return data[:end].decode("utf-8", "replace").splitlines(), offset + end
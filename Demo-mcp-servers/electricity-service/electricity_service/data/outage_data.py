@@ -1,8 +1,17 @@
 """Data and utilities for outage information."""
 
-from typing import Dict, Optional
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from itertools import islice, takewhile
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-# More realistic outage database
+# Seed outage database, loaded into the first snapshot on first use
 OUTAGE_DATABASE: Dict[str, Dict[str, str]] = {
     "sector-18": {
         "status": "ongoing",
@@ -10,7 +19,8 @@ OUTAGE_DATABASE: Dict[str, Dict[str, str]] = {
         "eta": "2025-04-14T16:30:00Z",
         "area": "Sector 18",
         "affected_blocks": "A, B, C, D",
-        "outage_id": "OUT-25041401"
+        "outage_id": "OUT-25041401",
+        "region": "Noida"
     },
     "rajendra-nagar": {
         "status": "resolved",
@@ -18,7 +28,8 @@ OUTAGE_DATABASE: Dict[str, Dict[str, str]] = {
         "eta": "2025-04-13T22:00:00Z",
         "area": "Rajendra Nagar",
         "affected_blocks": "Main road, 1st to 5th cross",
-        "outage_id": "OUT-25041256"
+        "outage_id": "OUT-25041256",
+        "region": "Ghaziabad"
     },
     "vasundhara": {
         "status": "ongoing",
@@ -26,7 +37,8 @@ OUTAGE_DATABASE: Dict[str, Dict[str, str]] = {
         "eta": "2025-04-14T19:45:00Z",
         "area": "Vasundhara",
         "affected_blocks": "Sectors 1-5",
-        "outage_id": "OUT-25041402"
+        "outage_id": "OUT-25041402",
+        "region": "Ghaziabad"
     },
     "indirapuram": {  # Alternative spelling for better matching
         "status": "scheduled",
@@ -34,10 +46,16 @@ OUTAGE_DATABASE: Dict[str, Dict[str, str]] = {
         "eta": "2025-04-15T14:00:00Z",
         "area": "Indira Puram",
         "affected_blocks": "Vaibhav Khand, Abhay Khand",
-        "outage_id": "OUT-25041398"
+        "outage_id": "OUT-25041398",
+        "region": "Ghaziabad"
     }
 }
 
+# Fields every outage record must carry; "region" is optional
+OUTAGE_FIELDS = ("status", "reason", "eta", "area", "affected_blocks", "outage_id")
+
+OUTAGE_STATUSES = ("ongoing", "resolved", "scheduled")
+
 # Valid area keywords for fuzzy matching
 AREA_KEYWORDS = {
     "sector 18": "sector-18",
@@ -55,7 +73,325 @@ AREA_KEYWORDS = {
 }
 
 
-def find_outage_by_area(area: str) -> Optional[Dict[str, str]]:
+def eta_key(value: str) -> str:
+    """Normalize an ISO-8601 time to a UTC string that sorts chronologically.
+
+    Args:
+        value: ISO-8601 date or date-time; naive times are taken as UTC.
+
+    Returns:
+        The time as "YYYY-MM-DDTHH:MM:SSZ".
+
+    Raises:
+        ValueError: If the value is not an ISO-8601 time.
+    """
+    value = value.strip()
+    parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith(("Z", "z")) else value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# Orders after every area key, for "after every record at this ETA"
+LAST_KEY = "\U0010ffff"
+
+
+class OutageIndex:
+    """Area keys in (ETA, area key) order, in one sorted list per (status, region).
+
+    A page is found by binary-searching each selected list for its start and
+    lazily merging the lists from there, so it costs O(lists * log n + page
+    size) however many outages match the filters.
+    """
+
+    def __init__(self, records: Mapping[str, Mapping[str, str]]):
+        """Build the index.
+
+        Args:
+            records: Outage records keyed by area key.
+        """
+        self.buckets: Dict[Tuple[str, Optional[str]], List[Tuple[str, str]]] = {}
+        for key, record in records.items():
+            try:
+                eta = eta_key(record["eta"])
+            except ValueError:
+                eta = record["eta"]
+            region = record.get("region")
+            bucket = (record["status"], region.lower() if region else None)
+            self.buckets.setdefault(bucket, []).append((eta, key))
+        for entries in self.buckets.values():
+            entries.sort()
+
+    def page(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        region: Optional[str] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str]]:
+        """Find a page of (ETA, area key) pairs in order.
+
+        Args:
+            statuses: Only these statuses, if given.
+            region: Only records in this region or with no region, if given.
+            eta_from: Earliest ETA (inclusive), as from eta_key().
+            eta_to: Latest ETA (inclusive), as from eta_key().
+            after: Resume after this (ETA, area key) position (exclusive).
+            limit: Maximum number of entries.
+
+        Returns:
+            Up to ``limit`` (ETA, area key) pairs.
+        """
+        region = region.lower() if region else None
+        runs: List[Iterator[Tuple[str, str]]] = []
+        for (status, bucket_region), entries in self.buckets.items():
+            if statuses is not None and status not in statuses:
+                continue
+            if region is not None and bucket_region not in (None, region):
+                continue
+            start = bisect_left(entries, (eta_from, "")) if eta_from else 0
+            if after is not None:
+                start = max(start, bisect_right(entries, after))
+            runs.append(map(entries.__getitem__, range(start, len(entries))))
+        merged: Iterable[Tuple[str, str]] = heapq.merge(*runs)
+        if eta_to:
+            merged = takewhile(lambda entry: entry[0] <= eta_to, merged)
+        return list(islice(merged, limit))
+
+
+@dataclass(frozen=True)
+class OutageSnapshot:
+    """An immutable, versioned view of the outage database.
+
+    Snapshots are never modified once built. Updates construct a new snapshot
+    and publish it with a single reference assignment, so a reader keeps a
+    consistent view for as long as it holds on to the snapshot it picked up.
+    """
+
+    version: int
+    records: Mapping[str, Mapping[str, str]]
+    aliases: Mapping[str, str]
+    created_at: float
+    # Alternative area names the snapshot was built with, kept for updates
+    keywords: Mapping[str, str]
+
+    @classmethod
+    def build(
+        cls,
+        records: Mapping[str, Mapping[str, str]],
+        version: int,
+        keywords: Optional[Mapping[str, str]] = None,
+    ) -> "OutageSnapshot":
+        """Build a snapshot and its alias index from a mapping of records.
+
+        Args:
+            records: Outage records keyed by area key (e.g. "sector-18").
+            version: Version number for the new snapshot.
+            keywords: Alternative area names mapped to area keys; defaults
+                to AREA_KEYWORDS.
+
+        Returns:
+            A new OutageSnapshot.
+        """
+        frozen = {
+            key: record if isinstance(record, MappingProxyType) else MappingProxyType(dict(record))
+            for key, record in records.items()
+        }
+
+        if keywords is None:
+            keywords = AREA_KEYWORDS
+        aliases: Dict[str, str] = {}
+        for key, record in frozen.items():
+            area = record.get("area")
+            if area:
+                aliases[area.lower()] = key
+        for alias, key in keywords.items():
+            if key in frozen:
+                aliases[alias] = key
+
+        return cls(
+            version=version,
+            records=MappingProxyType(frozen),
+            aliases=MappingProxyType(aliases),
+            created_at=time.time(),
+            keywords=keywords if isinstance(keywords, MappingProxyType) else MappingProxyType(dict(keywords)),
+        )
+
+    def apply(
+        self,
+        upserts: Optional[Mapping[str, Mapping[str, str]]] = None,
+        removals: Iterable[str] = (),
+    ) -> "OutageSnapshot":
+        """Return a new snapshot with an incremental update applied.
+
+        Unchanged records are shared with this snapshot rather than copied,
+        and areas keep the alternative names this snapshot was built with.
+
+        Args:
+            upserts: Fields to merge into existing records, or new records to add.
+            removals: Area keys to remove.
+
+        Returns:
+            The next OutageSnapshot.
+            
+        Raises:
+            ValueError: If a new record is missing required fields.
+        """
+        records = dict(self.records)
+        for key, fields in (upserts or {}).items():
+            merged = {**records.get(key, {}), **fields}
+            missing = [name for name in OUTAGE_FIELDS if name not in merged]
+            if missing:
+                raise ValueError(f"Outage '{key}' is missing fields: {', '.join(missing)}")
+            records[key] = merged
+        for key in removals:
+            records.pop(key, None)
+        return OutageSnapshot.build(records, self.version + 1, keywords=self.keywords)
+
+    def find(self, area: str) -> Optional[Mapping[str, str]]:
+        """Find the outage record for an area name, key or keyword.
+
+        Args:
+            area: The area name to search for.
+
+        Returns:
+            Outage information if found, None otherwise.
+        """
+        # Normalize input
+        area_input = area.lower().strip()
+        
+        # Try direct matching first
+        area_key = area_input.replace(" ", "-")
+        if area_key in self.records:
+            return self.records[area_key]
+        
+        # Try fuzzy matching with predefined keywords and area names
+        area_key = self.aliases.get(area_input)
+        if area_key:
+            return self.records[area_key]
+            
+        return None
+
+    @cached_property
+    def index(self) -> OutageIndex:
+        """The snapshot's ETA-ordered index, built on first use."""
+        return OutageIndex(self.records)
+
+    def list_outages(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        region: Optional[str] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, Mapping[str, str]]]:
+        """List outage records in (ETA, area key) order; see OutageIndex.page.
+
+        Returns:
+            Up to ``limit`` (ETA, area key, record) tuples.
+        """
+        return [
+            (eta, key, self.records[key])
+            for eta, key in self.index.page(statuses, region, eta_from, eta_to, after, limit)
+        ]
+
+
+def _load_builtin_snapshot() -> OutageSnapshot:
+    """Build the first snapshot from the built-in records."""
+    return OutageSnapshot.build(OUTAGE_DATABASE, version=1)
+
+
+# Built on first use by _snapshot_loader
+_snapshot: Optional[OutageSnapshot] = None
+_snapshot_loader: Callable[[], OutageSnapshot] = _load_builtin_snapshot
+_publish_lock = threading.Lock()
+_publish_listeners: List[Callable[[], None]] = []
+
+
+def _current_snapshot() -> OutageSnapshot:
+    """Get the published snapshot, loading it first if needed; hold _publish_lock."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = _snapshot_loader()
+    return _snapshot
+
+
+def set_outage_loader(loader: Callable[[], OutageSnapshot]) -> None:
+    """Replace how the first outage snapshot is loaded, e.g. from a data snapshot.
+
+    Args:
+        loader: Builds the initial snapshot.
+    """
+    global _snapshot, _snapshot_loader
+    with _publish_lock:
+        _snapshot_loader = loader
+        _snapshot = None
+    _notify_listeners()
+
+
+def add_outage_listener(listener: Callable[[], None]) -> None:
+    """Call a function whenever a new outage snapshot is published.
+    
+    Args:
+        listener: Called with no arguments after each publish, e.g. to
+            forget cached lookup misses.
+    """
+    _publish_listeners.append(listener)
+
+
+def _notify_listeners() -> None:
+    """Tell the listeners a new outage snapshot was published."""
+    for listener in _publish_listeners:
+        listener()
+
+
+def outage_snapshot_loaded() -> bool:
+    """Whether the outage snapshot has been loaded."""
+    return _snapshot is not None
+
+
+def get_outage_snapshot() -> OutageSnapshot:
+    """Get the currently published outage snapshot, loading it on first use.
+
+    Returns:
+        The current OutageSnapshot.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        with _publish_lock:
+            snapshot = _current_snapshot()
+    return snapshot
+
+
+def apply_outage_update(
+    upserts: Optional[Mapping[str, Mapping[str, str]]] = None,
+    removals: Iterable[str] = (),
+) -> OutageSnapshot:
+    """Apply an incremental update and atomically publish the new snapshot.
+
+    Writers are serialized with a lock; readers never take it.
+
+    Args:
+        upserts: Fields to merge into existing records, or new records to add.
+        removals: Area keys to remove.
+
+    Returns:
+        The newly published OutageSnapshot.
+        
+    Raises:
+        ValueError: If a new record is missing required fields.
+    """
+    global _snapshot
+    with _publish_lock:
+        snapshot = _snapshot = _current_snapshot().apply(upserts, removals)
+    _notify_listeners()
+    return snapshot
+
+
+def find_outage_by_area(area: str) -> Optional[Mapping[str, str]]:
     """Find outage information for a given area using fuzzy matching.
     
     Args:
@@ -64,20 +400,20 @@ def find_outage_by_area(area: str) -> Optional[Dict[str, str]]:
     Returns:
         Outage information if found, None otherwise.
     """
-    # Normalize input
-    area_input = area.lower().strip()
-    
-    # Try direct matching first
-    area_key = area_input.replace(" ", "-")
-    if area_key in OUTAGE_DATABASE:
-        return OUTAGE_DATABASE[area_key]
+    # Read the published snapshot once so the whole lookup sees one version
+    return get_outage_snapshot().find(area)
+
+
+def find_outage_by_key(area_key: str) -> Optional[Mapping[str, str]]:
+    """Find outage information for an exact area key.
     
-    # Try fuzzy matching with predefined keywords
-    area_key = AREA_KEYWORDS.get(area_input)
-    if area_key and area_key in OUTAGE_DATABASE:
-        return OUTAGE_DATABASE[area_key]
+    Args:
+        area_key: The area key (e.g. "sector-18").
         
-    return None
+    Returns:
+        Outage information if found, None otherwise.
+    """
+    return get_outage_snapshot().records.get(area_key)
 
 
 def get_valid_areas() -> list[str]:
@@ -86,4 +422,4 @@ def get_valid_areas() -> list[str]:
     Returns:
         A list of area names.
     """
-    return list(set(outage["area"] for outage in OUTAGE_DATABASE.values()))
\ No newline at end of file
+    return list(set(outage["area"] for outage in get_outage_snapshot().records.values()))
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""Live ingestion of outage updates into the outage snapshot.
+
+Updates are JSON delta documents of the form::
+
+    {
+        "generated_at": "2025-04-14T10:05:00Z",
+        "upsert": {"sector-18": {"status": "resolved", "eta": "2025-04-14T10:00:00Z"}},
+        "remove": ["vasundhara"]
+    }
+
+They can be pushed directly with `push_outage_delta`, or picked up by an
+`OutageFeedWatcher` that polls a single file (re-applied whenever it changes)
+or a directory (each new ``*.json`` file is applied once, in name order).
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+import anyio
+
+from electricity_service.data.outage_data import (
+    OutageSnapshot,
+    add_outage_listener,
+    apply_outage_update,
+    get_outage_snapshot,
+)
+from electricity_service.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedMetrics:
+    """Counters and gauges describing outage feed ingestion.
+
+    The snapshot fields describe the published snapshot; they are filled in
+    once per publish, so scrapes do not serialize the snapshot again.
+    """
+
+    updates_applied: int = 0
+    updates_failed: int = 0
+    last_update_latency_seconds: float = 0.0
+    max_update_latency_seconds: float = 0.0
+    snapshot_version: int = 0
+    snapshot_records: int = 0
+    snapshot_bytes: int = 0
+
+
+FEED_METRICS = FeedMetrics()
+
+
+def get_feed_metrics() -> Dict[str, Any]:
+    """Get a copy of the current outage feed metrics.
+
+    Returns:
+        A dictionary of metric names to values.
+    """
+    return asdict(FEED_METRICS)
+
+
+def _snapshot_bytes(snapshot: OutageSnapshot) -> int:
+    """Approximate the size of a snapshot by its serialized length."""
+    return len(json.dumps({key: dict(record) for key, record in snapshot.records.items()}))
+
+
+def _record_snapshot(snapshot: OutageSnapshot) -> None:
+    """Store the published snapshot's version, record count and size in FEED_METRICS."""
+    FEED_METRICS.snapshot_records = len(snapshot.records)
+    FEED_METRICS.snapshot_bytes = _snapshot_bytes(snapshot)
+    FEED_METRICS.snapshot_version = snapshot.version
+
+
+def _forget_snapshot() -> None:
+    """Mark the snapshot fields stale after a publish that did not go through the feed."""
+    FEED_METRICS.snapshot_version = 0
+
+
+add_outage_listener(_forget_snapshot)
+
+
+@REGISTRY.register_collector
+def _collect_feed_metrics():
+    """Expose the feed metrics in the metrics registry."""
+    snapshot = get_outage_snapshot()
+    if FEED_METRICS.snapshot_version != snapshot.version:
+        _record_snapshot(snapshot)
+    return [
+        ("electricity_outage_feed_updates_total", "counter", "Outage deltas applied.",
+         {(): FEED_METRICS.updates_applied}),
+        ("electricity_outage_feed_failures_total", "counter", "Outage deltas rejected or unreadable.",
+         {(): FEED_METRICS.updates_failed}),
+        ("electricity_outage_feed_latency_seconds", "gauge", "Update-to-visible latency of the last delta.",
+         {(): FEED_METRICS.last_update_latency_seconds}),
+        ("electricity_outage_snapshot_version", "gauge", "Version of the published outage snapshot.",
+         {(): FEED_METRICS.snapshot_version}),
+        ("electricity_outage_snapshot_records", "gauge", "Records in the published outage snapshot.",
+         {(): FEED_METRICS.snapshot_records}),
+        ("electricity_outage_snapshot_bytes", "gauge", "Serialized size of the published outage snapshot.",
+         {(): FEED_METRICS.snapshot_bytes}),
+    ]
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """Convert an ISO-8601 string or epoch number to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            dt = datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+            return dt.replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def parse_outage_delta(
+    document: Mapping[str, Any],
+) -> Tuple[Dict[str, Dict[str, str]], List[str], Optional[float]]:
+    """Parse and validate a delta document.
+
+    Args:
+        document: The decoded JSON delta document.
+
+    Returns:
+        Tuple of (upserts, removals, generated_at epoch seconds or None).
+
+    Raises:
+        ValueError: If the document is malformed.
+    """
+    upserts = document.get("upsert", {})
+    removals = document.get("remove", [])
+    if not isinstance(upserts, dict) or not all(isinstance(v, dict) for v in upserts.values()):
+        raise ValueError("'upsert' must map area keys to objects of outage fields")
+    if not isinstance(removals, list):
+        raise ValueError("'remove' must be a list of area keys")
+
+    parsed = {
+        str(key).lower(): {str(field): str(value) for field, value in fields.items()}
+        for key, fields in upserts.items()
+    }
+    return parsed, [str(key).lower() for key in removals], _parse_timestamp(document.get("generated_at"))
+
+
+def push_outage_delta(document: Mapping[str, Any], received_at: Optional[float] = None) -> OutageSnapshot:
+    """Apply a delta document and publish the resulting snapshot.
+
+    Args:
+        document: The decoded JSON delta document.
+        received_at: When the update was produced, if not given in the document.
+            Used to measure update-to-visible latency.
+
+    Returns:
+        The newly published OutageSnapshot.
+
+    Raises:
+        ValueError: If the document is malformed or adds an incomplete record.
+    """
+    try:
+        upserts, removals, generated_at = parse_outage_delta(document)
+        snapshot = apply_outage_update(upserts, removals)
+    except ValueError:
+        FEED_METRICS.updates_failed += 1
+        raise
+
+    source_time = generated_at or received_at or snapshot.created_at
+    latency = max(0.0, time.time() - source_time)
+    FEED_METRICS.updates_applied += 1
+    FEED_METRICS.last_update_latency_seconds = latency
+    FEED_METRICS.max_update_latency_seconds = max(FEED_METRICS.max_update_latency_seconds, latency)
+    _record_snapshot(snapshot)
+
+    logger.info(
+        "Published outage snapshot v%d (%d records) in %.3fs",
+        snapshot.version, len(snapshot.records), latency
+    )
+    return snapshot
+
+
+class OutageFeedWatcher:
+    """Poll a file or directory for outage delta documents."""
+
+    def __init__(self, path: str, poll_interval: float = 1.0):
+        """Initialize the watcher.
+
+        Args:
+            path: A delta file, or a directory of ``*.json`` delta files.
+            poll_interval: Seconds between polls.
+        """
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._seen: Set[Tuple[str, int]] = set()
+
+    def _pending_files(self) -> List[Tuple[Path, int]]:
+        """List delta files that have not been applied in their current version."""
+        if self.path.is_dir():
+            candidates = sorted(self.path.glob("*.json"))
+        elif self.path.exists():
+            candidates = [self.path]
+        else:
+            return []
+
+        pending = []
+        for candidate in candidates:
+            try:
+                mtime_ns = candidate.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if (candidate.name, mtime_ns) not in self._seen:
+                pending.append((candidate, mtime_ns))
+        return pending
+
+    def poll_once(self) -> int:
+        """Apply any new or changed delta files.
+
+        Returns:
+            The number of files applied.
+        """
+        applied = 0
+        for candidate, mtime_ns in self._pending_files():
+            self._seen.add((candidate.name, mtime_ns))
+            try:
+                with open(candidate, encoding="utf-8") as f:
+                    document = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to read outage delta %s: %s", candidate, e)
+                FEED_METRICS.updates_failed += 1
+                continue
+
+            try:
+                push_outage_delta(document, received_at=mtime_ns / 1e9)
+                applied += 1
+            except ValueError as e:
+                logger.error("Failed to apply outage delta %s: %s", candidate, e)
+        return applied
+
+    async def run(self) -> None:
+        """Poll until cancelled, reading files off the event loop."""
+        logger.info("Watching %s for outage updates", os.fspath(self.path))
+        while True:
+            await anyio.to_thread.run_sync(self.poll_once)
+            await anyio.sleep(self.poll_interval)
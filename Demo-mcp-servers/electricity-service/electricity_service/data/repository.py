@@ -0,0 +1,432 @@
+"""Async repository over a pooled SQLite database.
+
+SQLite calls block, so every query runs in a worker thread on a connection
+checked out from a small pool; concurrent tool calls therefore overlap their
+database work instead of queueing on the event loop. Queries use fixed,
+parameterized SQL, which each connection prepares once and keeps in its
+statement cache. A per-query deadline is enforced inside SQLite through a
+progress handler, so a slow query is aborted rather than left running.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import anyio
+import click
+
+from electricity_service.data.billing_data import parse_amount
+from electricity_service.utils.metrics import DB_QUERIES, DB_QUERY_LATENCY
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS billing (
+    meter_number TEXT PRIMARY KEY,
+    customer_name TEXT NOT NULL,
+    due_amount TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_reading TEXT NOT NULL,
+    consumption TEXT NOT NULL,
+    connection_type TEXT NOT NULL,
+    service_area TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS outages (
+    area_key TEXT PRIMARY KEY,
+    area TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    eta TEXT NOT NULL,
+    affected_blocks TEXT NOT NULL,
+    outage_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outage_aliases (
+    alias TEXT PRIMARY KEY,
+    area_key TEXT NOT NULL REFERENCES outages (area_key)
+);
+CREATE INDEX IF NOT EXISTS outages_by_eta ON outages (eta, area_key);
+"""
+
+BILLING_COLUMNS = (
+    "customer_name", "due_amount", "due_date", "status", "last_reading", "consumption", "connection_type",
+    "service_area",
+)
+OUTAGE_COLUMNS = ("status", "reason", "eta", "area", "affected_blocks", "outage_id")
+
+# Statements are constant strings so each connection's cache prepares them once
+BILLING_BY_METER = f"SELECT {', '.join(BILLING_COLUMNS)} FROM billing WHERE meter_number = ?"
+OUTAGE_BY_KEY = f"SELECT {', '.join(OUTAGE_COLUMNS)} FROM outages WHERE area_key = ?"
+OUTAGE_BY_ALIAS = (
+    f"SELECT {', '.join('o.' + column for column in OUTAGE_COLUMNS)} "
+    "FROM outage_aliases a JOIN outages o ON o.area_key = a.area_key WHERE a.alias = ?"
+)
+OUTAGE_AREAS = "SELECT DISTINCT area FROM outages ORDER BY area"
+# Keyset pages in (eta, area_key) order: ETA window, then the position to resume after
+OUTAGE_PAGE = (
+    f"SELECT area_key, {', '.join(OUTAGE_COLUMNS)} FROM outages "
+    "WHERE eta >= ? AND eta <= ? AND (eta > ? OR (eta = ? AND area_key > ?)) "
+    "ORDER BY eta, area_key LIMIT ?"
+)
+# Status filters are padded to a fixed three placeholders to keep the statement constant
+OUTAGE_PAGE_BY_STATUS = OUTAGE_PAGE.replace("ORDER BY", "AND status IN (?, ?, ?) ORDER BY")
+# Same overdue rule as BillingStore.overdue_mask; dates are ISO strings, so they compare in order
+BILLING_OVERDUE = (
+    "SELECT connection_type, due_amount FROM billing "
+    "WHERE status = 'Overdue' OR (status = 'Pending' AND due_date < ?)"
+)
+# Unpaid bills due in a date window, optionally of one connection type, in BillingStore.due_within order
+BILLING_DUE_WHERE = (
+    "FROM billing WHERE due_date >= ? AND due_date <= ? AND status != 'Paid' "
+    "AND (? IS NULL OR connection_type = ?)"
+)
+BILLING_DUE = (
+    f"SELECT meter_number, {', '.join(BILLING_COLUMNS)} {BILLING_DUE_WHERE} ORDER BY due_date, meter_number LIMIT ?"
+)
+BILLING_DUE_COUNT = f"SELECT COUNT(*) {BILLING_DUE_WHERE}"
+
+# SQLite virtual-machine instructions between deadline checks (a few milliseconds of work);
+# checking much more often costs noticeable query time in GIL round-trips
+PROGRESS_INTERVAL = 100000
+
+
+class QueryTimeout(TimeoutError):
+    """A query ran past its deadline and was aborted."""
+
+
+class ConnectionPool:
+    """A fixed-size pool of SQLite connections used from worker threads.
+    
+    Connections are opened on first use, up to ``size``. A capacity limiter
+    bounds the number checked out, so callers beyond it wait on the event
+    loop rather than in a thread.
+    """
+    
+    def __init__(self, path: str, size: int = 4, cached_statements: int = 64):
+        """Initialize the pool without opening connections.
+        
+        Args:
+            path: Database file path, or a ``file:`` URI.
+            size: Maximum number of connections.
+            cached_statements: Prepared statements kept per connection.
+        """
+        self.path = path
+        self.size = size
+        self.cached_statements = cached_statements
+        self._limiter = anyio.CapacityLimiter(size)
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle connection, opening one if none is idle."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self.path.startswith("file:"),
+        )
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._all.append(conn)
+        return conn
+    
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._idle.append(conn)
+    
+    @staticmethod
+    def _run_with_deadline(conn: sqlite3.Connection, func: Callable[[sqlite3.Connection], Any], timeout: float):
+        """Run a query function, aborting it once the deadline passes (worker thread)."""
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_INTERVAL)
+        try:
+            return func(conn)
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e):
+                raise QueryTimeout(f"Query exceeded {timeout:g}s") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+    
+    async def run(self, func: Callable[[sqlite3.Connection], Any], timeout: float) -> Any:
+        """Run a query function on a pooled connection in a worker thread.
+        
+        Args:
+            func: Function taking a connection and returning the result.
+            timeout: Seconds before the query is aborted.
+            
+        Returns:
+            The function's result.
+            
+        Raises:
+            QueryTimeout: If the query ran past the timeout.
+        """
+        async with self._limiter:
+            conn = self._checkout()
+            try:
+                return await anyio.to_thread.run_sync(self._run_with_deadline, conn, func, timeout)
+            finally:
+                self._checkin(conn)
+    
+    def close(self) -> None:
+        """Close every connection the pool opened."""
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all, self._idle = [], []
+
+
+class SqliteRepository:
+    """Billing and outage lookups against a SQLite database.
+    
+    Offers the same async lookups as a utility shard, so a shard can be
+    backed by a database instead of in-memory data.
+    """
+    
+    def __init__(self, path: str, pool_size: int = 4, query_timeout: float = 2.0):
+        """Initialize the repository.
+        
+        Args:
+            path: Database file path, or a ``file:`` URI.
+            pool_size: Maximum number of concurrent connections.
+            query_timeout: Default seconds before a query is aborted.
+        """
+        self.pool = ConnectionPool(path, size=pool_size)
+        self.query_timeout = query_timeout
+    
+    async def _query(self, name: str, func: Callable[[sqlite3.Connection], Any], timeout: Optional[float]) -> Any:
+        """Run a named query, recording its latency and outcome."""
+        start = time.perf_counter()
+        try:
+            result = await self.pool.run(func, self.query_timeout if timeout is None else timeout)
+        except QueryTimeout:
+            DB_QUERIES.inc(name, "timeout")
+            raise
+        except Exception:
+            DB_QUERIES.inc(name, "error")
+            raise
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - start, name)
+        DB_QUERIES.inc(name, "ok")
+        return result
+    
+    async def find_billing(self, meter_number: str, timeout: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """Find a billing record by normalized meter number.
+        
+        Args:
+            meter_number: Upper-case meter number.
+            timeout: Seconds before the query is aborted; the repository
+                default if omitted.
+                
+        Returns:
+            The billing record, or None.
+        """
+        def query(conn: sqlite3.Connection) -> Optional[Dict[str, str]]:
+            row = conn.execute(BILLING_BY_METER, (meter_number,)).fetchone()
+            if row is None:
+                return None
+            record = dict(row)
+            # As from BillingStore.record, an unknown service area is omitted
+            if not record["service_area"]:
+                del record["service_area"]
+            return record
+        
+        return await self._query("billing_by_meter", query, timeout)
+    
+    async def find_outage(self, area: str, timeout: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """Find an outage record by area name, key or keyword.
+        
+        Args:
+            area: The area name to search for.
+            timeout: Seconds before the query is aborted; the repository
+                default if omitted.
+                
+        Returns:
+            The outage record, or None.
+        """
+        area_input = area.lower().strip()
+        
+        def query(conn: sqlite3.Connection) -> Optional[Dict[str, str]]:
+            # Same matching as OutageSnapshot.find: key first, then aliases
+            row = conn.execute(OUTAGE_BY_KEY, (area_input.replace(" ", "-"),)).fetchone()
+            if row is None:
+                row = conn.execute(OUTAGE_BY_ALIAS, (area_input,)).fetchone()
+            return dict(row) if row is not None else None
+        
+        return await self._query("outage_by_area", query, timeout)
+    
+    async def list_outages(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[str, str, Dict[str, str]]]:
+        """List outage records in (ETA, area key) order, served by the outages_by_eta index.
+        
+        ETAs are compared as stored, so they should be UTC ISO-8601 strings as
+        produced by eta_key() in data/outage_data.py.
+        
+        Args:
+            statuses: Only these statuses (at most three), if given.
+            eta_from: Earliest ETA (inclusive).
+            eta_to: Latest ETA (inclusive).
+            after: Resume after this (ETA, area key) position (exclusive).
+            limit: Maximum number of records.
+            timeout: Seconds before the query is aborted; the repository
+                default if omitted.
+                
+        Returns:
+            Up to ``limit`` (ETA, area key, record) tuples.
+        """
+        after_eta, after_key = after or ("", "")
+        params: List[Any] = [eta_from or "", eta_to or "\U0010ffff", after_eta, after_eta, after_key]
+        statement = OUTAGE_PAGE
+        if statuses:
+            statement = OUTAGE_PAGE_BY_STATUS
+            params.extend((list(statuses) * 3)[:3])
+        params.append(limit)
+        
+        def query(conn: sqlite3.Connection) -> List[Tuple[str, str, Dict[str, str]]]:
+            rows = conn.execute(statement, params).fetchall()
+            return [(row["eta"], row["area_key"], {c: row[c] for c in OUTAGE_COLUMNS}) for row in rows]
+        
+        return await self._query("outage_page", query, timeout)
+    
+    async def overdue_by_connection_type(self, timeout: Optional[float] = None) -> Dict[str, Tuple[int, int]]:
+        """Total the overdue bills per connection type.
+        
+        Args:
+            timeout: Seconds before the query is aborted; the repository
+                default if omitted.
+                
+        Returns:
+            (meter count, total paise) keyed by connection type.
+        """
+        today = date.today().isoformat()
+        
+        def query(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int]]:
+            totals: Dict[str, Tuple[int, int]] = {}
+            # Amounts are display strings, so they are summed here rather than in SQL
+            for row in conn.execute(BILLING_OVERDUE, (today,)):
+                count, paise = totals.get(row["connection_type"], (0, 0))
+                totals[row["connection_type"]] = (count + 1, paise + parse_amount(row["due_amount"]))
+            return totals
+        
+        return await self._query("billing_overdue", query, timeout)
+    
+    async def due_within(
+        self,
+        days: int,
+        connection_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+        """Find unpaid meters whose bill falls due in the next ``days`` days.
+        
+        Args:
+            days: Window length in days, counted from today inclusive.
+            connection_type: Only include this connection type, if given.
+            limit: Return at most this many meters.
+            timeout: Seconds before the query is aborted; the repository
+                default if omitted.
+                
+        Returns:
+            Tuple of ((meter number, billing record) pairs ordered by due
+            date, total matching count).
+        """
+        today = date.today()
+        window = (today.isoformat(), (today + timedelta(days=days)).isoformat(), connection_type, connection_type)
+        
+        def query(conn: sqlite3.Connection) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+            total = conn.execute(BILLING_DUE_COUNT, window).fetchone()[0]
+            rows = conn.execute(BILLING_DUE, (*window, -1 if limit is None else limit)).fetchall()
+            due = []
+            for row in rows:
+                record = {c: row[c] for c in BILLING_COLUMNS}
+                if not record["service_area"]:
+                    del record["service_area"]
+                due.append((row["meter_number"], record))
+            return due, total
+        
+        return await self._query("billing_due", query, timeout)
+    
+    async def valid_areas(self, timeout: Optional[float] = None) -> List[str]:
+        """List the names of the outage areas."""
+        return await self._query(
+            "outage_areas", lambda conn: [row["area"] for row in conn.execute(OUTAGE_AREAS)], timeout
+        )
+    
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.pool.close()
+
+
+def create_database(
+    path: str,
+    billing: Mapping[str, Mapping[str, str]],
+    outages: Mapping[str, Mapping[str, str]],
+    keywords: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Create or update a SQLite database from billing and outage records.
+    
+    Args:
+        path: Database file path.
+        billing: Billing records keyed by meter number.
+        outages: Outage records keyed by area key.
+        keywords: Alternative area names mapped to area keys.
+    """
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO billing VALUES (?, {', '.join('?' * len(BILLING_COLUMNS))})",
+            [(meter.upper(), *(record.get(c, "") for c in BILLING_COLUMNS)) for meter, record in billing.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO outages (area_key, area, status, reason, eta, affected_blocks, outage_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (key, r["area"], r["status"], r["reason"], r["eta"], r["affected_blocks"], r["outage_id"])
+                for key, r in outages.items()
+            ],
+        )
+        aliases = {record["area"].lower(): key for key, record in outages.items()}
+        aliases.update((alias, key) for alias, key in (keywords or {}).items() if key in outages)
+        conn.executemany("INSERT OR REPLACE INTO outage_aliases VALUES (?, ?)", list(aliases.items()))
+    conn.close()
+
+
+@click.command()
+@click.argument("database")
+@click.option("--billing", "billing_path", default=None, help="Billing JSON, as in the shard datasets")
+@click.option("--outages", "outage_path", default=None, help="Outage JSON, as in the shard datasets")
+def build(database: str, billing_path: Optional[str], outage_path: Optional[str]):
+    """Build a SQLite DATABASE from JSON datasets, or from the built-in data if none are given."""
+    if billing_path is None and outage_path is None:
+        from electricity_service.data.billing_data import BILLING_DATABASE
+        from electricity_service.data.outage_data import AREA_KEYWORDS, OUTAGE_DATABASE
+        billing, outages = BILLING_DATABASE, {"outages": OUTAGE_DATABASE, "area_keywords": AREA_KEYWORDS}
+    else:
+        billing, outages = {}, {}
+        if billing_path:
+            with open(billing_path, encoding="utf-8") as f:
+                billing = json.load(f)
+        if outage_path:
+            with open(outage_path, encoding="utf-8") as f:
+                outages = json.load(f)
+    create_database(database, billing, outages.get("outages", {}), outages.get("area_keywords"))
+    click.echo(f"Wrote {len(billing)} billing and {len(outages.get('outages', {}))} outage records to {database}")
+
+
+if __name__ == "__main__":
+    build()
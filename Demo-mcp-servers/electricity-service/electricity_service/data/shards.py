@@ -0,0 +1,562 @@
+"""Utility shards: per-utility billing and outage datasets.
+
+Each distribution company is a shard with its own meter prefixes, regions and
+datasets. Billing lookups are routed by meter prefix and outage lookups by
+region, and a shard's datasets are only loaded when it is first queried.
+Billing reports that span every meter, such as the overdue summary, query
+every shard and merge the results.
+Shards can also run in their own worker process, which keeps their data out of
+the server's heap, or be backed by a database through an async repository.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import anyio
+
+from electricity_service.data.billing_data import BillingStore, billing_store_loaded, get_billing_store
+from electricity_service.data.outage_data import OutageSnapshot, get_outage_snapshot, outage_snapshot_loaded
+
+# Process pools and the database repository are imported by the shards that use them
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Meters are routed by their first two letters, as in METER_PATTERN
+METER_PREFIX_PATTERN = re.compile(r"^[A-Z]{2}$")
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Where a utility's data lives and which queries it serves."""
+    
+    name: str
+    meter_prefixes: Tuple[str, ...]
+    regions: Tuple[str, ...] = ()
+    billing_path: Optional[str] = None
+    outage_path: Optional[str] = None
+    snapshot_path: Optional[str] = None
+    database_path: Optional[str] = None
+    pool_size: int = 4
+    query_timeout: float = 2.0
+    worker: bool = False
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], base_dir: str = ".") -> "ShardSpec":
+        """Build a spec from a shard configuration entry.
+        
+        Args:
+            data: The entry, with "name", "meter_prefixes" and optionally
+                "regions", "billing_path", "outage_path", "snapshot_path",
+                "database_path", "pool_size", "query_timeout" and "worker".
+            base_dir: Directory that relative dataset paths are resolved against.
+            
+        Returns:
+            The shard spec.
+        """
+        def resolve(path: Optional[str]) -> Optional[str]:
+            return os.path.join(base_dir, path) if path else None
+        
+        return cls(
+            name=data["name"],
+            meter_prefixes=tuple(prefix.upper() for prefix in data["meter_prefixes"]),
+            regions=tuple(region.lower() for region in data.get("regions", ())),
+            billing_path=resolve(data.get("billing_path")),
+            outage_path=resolve(data.get("outage_path")),
+            snapshot_path=resolve(data.get("snapshot_path")),
+            database_path=resolve(data.get("database_path")),
+            pool_size=int(data.get("pool_size", 4)),
+            query_timeout=float(data.get("query_timeout", 2.0)),
+            worker=bool(data.get("worker", False)),
+        )
+
+
+# The service's built-in dataset, served from the live published store and snapshot
+DEFAULT_SHARD_SPEC = ShardSpec(name="uppcl", meter_prefixes=("UP",), regions=("noida", "ghaziabad"))
+
+
+class Shard:
+    """A utility's datasets, loaded from a data snapshot or JSON files on first use."""
+    
+    def __init__(self, spec: ShardSpec):
+        """Initialize the shard without loading its data.
+        
+        Args:
+            spec: The shard's spec.
+        """
+        self.spec = spec
+        self._load_lock = threading.Lock()
+        self._billing: Optional[BillingStore] = None
+        self._outages: Optional[OutageSnapshot] = None
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the shard's datasets have been loaded."""
+        return self._billing is not None
+    
+    def _load(self) -> None:
+        """Load both datasets once, however many callers race to do so."""
+        with self._load_lock:
+            if self._billing is not None:
+                return
+            if self.spec.snapshot_path:
+                from electricity_service.data.snapshot import load_snapshot
+                self._billing, self._outages = load_snapshot(self.spec.snapshot_path)
+                logger.info(
+                    "Loaded shard %s from snapshot: %d meters, %d outage areas",
+                    self.spec.name, len(self._billing), len(self._outages.records),
+                )
+                return
+            billing: Dict[str, Dict[str, str]] = {}
+            if self.spec.billing_path:
+                with open(self.spec.billing_path, encoding="utf-8") as f:
+                    billing = json.load(f)
+            outages: Dict[str, Any] = {}
+            if self.spec.outage_path:
+                with open(self.spec.outage_path, encoding="utf-8") as f:
+                    outages = json.load(f)
+            self._outages = OutageSnapshot.build(
+                outages.get("outages", {}), version=1, keywords=outages.get("area_keywords", {})
+            )
+            self._billing = BillingStore.from_records(billing)
+            logger.info(
+                "Loaded shard %s: %d meters, %d outage areas",
+                self.spec.name, len(self._billing), len(self._outages.records),
+            )
+    
+    def billing_store(self) -> BillingStore:
+        """Get the shard's billing store, loading it if needed."""
+        if self._billing is None:
+            self._load()
+        return self._billing
+    
+    def outage_snapshot(self) -> OutageSnapshot:
+        """Get the shard's outage snapshot, loading it if needed."""
+        if self._outages is None:
+            self._load()
+        return self._outages
+    
+    async def _run(self, func: Callable, *args):
+        """Run a lookup, loading the data in a worker thread the first time."""
+        if not self.loaded:
+            await anyio.to_thread.run_sync(self._load)
+        return func(*args)
+    
+    async def find_billing(self, meter_number: str) -> Optional[Dict[str, str]]:
+        """Find a billing record by normalized meter number."""
+        return await self._run(lambda: self.billing_store().record(meter_number))
+    
+    async def find_outage(self, area: str) -> Optional[Mapping[str, str]]:
+        """Find an outage record by area name, key or keyword."""
+        return await self._run(lambda: self.outage_snapshot().find(area))
+    
+    async def valid_areas(self) -> List[str]:
+        """List the names of the shard's outage areas."""
+        return await self._run(lambda: sorted({r["area"] for r in self.outage_snapshot().records.values()}))
+    
+    async def list_outages(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        region: Optional[str] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, Dict[str, str]]]:
+        """List outage records in (ETA, area key) order.
+        
+        Args:
+            statuses: Only these statuses, if given.
+            region: Only records in this region or with no region, if given.
+            eta_from: Earliest ETA (inclusive), as from eta_key().
+            eta_to: Latest ETA (inclusive), as from eta_key().
+            after: Resume after this (ETA, area key) position (exclusive).
+            limit: Maximum number of records.
+            
+        Returns:
+            Up to ``limit`` (ETA, area key, record) tuples.
+        """
+        return await self._run(
+            lambda: _list_outages(self.outage_snapshot(), statuses, region, eta_from, eta_to, after, limit)
+        )
+    
+    async def overdue_by_connection_type(self) -> Dict[str, Tuple[int, int]]:
+        """Total the shard's overdue bills per connection type.
+        
+        Returns:
+            (meter count, total paise) keyed by connection type.
+        """
+        # A scan of the whole store, so it runs in a worker thread
+        return await anyio.to_thread.run_sync(lambda: self.billing_store().overdue_by_connection_type())
+    
+    async def due_within(
+        self,
+        days: int,
+        connection_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+        """Find the shard's unpaid meters whose bill falls due in the next ``days`` days.
+        
+        Args:
+            days: Window length in days, counted from today inclusive.
+            connection_type: Only include this connection type, if given.
+            limit: Return at most this many meters.
+            
+        Returns:
+            Tuple of ((meter number, billing record) pairs ordered by due
+            date, total matching count).
+        """
+        return await anyio.to_thread.run_sync(
+            lambda: _due_within(self.billing_store(), days, connection_type, limit)
+        )
+    
+    async def prewarm(self) -> None:
+        """Load the shard's data now rather than on its first query."""
+        await self._run(lambda: None)
+    
+    def close(self) -> None:
+        """Release the shard's resources."""
+
+
+def _list_outages(snapshot: OutageSnapshot, *args) -> List[Tuple[str, str, Dict[str, str]]]:
+    """List a page of a snapshot's outages as plain dictionaries."""
+    return [(eta, key, dict(record)) for eta, key, record in snapshot.list_outages(*args)]
+
+
+def _due_within(
+    store: BillingStore, days: int, connection_type: Optional[str], limit: Optional[int]
+) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+    """Find a store's meters due soon with their records, read from the same store."""
+    meters, total = store.due_within(days, connection_type=connection_type, limit=limit)
+    return [(meter, store.record(meter)) for meter in meters], total
+
+
+class DefaultShard(Shard):
+    """The built-in dataset, read from the published store and snapshot.
+    
+    Unlike file-backed shards, it sees live outage feed updates and ingested
+    meter readings.
+    """
+    
+    @property
+    def loaded(self) -> bool:
+        return billing_store_loaded() and outage_snapshot_loaded()
+    
+    def _load(self) -> None:
+        get_billing_store()
+        get_outage_snapshot()
+    
+    def billing_store(self) -> BillingStore:
+        return get_billing_store()
+    
+    def outage_snapshot(self) -> OutageSnapshot:
+        return get_outage_snapshot()
+
+
+# The shard served by a worker process, set by its initializer
+_worker_shard: Optional[Shard] = None
+
+
+def _init_worker(spec: ShardSpec) -> None:
+    """Create the worker process's shard (it still loads lazily)."""
+    global _worker_shard
+    _worker_shard = Shard(spec)
+
+
+def _worker_find_billing(meter_number: str) -> Optional[Dict[str, str]]:
+    return _worker_shard.billing_store().record(meter_number)
+
+
+def _worker_find_outage(area: str) -> Optional[Dict[str, str]]:
+    outage = _worker_shard.outage_snapshot().find(area)
+    # Records are read-only mappings, which do not pickle
+    return dict(outage) if outage is not None else None
+
+
+def _worker_valid_areas() -> List[str]:
+    return sorted({record["area"] for record in _worker_shard.outage_snapshot().records.values()})
+
+
+def _worker_list_outages(*args) -> List[Tuple[str, str, Dict[str, str]]]:
+    return _list_outages(_worker_shard.outage_snapshot(), *args)
+
+
+def _worker_overdue_by_connection_type() -> Dict[str, Tuple[int, int]]:
+    return _worker_shard.billing_store().overdue_by_connection_type()
+
+
+def _worker_due_within(*args) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+    return _due_within(_worker_shard.billing_store(), *args)
+
+
+def _worker_prewarm() -> None:
+    _worker_shard.billing_store()
+
+
+class WorkerShard(Shard):
+    """A shard whose data lives in, and is queried from, a separate process.
+    
+    The process is started on first use and loads the data on its first
+    query. Lookups wait on the process from a worker thread, so the event
+    loop keeps serving other calls.
+    """
+    
+    def __init__(self, spec: ShardSpec):
+        super().__init__(spec)
+        self._executor: Optional["ProcessPoolExecutor"] = None
+    
+    @property
+    def loaded(self) -> bool:
+        return self._executor is not None
+    
+    async def _call(self, func: Callable, *args):
+        """Run a function in the shard's process."""
+        with self._load_lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.spec,),
+                )
+                logger.info("Started worker process for shard %s", self.spec.name)
+        future = self._executor.submit(func, *args)
+        return await anyio.to_thread.run_sync(future.result)
+    
+    async def find_billing(self, meter_number: str) -> Optional[Dict[str, str]]:
+        return await self._call(_worker_find_billing, meter_number)
+    
+    async def find_outage(self, area: str) -> Optional[Mapping[str, str]]:
+        return await self._call(_worker_find_outage, area)
+    
+    async def valid_areas(self) -> List[str]:
+        return await self._call(_worker_valid_areas)
+    
+    async def list_outages(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        region: Optional[str] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, Dict[str, str]]]:
+        return await self._call(_worker_list_outages, statuses, region, eta_from, eta_to, after, limit)
+    
+    async def overdue_by_connection_type(self) -> Dict[str, Tuple[int, int]]:
+        return await self._call(_worker_overdue_by_connection_type)
+    
+    async def due_within(
+        self,
+        days: int,
+        connection_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+        return await self._call(_worker_due_within, days, connection_type, limit)
+    
+    async def prewarm(self) -> None:
+        await self._call(_worker_prewarm)
+    
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DatabaseShard(Shard):
+    """A shard served from a database through the async repository.
+    
+    Connections are opened on the first query; lookups run on pooled
+    connections in worker threads with a per-query timeout.
+    """
+    
+    def __init__(self, spec: ShardSpec):
+        super().__init__(spec)
+        from electricity_service.data.repository import SqliteRepository
+        self.repository = SqliteRepository(
+            spec.database_path, pool_size=spec.pool_size, query_timeout=spec.query_timeout
+        )
+    
+    @property
+    def loaded(self) -> bool:
+        return True
+    
+    async def find_billing(self, meter_number: str) -> Optional[Dict[str, str]]:
+        return await self.repository.find_billing(meter_number)
+    
+    async def find_outage(self, area: str) -> Optional[Mapping[str, str]]:
+        return await self.repository.find_outage(area)
+    
+    async def valid_areas(self) -> List[str]:
+        return await self.repository.valid_areas()
+    
+    async def list_outages(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        region: Optional[str] = None,
+        eta_from: Optional[str] = None,
+        eta_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, Dict[str, str]]]:
+        # Database records carry no region; the shard as a whole serves its regions
+        return await self.repository.list_outages(statuses, eta_from, eta_to, after, limit)
+    
+    async def overdue_by_connection_type(self) -> Dict[str, Tuple[int, int]]:
+        return await self.repository.overdue_by_connection_type()
+    
+    async def due_within(
+        self,
+        days: int,
+        connection_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Tuple[str, Dict[str, str]]], int]:
+        return await self.repository.due_within(days, connection_type, limit)
+    
+    async def prewarm(self) -> None:
+        # Opens a pooled connection and prepares the query on it
+        await self.repository.valid_areas()
+    
+    def close(self) -> None:
+        self.repository.close()
+
+
+class ShardRouter:
+    """Route billing queries by meter prefix and outage queries by region."""
+    
+    def __init__(self, shards: Sequence[Shard]):
+        """Index the shards' prefixes and regions.
+        
+        Args:
+            shards: The shards; the first is the default for outage queries
+                that name no known region.
+                
+        Raises:
+            ValueError: If a meter prefix is not two letters, or two shards
+                claim the same meter prefix or region.
+        """
+        self.shards = list(shards)
+        self.default = self.shards[0]
+        self._prefixes: Dict[str, Shard] = {}
+        self._regions: Dict[str, Shard] = {}
+        for shard in self.shards:
+            for prefix in shard.spec.meter_prefixes:
+                if not METER_PREFIX_PATTERN.match(prefix):
+                    raise ValueError(f"Shard {shard.spec.name} has meter prefix '{prefix}'; prefixes are two letters")
+            for index, keys in ((self._prefixes, shard.spec.meter_prefixes), (self._regions, shard.spec.regions)):
+                for key in keys:
+                    if key in index:
+                        raise ValueError(f"'{key}' is claimed by shards {index[key].spec.name} and {shard.spec.name}")
+                    index[key] = shard
+    
+    def for_meter(self, meter_number: str) -> Optional[Shard]:
+        """Find the shard holding a normalized meter number.
+        
+        Args:
+            meter_number: Upper-case meter number.
+            
+        Returns:
+            The shard, or None if no shard serves the meter's prefix.
+        """
+        return self._prefixes.get(meter_number[:2])
+    
+    def for_region(self, region: str) -> Optional[Shard]:
+        """Find the shard serving a region.
+        
+        Args:
+            region: Region name, e.g. "noida".
+            
+        Returns:
+            The shard, or None if the region is unknown.
+        """
+        return self._regions.get(region.lower().strip())
+    
+    def for_area(self, area: str) -> Tuple[Shard, str]:
+        """Pick the shard for an outage query from region names in the query.
+        
+        Regions only match as whole words, so "Noida" names a region but
+        "Noidapur" does not.
+        
+        Args:
+            area: The area query, e.g. "Saket, Delhi".
+            
+        Returns:
+            Tuple of (shard, area query without the region name), using the
+            longest region named in the query, or the default shard and the
+            unchanged query.
+        """
+        query = area.lower()
+        for region in sorted(self._regions, key=len, reverse=True):
+            pattern = r"(?<!\w)" + re.escape(region) + r"(?!\w)"
+            if re.search(pattern, query):
+                remainder = re.sub(pattern, " ", query).strip(" ,-")
+                return self._regions[region], " ".join(remainder.split()) or area
+        return self.default, area
+    
+    def meter_prefixes(self) -> List[str]:
+        """List the meter prefixes served."""
+        return sorted(self._prefixes)
+    
+    def regions(self) -> List[str]:
+        """List the regions served."""
+        return sorted(self._regions)
+    
+    async def prewarm(self) -> None:
+        """Load every shard's data concurrently."""
+        async with anyio.create_task_group() as tg:
+            for shard in self.shards:
+                tg.start_soon(shard.prewarm)
+    
+    def close(self) -> None:
+        """Release every shard's resources, e.g. worker processes."""
+        for shard in self.shards:
+            shard.close()
+
+
+_router = ShardRouter([DefaultShard(DEFAULT_SHARD_SPEC)])
+
+
+def get_shard_router() -> ShardRouter:
+    """Get the configured shard router."""
+    return _router
+
+
+def configure_shards(config_path: str, workers: bool = False) -> ShardRouter:
+    """Add the shards listed in a JSON configuration file to the default shard.
+    
+    The file holds ``{"shards": [...]}`` entries as accepted by
+    ShardSpec.from_dict; relative dataset paths are resolved against the
+    file's directory. Shards with a "database_path" are served from that
+    database; the others load their data snapshot or JSON datasets.
+    
+    Args:
+        config_path: Path to the configuration file.
+        workers: Run every JSON-backed shard in its own process, regardless
+            of its "worker" setting.
+            
+    Returns:
+        The new router, which is also installed as the current one.
+    """
+    global _router
+    with open(config_path, encoding="utf-8") as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(config_path))
+    shards: List[Shard] = [DefaultShard(DEFAULT_SHARD_SPEC)]
+    for entry in config.get("shards", []):
+        spec = ShardSpec.from_dict(entry, base_dir)
+        if spec.database_path:
+            shards.append(DatabaseShard(spec))
+        elif workers or spec.worker:
+            shards.append(WorkerShard(spec))
+        else:
+            shards.append(Shard(spec))
+    _router = ShardRouter(shards)
+    logger.info("Configured shards: %s", ", ".join(shard.spec.name for shard in shards))
+    return _router
@@ -0,0 +1,176 @@
+"""Prebuilt binary data snapshots for fast startup.
+
+A snapshot is a directory holding each billing store column as a ``.npy``
+file, the outage records and keywords as JSON, and a manifest. Loading one
+memory-maps the columns instead of parsing display-string records, so it
+costs a few file opens however many meters the store holds; pages are read
+in as lookups touch them. Build one from the JSON datasets with:
+
+    python -m electricity_service.data.snapshot SNAPSHOT_DIR --billing billing.json --outages outages.json
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import click
+import numpy as np
+
+from electricity_service.data.billing_data import BillingStore
+from electricity_service.data.outage_data import OutageSnapshot
+
+SNAPSHOT_FORMAT = 2
+MANIFEST_NAME = "manifest.json"
+OUTAGES_NAME = "outages.json"
+
+# BillingStore array columns, each saved as <name>.npy
+BILLING_COLUMNS = (
+    "meters",
+    "customer_names",
+    "amount_paise",
+    "consumption_units",
+    "last_reading",
+    "due_date",
+    "status",
+    "connection_type",
+    "service_area",
+)
+
+
+def write_snapshot(
+    directory: str,
+    store: BillingStore,
+    outages: Mapping[str, Mapping[str, str]],
+    keywords: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Write a snapshot, replacing any previous one at the same path.
+
+    The snapshot is written to a sibling directory first and moved into
+    place, so a reader never sees a partial snapshot.
+
+    Args:
+        directory: Snapshot directory.
+        store: Billing store to save.
+        outages: Outage records keyed by area key.
+        keywords: Alternative area names mapped to area keys.
+    """
+    directory = os.path.abspath(directory)
+    staging = directory + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name in BILLING_COLUMNS:
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(getattr(store, name)))
+    with open(os.path.join(staging, OUTAGES_NAME), "w", encoding="utf-8") as f:
+        json.dump({"outages": {k: dict(v) for k, v in outages.items()}, "area_keywords": dict(keywords or {})}, f)
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "meters": len(store),
+        "connection_types": list(store.connection_types),
+        "service_areas": list(store.service_areas),
+        "outage_areas": len(outages),
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.replace(staging, directory)
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """Read and check a snapshot's manifest.
+
+    Args:
+        directory: Snapshot directory.
+
+    Returns:
+        The manifest.
+
+    Raises:
+        ValueError: If the snapshot was written in an unsupported format.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported data snapshot format in {directory}: {manifest.get('format')}")
+    return manifest
+
+
+def load_billing_snapshot(directory: str) -> BillingStore:
+    """Load a snapshot's billing store with its columns memory-mapped.
+
+    The mapped columns are read-only; ingested readings are applied to
+    copies, as for any published store.
+
+    Args:
+        directory: Snapshot directory.
+
+    Returns:
+        The billing store.
+    """
+    manifest = read_manifest(directory)
+    columns = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in BILLING_COLUMNS
+    }
+    return BillingStore(
+        connection_types=tuple(manifest["connection_types"]),
+        service_areas=tuple(manifest["service_areas"]),
+        **columns,
+    )
+
+
+def load_outage_snapshot(directory: str, version: int = 1) -> OutageSnapshot:
+    """Load a snapshot's outage records.
+
+    Args:
+        directory: Snapshot directory.
+        version: Version number for the outage snapshot.
+
+    Returns:
+        The outage snapshot.
+    """
+    read_manifest(directory)
+    with open(os.path.join(directory, OUTAGES_NAME), encoding="utf-8") as f:
+        outages = json.load(f)
+    return OutageSnapshot.build(outages["outages"], version=version, keywords=outages["area_keywords"])
+
+
+def load_snapshot(directory: str) -> Tuple[BillingStore, OutageSnapshot]:
+    """Load both datasets of a snapshot.
+
+    Args:
+        directory: Snapshot directory.
+
+    Returns:
+        Tuple of (billing store, outage snapshot).
+    """
+    return load_billing_snapshot(directory), load_outage_snapshot(directory)
+
+
+@click.command()
+@click.argument("directory")
+@click.option("--billing", "billing_path", default=None, help="Billing JSON, as in the shard datasets")
+@click.option("--outages", "outage_path", default=None, help="Outage JSON, as in the shard datasets")
+def build(directory: str, billing_path: Optional[str], outage_path: Optional[str]):
+    """Build a snapshot DIRECTORY from JSON datasets, or from the built-in data if none are given."""
+    if billing_path is None and outage_path is None:
+        from electricity_service.data.billing_data import BILLING_DATABASE
+        from electricity_service.data.outage_data import AREA_KEYWORDS, OUTAGE_DATABASE
+        billing, outages = BILLING_DATABASE, {"outages": OUTAGE_DATABASE, "area_keywords": AREA_KEYWORDS}
+    else:
+        billing, outages = {}, {}
+        if billing_path:
+            with open(billing_path, encoding="utf-8") as f:
+                billing = json.load(f)
+        if outage_path:
+            with open(outage_path, encoding="utf-8") as f:
+                outages = json.load(f)
+    store = BillingStore.from_records(billing)
+    write_snapshot(directory, store, outages.get("outages", {}), outages.get("area_keywords"))
+    click.echo(f"Wrote {len(store)} billing and {len(outages.get('outages', {}))} outage records to {directory}")
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,120 @@
+"""Tariff schedules and a vectorized slab-tariff calculator."""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Tariff:
+    """A slab tariff with a fixed charge per kW of load and an electricity duty.
+    
+    Slab ``i`` covers consumption from ``slab_starts[i]`` units up to the next
+    slab's start (the last slab is open-ended) and is billed at
+    ``slab_rates[i]`` paise per unit. Duty is levied on the energy charge.
+    """
+    
+    name: str
+    slab_starts: Tuple[int, ...]
+    slab_rates: Tuple[int, ...]
+    fixed_charge_per_kw: int
+    duty_basis_points: int
+    default_load_kw: float
+    # Energy charge accumulated at the start of each slab, derived once
+    _starts: np.ndarray = field(init=False, repr=False, compare=False)
+    _rates: np.ndarray = field(init=False, repr=False, compare=False)
+    _base: np.ndarray = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if len(self.slab_starts) != len(self.slab_rates) or self.slab_starts[0] != 0:
+            raise ValueError(f"Tariff {self.name}: slabs must start at 0 and have one rate each")
+        starts = np.array(self.slab_starts, dtype=np.int64)
+        rates = np.array(self.slab_rates, dtype=np.int64)
+        base = np.concatenate(([0], np.cumsum(np.diff(starts) * rates[:-1])))
+        object.__setattr__(self, "_starts", starts)
+        object.__setattr__(self, "_rates", rates)
+        object.__setattr__(self, "_base", base)
+    
+    def energy_charges(self, units: np.ndarray) -> np.ndarray:
+        """Compute the energy charge in paise for an array of consumptions.
+        
+        Each value's slab is found with one binary search, and its charge is
+        the precomputed total at the slab start plus the remainder at the
+        slab's rate, so the whole array is priced in a single pass.
+        
+        Args:
+            units: Consumption in units (kWh), as integers.
+            
+        Returns:
+            The energy charge in paise for each value.
+        """
+        units = np.asarray(units, dtype=np.int64)
+        slab = np.searchsorted(self._starts, units, side="right") - 1
+        return self._base[slab] + (units - self._starts[slab]) * self._rates[slab]
+    
+    def fixed_charges(self, load_kw: np.ndarray) -> np.ndarray:
+        """Compute the fixed charge in paise for an array of sanctioned loads."""
+        return np.rint(np.asarray(load_kw, dtype=np.float64) * self.fixed_charge_per_kw).astype(np.int64)
+    
+    def duty(self, energy: np.ndarray) -> np.ndarray:
+        """Compute the electricity duty in paise on energy charges, rounded half up."""
+        return (energy * self.duty_basis_points + 5000) // 10000
+    
+    def slab_units(self, units: int) -> List[Tuple[int, Optional[int], int, int]]:
+        """Split one consumption value across the slabs.
+        
+        Args:
+            units: Consumption in units.
+            
+        Returns:
+            A list of (slab start, slab end or None, units in slab, rate) tuples
+            for the slabs the consumption reaches.
+        """
+        parts = []
+        for i, start in enumerate(self.slab_starts):
+            if units <= start:
+                break
+            end = self.slab_starts[i + 1] if i + 1 < len(self.slab_starts) else None
+            upper = units if end is None else min(units, end)
+            parts.append((start, end, upper - start, self.slab_rates[i]))
+        return parts
+
+
+# Illustrative monthly tariffs; rates and fixed charges are in paise
+TARIFFS: Dict[str, Tariff] = {
+    "Domestic": Tariff(
+        name="Domestic",
+        slab_starts=(0, 100, 300, 500),
+        slab_rates=(550, 600, 650, 700),
+        fixed_charge_per_kw=11000,
+        duty_basis_points=500,
+        default_load_kw=2.0,
+    ),
+    "Commercial": Tariff(
+        name="Commercial",
+        slab_starts=(0, 300),
+        slab_rates=(750, 840),
+        fixed_charge_per_kw=33000,
+        duty_basis_points=750,
+        default_load_kw=5.0,
+    ),
+}
+
+
+def get_tariff(connection_type: str) -> Tariff:
+    """Get the tariff for a connection type.
+    
+    Args:
+        connection_type: Connection type, e.g. "Domestic".
+        
+    Returns:
+        The tariff.
+        
+    Raises:
+        ValueError: If no tariff exists for the connection type.
+    """
+    tariff = TARIFFS.get(connection_type.strip().title())
+    if tariff is None:
+        raise ValueError(f"No tariff for connection type: {connection_type}")
+    return tariff
@@ -0,0 +1,231 @@
+"""Per-client admission control and load shedding for tool calls.
+
+Every tool call must be admitted before it runs. A call is rejected straight
+away, with a retryable error, when its session has run out of rate-limit
+tokens or has too many calls in flight, or when its lane's queue is full.
+Otherwise it takes one of the global execution slots, waiting in its lane's
+bounded queue if none is free. Freed slots go to the interactive lane (voice
+sessions) before the batch lane, and batch calls can only hold part of the
+slots, so bulk callers cannot crowd out live conversations.
+"""
+
+import logging
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional
+
+import anyio
+
+from electricity_service.utils.metrics import ADMISSION_QUEUE, ADMISSION_REJECTIONS, ADMISSION_WAIT
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+
+class Overloaded(Exception):
+    """A call was shed; the caller may retry after ``retry_after`` seconds."""
+    
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({reason}); retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at ``rate`` tokens per second."""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def take(self) -> float:
+        """Take one token.
+        
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class _SessionState:
+    """Admission state for one client session."""
+    
+    bucket: Optional[TokenBucket]
+    in_flight: int = 0
+
+
+@dataclass
+class _Waiter:
+    """A queued call waiting for a slot."""
+    
+    lane: str
+    event: anyio.Event = field(default_factory=anyio.Event)
+    granted: bool = False
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """Admission settings; a rate of 0 disables per-session rate limiting."""
+    
+    max_concurrent: int = 64
+    max_batch: int = 32
+    max_per_session: int = 8
+    session_rate: float = 0.0
+    session_burst: float = 20.0
+    queue_size: int = 128
+    queue_timeout: float = 2.0
+
+
+class AdmissionController:
+    """Admit tool calls against per-session and global limits.
+    
+    All state is touched only from the event loop, so no locks are needed.
+    """
+    
+    def __init__(self, limits: AdmissionLimits = AdmissionLimits(), batch_clients: Iterable[str] = ()):
+        """Initialize the controller.
+        
+        Args:
+            limits: The admission settings.
+            batch_clients: Client names (from the MCP handshake) whose calls
+                all go to the batch lane.
+        """
+        self.limits = limits
+        self.batch_clients = frozenset(name.lower() for name in batch_clients)
+        self._sessions: "weakref.WeakKeyDictionary[Any, _SessionState]" = weakref.WeakKeyDictionary()
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._queues: Dict[str, Deque[_Waiter]] = {lane: deque() for lane in LANES}
+    
+    def lane_for(self, session: Any, tool_lane: str) -> str:
+        """Pick the lane for a call from the tool's lane and the client's name.
+        
+        Args:
+            session: The calling client session.
+            tool_lane: The lane the tool was registered with.
+            
+        Returns:
+            INTERACTIVE or BATCH.
+        """
+        if tool_lane == BATCH or not self.batch_clients:
+            return tool_lane
+        params = getattr(session, "client_params", None)
+        name = params.clientInfo.name.lower() if params is not None else ""
+        return BATCH if name in self.batch_clients else INTERACTIVE
+    
+    def _session(self, session: Any) -> _SessionState:
+        state = self._sessions.get(session)
+        if state is None:
+            bucket = TokenBucket(self.limits.session_rate, self.limits.session_burst) if self.limits.session_rate else None
+            state = self._sessions[session] = _SessionState(bucket)
+        return state
+    
+    def _can_start(self, lane: str) -> bool:
+        """Whether a call in a lane may take a slot now."""
+        if sum(self._in_flight.values()) >= self.limits.max_concurrent:
+            return False
+        return lane != BATCH or self._in_flight[BATCH] < self.limits.max_batch
+    
+    def _reject(self, lane: str, reason: str, retry_after: float) -> Overloaded:
+        ADMISSION_REJECTIONS.inc(lane, reason)
+        return Overloaded(reason, retry_after)
+    
+    def _release(self, lane: str) -> None:
+        """Free a slot and hand it to the next waiter, interactive lane first."""
+        self._in_flight[lane] -= 1
+        for next_lane in LANES:
+            queue = self._queues[next_lane]
+            while queue and self._can_start(next_lane):
+                waiter = queue.popleft()
+                waiter.granted = True
+                self._in_flight[next_lane] += 1
+                waiter.event.set()
+            ADMISSION_QUEUE.set(len(queue), next_lane)
+    
+    async def _acquire(self, lane: str) -> None:
+        """Take a slot in a lane, waiting in its bounded queue if necessary."""
+        queue = self._queues[lane]
+        if not queue and self._can_start(lane):
+            self._in_flight[lane] += 1
+            return
+        if len(queue) >= self.limits.queue_size:
+            raise self._reject(lane, "queue_full", self.limits.queue_timeout)
+        
+        waiter = _Waiter(lane)
+        queue.append(waiter)
+        ADMISSION_QUEUE.set(len(queue), lane)
+        start = time.perf_counter()
+        try:
+            with anyio.move_on_after(self.limits.queue_timeout):
+                await waiter.event.wait()
+        except BaseException:
+            # Cancelled while queued: give back a slot granted in the meantime
+            if waiter.granted:
+                self._release(lane)
+            else:
+                queue.remove(waiter)
+                ADMISSION_QUEUE.set(len(queue), lane)
+            raise
+        ADMISSION_WAIT.observe(time.perf_counter() - start, lane)
+        if not waiter.granted:
+            queue.remove(waiter)
+            ADMISSION_QUEUE.set(len(queue), lane)
+            raise self._reject(lane, "queue_timeout", self.limits.queue_timeout)
+    
+    def admit(self, session: Any, lane: str = INTERACTIVE) -> "_Admission":
+        """Admit one call, for use as ``async with controller.admit(...)``.
+        
+        Args:
+            session: The calling client session.
+            lane: INTERACTIVE or BATCH.
+            
+        Returns:
+            An async context manager holding the call's slot while it runs.
+            Entering it raises Overloaded if the call is shed.
+        """
+        return _Admission(self, session, lane)
+
+
+class _Admission:
+    """Holds a session's and the server's slot for the duration of one call."""
+    
+    def __init__(self, controller: AdmissionController, session: Any, lane: str):
+        self.controller = controller
+        self.session = session
+        self.lane = lane
+        self._state: Optional[_SessionState] = None
+    
+    async def __aenter__(self) -> None:
+        controller = self.controller
+        state = controller._session(self.session)
+        if state.bucket is not None:
+            retry_after = state.bucket.take()
+            if retry_after:
+                raise controller._reject(self.lane, "rate_limited", retry_after)
+        if state.in_flight >= controller.limits.max_per_session:
+            raise controller._reject(self.lane, "session_limit", 0.5)
+        # Count the call against its session while it queues, too
+        state.in_flight += 1
+        try:
+            await controller._acquire(self.lane)
+        except BaseException:
+            state.in_flight -= 1
+            raise
+        self._state = state
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self._state.in_flight -= 1
+        self.controller._release(self.lane)
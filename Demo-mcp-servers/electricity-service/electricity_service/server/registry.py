@@ -0,0 +1,141 @@
+"""Decorator-based registry of the server's tools."""
+
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import mcp.types as types
+
+from electricity_service.utils.validators import Validator, compile_schema
+
+logger = logging.getLogger(__name__)
+
+# Package whose modules register tools when imported
+TOOLS_PACKAGE = "electricity_service.tools"
+
+# Tool handlers return text content alongside structured content, or an error result
+ToolResult = Union[tuple[list[types.TextContent], dict], types.CallToolResult]
+
+COMPACT_PROPERTY = {
+    "type": "boolean",
+    "description": "Omit call-to-action sentences from the text output",
+}
+
+
+@dataclass(frozen=True)
+class ToolContext:
+    """Server-wide settings passed to every tool handler."""
+
+    compact: bool = False
+
+
+ToolHandler = Callable[[Dict[str, Any], ToolContext], Awaitable[ToolResult]]
+
+
+@dataclass(frozen=True)
+class RegisteredTool:
+    """A tool's handler with its descriptor and compiled argument validator."""
+
+    name: str
+    tool: types.Tool
+    handler: ToolHandler
+    validate: Validator
+    lane: str = "interactive"
+
+
+class ToolRegistry:
+    """Tools keyed by name, with descriptors and validators built at registration."""
+
+    def __init__(self):
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._listing: List[types.Tool] = []
+
+    def tool(
+        self,
+        name: str,
+        description: str,
+        input_schema: Dict[str, Any],
+        output_schema: Optional[Dict[str, Any]] = None,
+        lane: str = "interactive",
+    ) -> Callable[[ToolHandler], ToolHandler]:
+        """Register a tool handler.
+
+        Args:
+            name: The tool name.
+            description: The tool description shown to clients.
+            input_schema: JSON Schema for the arguments.
+            output_schema: JSON Schema for the structured output, if any.
+            lane: Admission lane, "interactive" or "batch" for bulk queries
+                that must not crowd out live conversations.
+
+        Returns:
+            A decorator registering the handler and returning it unchanged.
+
+        Raises:
+            ValueError: If a tool with the same name is already registered.
+        """
+
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            if name in self._tools:
+                raise ValueError(f"Tool already registered: {name}")
+            tool = types.Tool(
+                name=name,
+                description=description,
+                inputSchema=input_schema,
+                outputSchema=output_schema,
+            )
+            self._tools[name] = RegisteredTool(name, tool, handler, compile_schema(input_schema), lane)
+            self._listing = [registered.tool for registered in self._tools.values()]
+            return handler
+
+        return decorator
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        """Get a registered tool by name.
+
+        Args:
+            name: The tool name.
+
+        Returns:
+            The registered tool, or None if unknown.
+        """
+        return self._tools.get(name)
+
+    def list_tools(self) -> List[types.Tool]:
+        """Get the prebuilt descriptors of every registered tool."""
+        return self._listing
+
+    def load(self, package: str = TOOLS_PACKAGE) -> "ToolRegistry":
+        """Import every module in a package so their tools register.
+
+        Args:
+            package: Dotted name of the package holding tool modules.
+
+        Returns:
+            This registry.
+        """
+        module = importlib.import_module(package)
+        for info in pkgutil.iter_modules(module.__path__):
+            importlib.import_module(f"{package}.{info.name}")
+        logger.debug("Registered tools: %s", ", ".join(self._tools))
+        return self
+
+
+def error_result(message: str) -> types.CallToolResult:
+    """Build an error result for a tool call.
+
+    Args:
+        message: The error message to return.
+
+    Returns:
+        A CallToolResult flagged as an error.
+    """
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=message)],
+        isError=True,
+    )
+
+
+TOOLS = ToolRegistry()
@@ -1,29 +1,69 @@
 """Server implementation for the electricity service."""
 
 import anyio
+import json
 import logging
+import time
 import mcp.types as types
-from mcp.server.lowlevel import Server
+from typing import TYPE_CHECKING, Optional
+from mcp.server.lowlevel import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from pydantic import AnyUrl
 
-from electricity_service.services.outage_service import check_outage
-from electricity_service.services.billing_service import check_billing
+from electricity_service.data.geo_data import get_geo_index
+from electricity_service.data.outage_data import get_outage_snapshot
+from electricity_service.data.shards import get_shard_router
+from electricity_service.server.admission import AdmissionController, Overloaded
+from electricity_service.server.registry import TOOLS, ToolContext, error_result
+from electricity_service.server.subscriptions import OutageSubscriptions, outage_uri, parse_outage_uri
+from electricity_service.services.outage_service import read_outage_record
+from electricity_service.utils.metrics import (
+    REGISTRY,
+    STARTUP_SECONDS,
+    TOOL_ERRORS,
+    TOOL_LATENCY,
+    TOOL_REQUESTS,
+    TOOLS_IN_FLIGHT,
+)
+
+# Only needed when ingestion is enabled, which imports it itself
+if TYPE_CHECKING:
+    from electricity_service.data.meter_readings import ReadingIngestor
 
 logger = logging.getLogger(__name__)
 
+METRICS_URI = "metrics://prometheus"
+
 
-def create_server(name: str = "electricity-info-checker") -> Server:
+def create_server(
+    name: str = "electricity-info-checker",
+    compact: bool = False,
+    subscriptions: Optional[OutageSubscriptions] = None,
+    admission: Optional[AdmissionController] = None,
+) -> Server:
     """Create and configure the MCP server instance.
     
     Args:
         name: The name of the server.
+        compact: Default for the tools' compact mode, which omits the
+            call-to-action sentences from the text output.
+        subscriptions: Registry for outage resource subscriptions; if not
+            given, outage resources can be read but not subscribed to.
+        admission: Admission controller for tool calls; a default one
+            is created if not given.
         
     Returns:
         A configured Server instance.
     """
     app = Server(name)
 
-    @app.call_tool()
-    async def handle_tool(name: str, arguments: dict) -> list[types.TextContent]:
+    TOOLS.load()
+    context = ToolContext(compact=compact)
+    admission = admission or AdmissionController()
+
+    # Arguments are checked against each tool's compiled validator instead
+    @app.call_tool(validate_input=False)
+    async def handle_tool(name: str, arguments: dict) -> types.CallToolResult:
         """Handle tool calls from the client.
         
         Args:
@@ -31,127 +71,219 @@ def create_server(name: str = "electricity-info-checker") -> Server:
             arguments: The arguments to pass to the tool.
             
         Returns:
-            A list of TextContent responses.
-            
-        Raises:
-            ValueError: If the tool name is unknown.
+            The tool's text and structured content, or an error result.
         """
-        logger.info(f"Tool call received: {name} with arguments: {arguments}")
+        logger.info("Tool call received: %s", name, extra={"tool": name})
+        logger.debug("Arguments for %s: %s", name, arguments)
         
+        registered = TOOLS.get(name)
+        # Label unknown names together to keep metric cardinality bounded
+        tool = registered.name if registered else "unknown"
+        TOOL_REQUESTS.inc(tool)
+        TOOLS_IN_FLIGHT.inc(tool)
+        start = time.perf_counter()
         try:
-            if name == "check_outage":
-                return await handle_check_outage(arguments)
-            elif name == "check_billing_status":
-                return await handle_check_billing(arguments)
-            else:
-                error_msg = f"Unknown tool: {name}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+            if registered is None:
+                logger.error("Unknown tool: %s", name)
+                TOOL_ERRORS.inc(tool, "unknown_tool")
+                return error_result(f"Error: Unknown tool: {name}")
+            
+            error = registered.validate(arguments)
+            if error:
+                TOOL_ERRORS.inc(tool, "invalid_arguments")
+                return error_result(f"Error: Invalid arguments: {error}")
+            
+            session = app.request_context.session
+            async with admission.admit(session, admission.lane_for(session, registered.lane)):
+                result = await registered.handler(arguments, context)
+        except Overloaded as e:
+            TOOL_ERRORS.inc(tool, "overloaded")
+            return overloaded_result(e)
         except Exception as e:
-            logger.exception(f"Error handling tool call: {e}")
-            return [types.TextContent(
-                type="text", 
-                text=f"Error: An error occurred while processing your request: {str(e)}"
-            )]
-
-    async def handle_check_outage(arguments: dict) -> list[types.TextContent]:
-        """Handle check_outage tool calls.
+            logger.exception("Error handling tool call %s: %s", name, e)
+            TOOL_ERRORS.inc(tool, type(e).__name__)
+            return error_result(f"Error: An error occurred while processing your request: {str(e)}")
+        finally:
+            TOOLS_IN_FLIGHT.dec(tool)
+            TOOL_LATENCY.observe(time.perf_counter() - start, tool)
+        
+        if isinstance(result, types.CallToolResult):
+            if result.isError:
+                TOOL_ERRORS.inc(tool, "tool_error")
+            return result
+        # The SDK passes a complete result through as-is (mcp 1.19 and later, hence the
+        # requirement), skipping its per-call output schema validation
+        content, structured = result
+        return types.CallToolResult(content=content, structuredContent=structured, isError=False)
+
+    @app.list_resources()
+    async def list_resources() -> list[types.Resource]:
+        """List available resources.
         
-        Args:
-            arguments: The arguments for the outage check.
-            
         Returns:
-            A list of TextContent responses.
+            A list of Resource descriptors.
         """
-        if "area" not in arguments:
-            return [types.TextContent(
-                type="text", 
-                text="Error: Please provide an area to check for outages."
-            )]
-        
-        area_input = arguments["area"]
-        response = await check_outage(area_input)
-        return [types.TextContent(type="text", text=response)]
+        resources = [
+            types.Resource(
+                uri=outage_uri(area_key),
+                name=f"outage-{area_key}",
+                description=f"Current outage status for {outage['area']}",
+                mimeType="application/json",
+            )
+            for area_key, outage in get_outage_snapshot().records.items()
+        ]
+        resources.append(
+            types.Resource(
+                uri=METRICS_URI,
+                name="metrics",
+                description="Server metrics in Prometheus text format",
+                mimeType="text/plain",
+            )
+        )
+        return resources
 
-    async def handle_check_billing(arguments: dict) -> list[types.TextContent]:
-        """Handle check_billing_status tool calls.
+    @app.read_resource()
+    async def read_resource(uri: AnyUrl) -> list[ReadResourceContents]:
+        """Read a resource by URI.
         
         Args:
-            arguments: The arguments for the billing check.
+            uri: The URI of the resource to read.
             
         Returns:
-            A list of TextContent responses.
+            The resource contents.
+            
+        Raises:
+            ValueError: If the resource is unknown.
         """
-        if "meter_number" not in arguments:
-            return [types.TextContent(
-                type="text", 
-                text="Error: Please provide a meter number to check billing status."
-            )]
+        if str(uri) == METRICS_URI:
+            return [ReadResourceContents(content=REGISTRY.render(), mime_type="text/plain")]
         
-        meter_number = arguments["meter_number"]
-        response = await check_billing(meter_number)
-        return [types.TextContent(type="text", text=response)]
+        area_key = parse_outage_uri(str(uri))
+        outage = await read_outage_record(area_key)
+        if outage is None:
+            raise ValueError(f"No outage record for: {uri}")
+        return [ReadResourceContents(content=json.dumps(outage), mime_type="application/json")]
+
+    if subscriptions is not None:
+        @app.subscribe_resource()
+        async def subscribe_resource(uri: AnyUrl) -> None:
+            """Subscribe the calling session to updates of an outage resource.
+            
+            Args:
+                uri: The URI of the resource to subscribe to.
+            """
+            parse_outage_uri(str(uri))
+            subscriptions.subscribe(str(uri), app.request_context.session)
+
+        @app.unsubscribe_resource()
+        async def unsubscribe_resource(uri: AnyUrl) -> None:
+            """Unsubscribe the calling session from an outage resource.
+            
+            Args:
+                uri: The URI of the resource to unsubscribe from.
+            """
+            subscriptions.unsubscribe(str(uri), app.request_context.session)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools and their schemas.
         
         Returns:
-            A list of Tool descriptors.
+            A list of Tool descriptors, built once at registration.
         """
-        return [
-            types.Tool(
-                name="check_outage",
-                description="Check electricity outage status for a given area or locality",
-                inputSchema={
-                    "type": "object",
-                    "required": ["area"],
-                    "properties": {
-                        "area": {
-                            "type": "string",
-                            "description": "Area or locality name to check outage status (e.g. Sector 18, Rajendra Nagar)",
-                        }
-                    },
-                },
-            ),
-            types.Tool(
-                name="check_billing_status",
-                description="Check electricity billing status by meter number",
-                inputSchema={
-                    "type": "object",
-                    "required": ["meter_number"],
-                    "properties": {
-                        "meter_number": {
-                            "type": "string",
-                            "description": "10-digit meter number prefixed with 'UP' (e.g. UP7284651023)",
-                        }
-                    },
-                },
-            ),
-        ]
+        return TOOLS.list_tools()
     
     return app
 
 
-def run_server(app: Server) -> int:
+def overloaded_result(error: Overloaded) -> types.CallToolResult:
+    """Build the retryable error result for a shed tool call.
+    
+    Args:
+        error: The admission rejection.
+        
+    Returns:
+        A CallToolResult flagged as an error, with the reason and retry
+        delay also given as structured content.
+    """
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=f"Error: {error}. This request can be retried.")],
+        structuredContent={
+            "error": "overloaded",
+            "reason": error.reason,
+            "retryable": True,
+            "retry_after": round(error.retry_after, 3),
+        },
+        isError=True,
+    )
+
+
+async def prewarm() -> None:
+    """Load every shard's data and build the indexes otherwise built on first use.
+    
+    Worker and database shards start their process or open a connection.
+    """
+    await get_shard_router().prewarm()
+    get_geo_index()
+    get_outage_snapshot().index  # built on first access
+
+
+def run_server(
+    app: Server,
+    outage_feed: Optional[str] = None,
+    subscriptions: Optional[OutageSubscriptions] = None,
+    ingestor: Optional["ReadingIngestor"] = None,
+    prewarm_data: bool = False,
+    started_at: Optional[float] = None,
+) -> int:
     """Run the server with the specified transport.
     
     Args:
         app: The configured Server instance.
+        outage_feed: Optional file or directory to watch for outage updates.
+        subscriptions: Registry the server was created with, whose
+            subscribers are notified when outage records change.
+        ingestor: Optional meter-reading ingestor to run alongside the server.
+        prewarm_data: Load data and build indexes before reading the first
+            request, instead of on first use.
+        started_at: time.perf_counter() reading taken at process start, used
+            to report startup time.
         
     Returns:
         Exit code (0 for success).
     """
     # For now we only support STDIO
     from mcp.server.stdio import stdio_server
+    
+    started_at = time.perf_counter() if started_at is None else started_at
 
     async def arun():
         """Async runner for the server."""
         logger.info("Starting electricity service server")
-        async with stdio_server() as streams:
-            await app.run(
-                streams[0], streams[1], app.create_initialization_options()
-            )
+        if prewarm_data:
+            await prewarm()
+            STARTUP_SECONDS.set(time.perf_counter() - started_at, "prewarm")
+        if ingestor is not None:
+            # Replay logged readings before the first tool call can read the billing store
+            await anyio.to_thread.run_sync(ingestor.recover)
+        options = app.create_initialization_options(NotificationOptions(resources_changed=True))
+        if subscriptions is not None:
+            # The low-level server does not advertise subscription support itself
+            options.capabilities.resources.subscribe = True
+        
+        async with stdio_server() as streams, anyio.create_task_group() as tg:
+            if outage_feed:
+                from electricity_service.data.outage_feed import OutageFeedWatcher
+                tg.start_soon(OutageFeedWatcher(outage_feed).run)
+            if subscriptions is not None:
+                tg.start_soon(subscriptions.run)
+            if ingestor is not None:
+                tg.start_soon(ingestor.run)
+            ready = time.perf_counter() - started_at
+            STARTUP_SECONDS.set(ready, "ready")
+            logger.info("Ready to serve %.0f ms after start", ready * 1000)
+            await app.run(streams[0], streams[1], options)
+            tg.cancel_scope.cancel()
 
     anyio.run(arun)
     return 0
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""Outage resource subscriptions and change notifications."""
+
+import logging
+import weakref
+from typing import Dict, List, Set, Tuple
+
+import anyio
+import mcp.types as types
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+
+from electricity_service.data.outage_data import OutageSnapshot, get_outage_snapshot
+from electricity_service.utils.metrics import RESOURCE_NOTIFICATIONS, RESOURCE_SUBSCRIPTIONS
+
+logger = logging.getLogger(__name__)
+
+OUTAGE_URI_SCHEME = "outage://"
+
+# A change to any of these fields notifies an outage's subscribers
+NOTIFY_FIELDS = ("status", "eta")
+
+
+def outage_uri(area_key: str) -> str:
+    """Get the resource URI for an outage record.
+
+    Args:
+        area_key: The area key (e.g. "sector-18").
+
+    Returns:
+        The resource URI (e.g. "outage://sector-18").
+    """
+    return f"{OUTAGE_URI_SCHEME}{area_key}"
+
+
+def parse_outage_uri(uri: str) -> str:
+    """Extract the area key from an outage resource URI.
+
+    Args:
+        uri: The resource URI.
+
+    Returns:
+        The area key.
+
+    Raises:
+        ValueError: If the URI is not an outage resource URI.
+    """
+    if not uri.startswith(OUTAGE_URI_SCHEME):
+        raise ValueError(f"Unknown resource: {uri}")
+    return uri[len(OUTAGE_URI_SCHEME):].strip("/")
+
+
+def diff_snapshots(old: OutageSnapshot, new: OutageSnapshot) -> Tuple[List[str], bool]:
+    """Find the outage records whose notified fields changed between snapshots.
+
+    Args:
+        old: The previously observed snapshot.
+        new: The current snapshot.
+
+    Returns:
+        Tuple of (changed area keys, whether records were added or removed).
+    """
+    changed = []
+    for key, record in new.records.items():
+        previous = old.records.get(key)
+        # Snapshots share unchanged records, so identity is a cheap first check
+        if previous is record:
+            continue
+        if previous is None or any(previous.get(f) != record.get(f) for f in NOTIFY_FIELDS):
+            changed.append(key)
+    removed = [key for key in old.records if key not in new.records]
+    added = any(key not in old.records for key in new.records)
+    return changed + removed, bool(removed) or added
+
+
+class OutageSubscriptions:
+    """Track subscribed sessions per outage resource and push updates to them.
+
+    Sessions are held weakly so closed sessions drop out on their own. A
+    background task watches the published outage snapshot and, when it
+    changes, fans a single prebuilt notification per resource out to every
+    subscriber concurrently.
+    """
+
+    def __init__(self, poll_interval: float = 0.25, send_timeout: float = 5.0, max_concurrent_sends: int = 256):
+        """Initialize the subscription registry.
+
+        Args:
+            poll_interval: Seconds between checks for a new snapshot.
+            send_timeout: Seconds to wait on a single session before dropping it.
+            max_concurrent_sends: Upper bound on notifications in flight at once.
+        """
+        self.poll_interval = poll_interval
+        self.send_timeout = send_timeout
+        self._limiter = anyio.CapacityLimiter(max_concurrent_sends)
+        self._subscribers: Dict[str, "weakref.WeakSet[ServerSession]"] = {}
+
+    def subscribe(self, uri: str, session: ServerSession) -> None:
+        """Subscribe a session to a resource.
+
+        Args:
+            uri: The resource URI.
+            session: The subscribing session.
+        """
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+        RESOURCE_SUBSCRIPTIONS.set(self.subscription_count())
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        """Unsubscribe a session from a resource.
+
+        Args:
+            uri: The resource URI.
+            session: The subscribed session.
+        """
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+        RESOURCE_SUBSCRIPTIONS.set(self.subscription_count())
+
+    def subscription_count(self) -> int:
+        """Count the live (resource, session) subscriptions."""
+        return sum(len(sessions) for sessions in self._subscribers.values())
+
+    def _drop(self, session: ServerSession) -> None:
+        """Remove a session from every subscription."""
+        for uri in list(self._subscribers):
+            self.unsubscribe(uri, session)
+
+    async def _send(self, session: ServerSession, notification: types.ServerNotification) -> None:
+        """Send one notification, dropping the session if it fails or stalls."""
+        async with self._limiter:
+            try:
+                with anyio.fail_after(self.send_timeout):
+                    await session.send_notification(notification)
+                RESOURCE_NOTIFICATIONS.inc("sent")
+            except Exception as e:
+                logger.warning("Dropping subscriber after failed notification: %s", e)
+                RESOURCE_NOTIFICATIONS.inc("failed")
+                self._drop(session)
+
+    async def publish(self, changed_keys: List[str], list_changed: bool) -> None:
+        """Notify the subscribers of changed outage resources.
+
+        Args:
+            changed_keys: Area keys whose records changed or were removed.
+            list_changed: Whether to also send a resource list change to
+                every subscribed session.
+        """
+        sends: List[Tuple[ServerSession, types.ServerNotification]] = []
+        for key in changed_keys:
+            uri = outage_uri(key)
+            sessions = list(self._subscribers.get(uri, ()))
+            if not sessions:
+                continue
+            notification = types.ServerNotification(
+                types.ResourceUpdatedNotification(
+                    params=types.ResourceUpdatedNotificationParams(uri=AnyUrl(uri)),
+                )
+            )
+            sends.extend((session, notification) for session in sessions)
+
+        if list_changed:
+            notification = types.ServerNotification(types.ResourceListChangedNotification())
+            everyone: Set[ServerSession] = set()
+            for sessions in list(self._subscribers.values()):
+                everyone.update(sessions)
+            sends.extend((session, notification) for session in everyone)
+
+        if not sends:
+            return
+        logger.debug("Sending %d outage resource notifications", len(sends))
+        async with anyio.create_task_group() as tg:
+            for session, notification in sends:
+                tg.start_soon(self._send, session, notification)
+
+    async def run(self) -> None:
+        """Watch the outage snapshot and publish changes until cancelled."""
+        last = get_outage_snapshot()
+        while True:
+            await anyio.sleep(self.poll_interval)
+            current = get_outage_snapshot()
+            if current is last:
+                continue
+            changed_keys, list_changed = diff_snapshots(last, current)
+            last = current
+            await self.publish(changed_keys, list_changed)
+
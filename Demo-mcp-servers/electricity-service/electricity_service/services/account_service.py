@@ -0,0 +1,84 @@
+"""Service functions for combined account summaries.
+
+A summary answers "is my power out, and how much do I owe?" from a meter
+number alone: the billing record carries the meter's service area (from the
+billing store's precomputed meter-to-area column), which is joined with the
+area's current outage record on the same utility shard.
+"""
+
+import logging
+from typing import Any, Dict
+
+from electricity_service.data.shards import get_shard_router
+from electricity_service.services.billing_service import format_billing, lookup_billing
+from electricity_service.services.outage_service import OUTAGE_LOOKUPS, format_outage, outage_fields
+from electricity_service.utils.metrics import DATA_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+async def lookup_account_summary(meter_number: str) -> Dict[str, Any]:
+    """Look up a meter's billing status and its service area's outage status.
+    
+    Args:
+        meter_number: Meter number to check.
+        
+    Returns:
+        A dictionary with a "found" flag and either an "error" code (as
+        from lookup_billing) or the "billing" fields, the "service_area",
+        the area's "outage" (or None) and a "power_status" of "ongoing",
+        "scheduled" or "resolved" (the outage's status), "normal" (no
+        outage reported) or "unknown" (no service area on record).
+    """
+    logger.info("Checking account summary for meter number: %s", meter_number)
+    
+    billing = await lookup_billing(meter_number)
+    meter = billing["meter_number"]
+    if not billing["found"]:
+        return {"found": False, "meter_number": meter, "error": billing["error"]}
+    
+    area = billing.get("service_area")
+    outage = None
+    if area:
+        # The meter's own utility serves its area; shares in-flight check_outage fetches
+        shard = get_shard_router().for_meter(meter)
+        outage = await OUTAGE_LOOKUPS.do(f"{shard.spec.name}:{area}", lambda: shard.find_outage(area))
+        DATA_LOOKUPS.inc("outage", "hit" if outage else "miss")
+    
+    return {
+        "found": True,
+        "meter_number": meter,
+        "billing": {
+            field: value for field, value in billing.items()
+            if field not in ("found", "meter_number", "service_area")
+        },
+        "service_area": area,
+        "outage": outage_fields(outage) if outage else None,
+        "power_status": outage["status"] if outage else ("normal" if area else "unknown"),
+    }
+
+
+def format_account_summary(result: Dict[str, Any], compact: bool = False) -> str:
+    """Format an account summary as human-readable text.
+    
+    Args:
+        result: Result from lookup_account_summary.
+        compact: If True, omit the call-to-action sentences.
+        
+    Returns:
+        The area's outage status followed by the billing information.
+    """
+    if not result["found"]:
+        return format_billing(result, compact=compact)
+    
+    if result["outage"]:
+        power = format_outage({"found": True, **result["outage"]}, compact=compact)
+    elif result["service_area"]:
+        power = f"No power outages are currently reported in your area ({result['service_area']})."
+    else:
+        power = "Your service area is not on record, so outage status is unavailable for this meter."
+    
+    billing = format_billing(
+        {"found": True, "meter_number": result["meter_number"], **result["billing"]}, compact=compact
+    )
+    return f"{power.rstrip()}\n\n{billing}"
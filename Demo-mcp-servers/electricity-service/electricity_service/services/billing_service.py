@@ -1,38 +1,113 @@
 """Service functions for handling billing information."""
 
 import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
 
 from electricity_service.data.billing_data import (
+    add_billing_listener,
+    format_amount,
     validate_meter_number,
-    find_billing_by_meter
 )
+from electricity_service.data.shards import Shard, get_shard_router
+from electricity_service.services.coalescing import SingleFlight
 from electricity_service.utils.formatters import get_days_until
+from electricity_service.utils.metrics import DATA_LOOKUPS
 
 logger = logging.getLogger(__name__)
 
+# Concurrent lookups of the same meter share one backend fetch
+BILLING_LOOKUPS = SingleFlight("billing")
+# Forget misses whenever a new store is published, e.g. after ingesting readings
+add_billing_listener(BILLING_LOOKUPS.clear)
 
-async def check_billing(meter_number: str) -> str:
-    """Check billing information for a given meter number.
+
+async def _fetch_billing(shard: Shard, meter: str) -> Optional[Dict[str, str]]:
+    """Fetch a billing record from the utility shard holding the meter.
+    
+    Args:
+        shard: The shard serving the meter's prefix.
+        meter: Normalized meter number to look up.
+        
+    Returns:
+        Billing information if found, None otherwise.
+    """
+    return await shard.find_billing(meter)
+
+
+async def lookup_billing(meter_number: str) -> Dict[str, Any]:
+    """Look up billing information for a given meter number as structured data.
     
     Args:
         meter_number: Meter number to check.
         
     Returns:
-        Formatted response string with billing information.
+        A dictionary with a "found" flag and either the billing fields
+        (with the meter's "service_area" when known) or an "error" code
+        ("invalid_meter_number", "unknown_utility" or "not_found").
     """
-    logger.info(f"Checking billing for meter number: {meter_number}")
+    logger.info("Checking billing for meter number: %s", meter_number)
     
     # Normalize and validate meter number
     meter = meter_number.upper().strip()
     
     if not validate_meter_number(meter):
+        DATA_LOOKUPS.inc("billing", "invalid")
+        return {"found": False, "meter_number": meter, "error": "invalid_meter_number"}
+        
+    shard = get_shard_router().for_meter(meter)
+    if shard is None:
+        DATA_LOOKUPS.inc("billing", "invalid")
+        return {"found": False, "meter_number": meter, "error": "unknown_utility"}
+    
+    billing = await BILLING_LOOKUPS.do(meter, lambda: _fetch_billing(shard, meter))
+    DATA_LOOKUPS.inc("billing", "hit" if billing else "miss")
+    if not billing:
+        return {"found": False, "meter_number": meter, "error": "not_found"}
+    
+    result = {
+        "found": True,
+        "meter_number": meter,
+        "customer_name": billing['customer_name'],
+        "status": billing['status'],
+        "connection_type": billing['connection_type'],
+        "due_amount": billing['due_amount'],
+        "due_date": billing['due_date'],
+        "days_until_due": get_days_until(billing['due_date']),
+        "last_reading": billing['last_reading'],
+        "consumption": billing['consumption'],
+    }
+    if billing.get('service_area'):
+        result["service_area"] = billing['service_area']
+    return result
+
+
+def format_billing(result: Dict[str, Any], compact: bool = False) -> str:
+    """Format a structured billing result as human-readable text.
+    
+    Args:
+        result: Result from lookup_billing.
+        compact: If True, omit the call-to-action sentences.
+        
+    Returns:
+        Formatted response string with billing information.
+    """
+    meter = result["meter_number"]
+    if result.get("error") == "invalid_meter_number":
         return (
             "Error: Invalid meter number format. Please enter a valid meter number "
-            "in the format 'UPXXXXXXXXXX' (UP followed by 10 digits)."
+            "in the format 'UPXXXXXXXXXX' (a two-letter utility prefix followed by 10 digits)."
         )
-        
-    billing = find_billing_by_meter(meter)
-    if not billing:
+    if result.get("error") == "unknown_utility":
+        prefixes = ", ".join(get_shard_router().meter_prefixes())
+        return (
+            f"Error: Meter number '{meter}' does not belong to a supported utility. "
+            f"Supported meter prefixes: {prefixes}."
+        )
+    if result.get("error") == "not_found":
+        if compact:
+            return f"Error: No billing record found for meter number '{meter}'."
         return (
             f"Error: No billing record found for meter number '{meter}'.\n\n"
             f"Please verify your meter number and try again. If you've recently received "
@@ -40,27 +115,175 @@ async def check_billing(meter_number: str) -> str:
         )
     
     response = (
-        f"Billing Info for {billing['customer_name']}\n"
+        f"Billing Info for {result['customer_name']}\n"
         f"- Meter Number: {meter}\n"
-        f"- Status: {billing['status']}\n"
-        f"- Connection Type: {billing['connection_type']}\n"
-        f"- Due Amount: {billing['due_amount']}\n"
-        f"- Due Date: {billing['due_date']}\n"
-        f"- Last Reading: {billing['last_reading']}\n"
-        f"- Consumption: {billing['consumption']}\n"
+        f"- Status: {result['status']}\n"
+        f"- Connection Type: {result['connection_type']}\n"
+        f"- Due Amount: {result['due_amount']}\n"
+        f"- Due Date: {result['due_date']}\n"
+        f"- Last Reading: {result['last_reading']}\n"
+        f"- Consumption: {result['consumption']}\n"
     )
     
+    if compact:
+        return response
+    
     # Add call-to-action based on status
-    if billing['status'] == "Pending":
-        days_left = get_days_until(billing['due_date'])
+    if result['status'] == "Pending":
+        days_left = result['days_until_due']
         if days_left > 0:
             response += f"\nYour payment is due in {days_left} days. Pay online at electricitypayments.in to avoid late fees."
         else:
             response += "\nYour payment is due today. Pay online at electricitypayments.in to avoid late fees."
-    elif billing['status'] == "Overdue":
+    elif result['status'] == "Overdue":
         response += "\nYour payment is overdue. Please settle your dues immediately to avoid disconnection."
-    elif billing['status'] == "Paid":
+    elif result['status'] == "Paid":
         response += "\nThank you for your payment. Your next bill will be generated on the 1st of the next month."
     
-    logger.debug(f"Generated billing response for meter: {meter}")
-    return response
\ No newline at end of file
+    return response
+
+
+async def check_billing(meter_number: str, compact: bool = False) -> str:
+    """Check billing information for a given meter number.
+    
+    Args:
+        meter_number: Meter number to check.
+        compact: If True, omit the call-to-action sentences.
+        
+    Returns:
+        Formatted response string with billing information.
+    """
+    result = await lookup_billing(meter_number)
+    response = format_billing(result, compact=compact)
+    logger.debug("Generated billing response for meter: %s", result["meter_number"])
+    return response
+
+
+async def summarize_overdue() -> Dict[str, Any]:
+    """Total the overdue bills per connection type.
+    
+    A bill counts as overdue when it is marked Overdue or is still Pending
+    after its due date. Every utility shard is scanned concurrently, each
+    off the event loop, and the per-shard totals are added up.
+    
+    Returns:
+        A dictionary with per-connection-type counts and totals (in paise
+        and for display) and the overall totals.
+    """
+    totals: Dict[str, Tuple[int, int]] = {}
+    
+    async def scan(shard: Shard) -> None:
+        for name, (count, paise) in (await shard.overdue_by_connection_type()).items():
+            total_count, total_paise = totals.get(name, (0, 0))
+            totals[name] = (total_count + count, total_paise + paise)
+    
+    async with anyio.create_task_group() as tg:
+        for shard in get_shard_router().shards:
+            tg.start_soon(scan, shard)
+    by_type = [
+        {
+            "connection_type": name,
+            "meters": count,
+            "amount_paise": paise,
+            "amount": format_amount(paise),
+        }
+        for name, (count, paise) in totals.items()
+    ]
+    total_paise = sum(row["amount_paise"] for row in by_type)
+    return {
+        "by_connection_type": by_type,
+        "meters": sum(row["meters"] for row in by_type),
+        "amount_paise": total_paise,
+        "amount": format_amount(total_paise),
+    }
+
+
+def format_overdue_summary(result: Dict[str, Any]) -> str:
+    """Format an overdue summary as human-readable text.
+    
+    Args:
+        result: Result from summarize_overdue.
+        
+    Returns:
+        Formatted response string.
+    """
+    lines = [f"Overdue Bills: {result['meters']} meters, {result['amount']} outstanding"]
+    for row in result["by_connection_type"]:
+        lines.append(f"- {row['connection_type']}: {row['meters']} meters, {row['amount']}")
+    return "\n".join(lines)
+
+
+async def lookup_meters_due(
+    days: int,
+    connection_type: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """Find unpaid meters whose bill falls due within the next few days.
+    
+    Args:
+        days: Window length in days, counted from today inclusive.
+        connection_type: Only include this connection type, if given.
+        limit: Maximum number of meters to return.
+        
+    Every utility shard returns up to ``limit`` of its own meters with
+    their records; these are merged by due date before the limit is applied.
+    
+    Returns:
+        A dictionary with the matching meters ordered by due date, each with
+        the utility holding it, the total number of matches and whether the
+        list was truncated.
+    """
+    rows: List[Tuple[str, str, str, Dict[str, str]]] = []
+    total = 0
+    
+    async def fetch(shard: Shard) -> None:
+        nonlocal total
+        meters, count = await shard.due_within(days, connection_type=connection_type, limit=limit)
+        total += count
+        rows.extend((billing["due_date"], meter, shard.spec.name, billing) for meter, billing in meters)
+    
+    async with anyio.create_task_group() as tg:
+        for shard in get_shard_router().shards:
+            tg.start_soon(fetch, shard)
+    rows.sort(key=lambda row: row[:2])
+    
+    due = [
+        {
+            "meter_number": meter,
+            "utility": utility,
+            "customer_name": billing["customer_name"],
+            "connection_type": billing["connection_type"],
+            "due_amount": billing["due_amount"],
+            "due_date": billing["due_date"],
+        }
+        for _, meter, utility, billing in rows[:limit]
+    ]
+    return {
+        "days": days,
+        "connection_type": connection_type,
+        "total": total,
+        "truncated": total > len(due),
+        "meters": due,
+    }
+
+
+def format_meters_due(result: Dict[str, Any]) -> str:
+    """Format the meters due soon as human-readable text.
+    
+    Args:
+        result: Result from lookup_meters_due.
+        
+    Returns:
+        Formatted response string.
+    """
+    scope = f" ({result['connection_type']})" if result["connection_type"] else ""
+    if not result["total"]:
+        return f"No unpaid bills{scope} are due in the next {result['days']} days."
+    lines = [f"Unpaid Bills{scope} Due in the Next {result['days']} Days: {result['total']}"]
+    for row in result["meters"]:
+        lines.append(
+            f"- {row['due_date']}: {row['meter_number']} ({row['customer_name']}), {row['due_amount']}"
+        )
+    if result["truncated"]:
+        lines.append(f"...and {result['total'] - len(result['meters'])} more")
+    return "\n".join(lines)
@@ -0,0 +1,171 @@
+"""Single-flight coalescing of concurrent identical backend lookups."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import anyio
+
+from electricity_service.utils.metrics import REGISTRY
+
+# Every SingleFlight group, for the metrics collector
+_GROUPS: List["SingleFlight"] = []
+
+
+@dataclass
+class CoalescingStats:
+    """Counters for a SingleFlight group."""
+
+    calls: int = 0
+    backend_fetches: int = 0
+    coalesced: int = 0
+    negative_hits: int = 0
+    errors: int = 0
+
+
+class _Call:
+    """State shared between the leader of a lookup and its followers."""
+
+    __slots__ = ("done", "result", "error", "abandoned")
+
+    def __init__(self):
+        self.done = anyio.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+
+
+class SingleFlight:
+    """Share one in-flight backend fetch between concurrent callers of the same key.
+
+    The first caller for a key (the leader) runs the fetch; callers arriving
+    while it is in flight wait for and share its result. Misses (a ``None``
+    result) can optionally be remembered for a short time so repeated lookups
+    of an unknown key do not reach the backend at all.
+    """
+
+    def __init__(self, name: str, negative_ttl: float = 0.0, max_misses: int = 10000):
+        """Initialize the group.
+
+        Args:
+            name: Name of the group, used in metrics.
+            negative_ttl: Seconds to cache misses for (0 disables the cache).
+            max_misses: Most misses remembered; the oldest are forgotten first.
+        """
+        self.name = name
+        self.negative_ttl = negative_ttl
+        self.max_misses = max_misses
+        self.stats = CoalescingStats()
+        self._inflight: Dict[Hashable, _Call] = {}
+        # Miss expiry times in insertion order; cleared from other threads when data is published
+        self._misses: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._misses_lock = threading.Lock()
+        _GROUPS.append(self)
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of ``fetch`` for ``key``, sharing concurrent fetches.
+
+        Args:
+            key: Normalized lookup key.
+            fetch: Coroutine function performing the backend lookup.
+
+        Returns:
+            The fetch result, or None for a (possibly cached) miss.
+
+        Raises:
+            Exception: Whatever the shared fetch raised.
+        """
+        self.stats.calls += 1
+
+        if self.negative_ttl > 0 and self._cached_miss(key):
+            self.stats.negative_hits += 1
+            return None
+
+        while key in self._inflight:
+            call = self._inflight[key]
+            await call.done.wait()
+            if call.abandoned:
+                # The leader was cancelled; retry, possibly becoming the new leader
+                continue
+            self.stats.coalesced += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        call = _Call()
+        self._inflight[key] = call
+        self.stats.backend_fetches += 1
+        try:
+            call.result = await fetch()
+        except Exception as e:
+            self.stats.errors += 1
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            del self._inflight[key]
+            call.done.set()
+
+        if call.result is None and self.negative_ttl > 0:
+            self._remember_miss(key)
+        return call.result
+
+    def _cached_miss(self, key: Hashable) -> bool:
+        """Whether ``key`` is a remembered miss that has not expired."""
+        with self._misses_lock:
+            expires_at = self._misses.get(key)
+            if expires_at is None:
+                return False
+            if expires_at > time.monotonic():
+                return True
+            del self._misses[key]
+            return False
+
+    def _remember_miss(self, key: Hashable) -> None:
+        """Remember a miss, pruning expired entries and keeping at most ``max_misses``."""
+        now = time.monotonic()
+        with self._misses_lock:
+            self._misses.pop(key, None)
+            # Every entry lives for the same TTL, so the expired ones are at the front
+            while self._misses and next(iter(self._misses.values())) <= now:
+                self._misses.popitem(last=False)
+            self._misses[key] = now + self.negative_ttl
+            while len(self._misses) > self.max_misses:
+                self._misses.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all cached misses, e.g. when new data is published."""
+        with self._misses_lock:
+            self._misses.clear()
+
+
+def get_coalescing_stats(*groups: SingleFlight) -> Dict[str, Dict[str, int]]:
+    """Get the counters of the given SingleFlight groups.
+
+    Args:
+        groups: The groups to report on.
+
+    Returns:
+        A dictionary of group name to counters.
+    """
+    return {group.name: asdict(group.stats) for group in groups}
+
+
+@REGISTRY.register_collector
+def _collect_coalescing_metrics():
+    """Expose the counters of every SingleFlight group in the metrics registry."""
+    return [
+        (f"electricity_coalescing_{counter}_total", "counter", description,
+         {(("group", group.name),): getattr(group.stats, counter) for group in _GROUPS})
+        for counter, description in (
+            ("calls", "Lookups made through a coalescing group."),
+            ("backend_fetches", "Lookups that reached the backend."),
+            ("coalesced", "Lookups that shared another caller's in-flight fetch."),
+            ("negative_hits", "Lookups answered from the negative cache."),
+            ("errors", "Backend fetches that raised."),
+        )
+    ]
@@ -1,55 +1,392 @@
 """Service functions for handling outage information."""
 
+import base64
+import binascii
+import hashlib
+import json
 import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
-from electricity_service.data.outage_data import find_outage_by_area, get_valid_areas
+import anyio
+
+from electricity_service.data.geo_data import find_areas_by_pin_code, find_blocks_by_location
+from electricity_service.data.outage_data import LAST_KEY, add_outage_listener, eta_key, find_outage_by_key
+from electricity_service.data.shards import Shard, get_shard_router
+from electricity_service.services.coalescing import SingleFlight
 from electricity_service.utils.formatters import format_datetime
+from electricity_service.utils.metrics import DATA_LOOKUPS
 
 logger = logging.getLogger(__name__)
 
+# Concurrent lookups of the same area share one backend fetch
+OUTAGE_LOOKUPS = SingleFlight("outage")
+# An area the feed adds must not stay "not found" until its cached miss expires
+add_outage_listener(OUTAGE_LOOKUPS.clear)
 
-async def check_outage(area: str) -> str:
-    """Check outage information for a given area.
+# Call-to-action sentences appended to full (non-compact) responses
+STATUS_MESSAGES = {
+    "resolved": "Power has been restored in this area. If you're still experiencing issues, please contact our helpline at 1800-XXX-XXXX.",
+    "ongoing": "Our technical team is working to resolve this issue. We apologize for the inconvenience.",
+    "scheduled": "This is a planned outage for essential maintenance. Please plan accordingly.",
+}
+
+# Page size bounds for list_outages
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+async def _fetch_outage(shard: Shard, area: str) -> Optional[Mapping[str, str]]:
+    """Fetch an outage record from a utility shard.
+    
+    Args:
+        shard: The shard serving the area's region.
+        area: Area name to look up.
+        
+    Returns:
+        Outage information if found, None otherwise.
+    """
+    return await shard.find_outage(area)
+
+
+def outage_fields(outage: Mapping[str, str]) -> Dict[str, Any]:
+    """Select the outage fields returned to clients."""
+    return {
+        "outage_id": outage['outage_id'],
+        "area": outage['area'],
+        "status": outage['status'],
+        "reason": outage['reason'],
+        "affected_blocks": outage['affected_blocks'],
+        "eta": outage['eta'],
+    }
+
+
+async def lookup_outage(area: str, region: Optional[str] = None) -> Dict[str, Any]:
+    """Look up outage information for a given area as structured data.
     
     Args:
         area: Area name to check.
+        region: Region (utility service area) to search; if omitted, the
+            region is taken from the area query or defaults to the built-in one.
         
     Returns:
-        Formatted response string with outage information.
+        A dictionary with a "found" flag and either the outage fields, a
+        "not_found" error, or an "unknown_region" error with the valid regions.
     """
-    logger.info(f"Checking outage for area: {area}")
+    logger.info("Checking outage for area: %s", area)
     
-    # Normalize and find outage
+    # Normalize and route to the region's shard
     area = area.strip()
-    outage = find_outage_by_area(area)
+    router = get_shard_router()
+    if region:
+        shard, query = router.for_region(region), area
+    else:
+        shard, query = router.for_area(area)
+    if shard is None:
+        DATA_LOOKUPS.inc("outage", "invalid")
+        return {
+            "found": False,
+            "query": area,
+            "error": "unknown_region",
+            "valid_regions": router.regions(),
+        }
     
+    key = f"{shard.spec.name}:{query.lower()}"
+    outage = await OUTAGE_LOOKUPS.do(key, lambda: _fetch_outage(shard, query))
+    
+    DATA_LOOKUPS.inc("outage", "hit" if outage else "miss")
     if not outage:
-        # List valid areas in the error message
-        valid_areas = get_valid_areas()
-        suggestions = ", ".join(valid_areas)
+        # Areas are browsed with list_outages rather than listed in every miss
+        return {"found": False, "query": area, "error": "not_found"}
+    
+    return {"found": True, **outage_fields(outage)}
+
+
+def format_outage(result: Dict[str, Any], compact: bool = False) -> str:
+    """Format a structured outage result as human-readable text.
+    
+    Args:
+        result: Result from lookup_outage.
+        compact: If True, omit the call-to-action sentences.
+        
+    Returns:
+        Formatted response string with outage information.
+    """
+    if result.get("error") == "unknown_region":
+        regions = ", ".join(result["valid_regions"])
+        return f"Error: Unknown region. Supported regions: {regions}."
+    if not result["found"]:
+        if compact:
+            return f"Error: No outage information found for '{result['query']}'."
         return (
-            f"Error: No outage information found for '{area}'.\n\n"
-            f"Valid areas in our system include: {suggestions}.\n\n"
-            f"Please check your spelling or try one of the areas listed above."
+            f"Error: No outage information found for '{result['query']}'.\n\n"
+            f"Please check the spelling of the area, or use list_outages to browse reported outages."
         )
     
     # Format dates/times for better readability
-    formatted_eta = format_datetime(outage['eta'])
+    formatted_eta = format_datetime(result['eta'])
     
     response = (
-        f"Outage Info for {outage['area']} (ID: {outage['outage_id']})\n"
-        f"- Status: {outage['status'].upper()}\n"
-        f"- Reason: {outage['reason']}\n"
-        f"- Affected Areas: {outage['affected_blocks']}\n"
+        f"Outage Info for {result['area']} (ID: {result['outage_id']})\n"
+        f"- Status: {result['status'].upper()}\n"
+        f"- Reason: {result['reason']}\n"
+        f"- Affected Areas: {result['affected_blocks']}\n"
         f"- Estimated Resolution: {formatted_eta}\n"
     )
     
-    if outage['status'] == "resolved":
-        response += "\nPower has been restored in this area. If you're still experiencing issues, please contact our helpline at 1800-XXX-XXXX."
-    elif outage['status'] == "ongoing":
-        response += "\nOur technical team is working to resolve this issue. We apologize for the inconvenience."
-    elif outage['status'] == "scheduled":
-        response += "\nThis is a planned outage for essential maintenance. Please plan accordingly."
+    if not compact and result['status'] in STATUS_MESSAGES:
+        response += "\n" + STATUS_MESSAGES[result['status']]
+    
+    return response
+
+
+async def read_outage_record(area_key: str) -> Optional[Dict[str, Any]]:
+    """Read the current outage record for an exact area key.
+    
+    Args:
+        area_key: The area key (e.g. "sector-18").
+        
+    Returns:
+        The outage fields if the area has a record, None otherwise.
+    """
+    outage = find_outage_by_key(area_key)
+    return outage_fields(outage) if outage else None
+
+
+async def lookup_outage_by_location(
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    pin_code: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Look up the outages affecting a point or PIN code as structured data.
+    
+    Coordinates take precedence over the PIN code when both are given.
     
-    logger.debug(f"Generated outage response for area: {area}")
-    return response
\ No newline at end of file
+    Args:
+        latitude: Latitude in decimal degrees.
+        longitude: Longitude in decimal degrees.
+        pin_code: Six-digit PIN code.
+        
+    Returns:
+        A dictionary with a "found" flag, whether the location was
+        "resolved" to a service area, and the matching "outages".
+    """
+    if latitude is not None and longitude is not None:
+        logger.info("Checking outage for location: %s, %s", latitude, longitude)
+        query = f"{latitude}, {longitude}"
+        matches = find_blocks_by_location(latitude, longitude)
+    else:
+        logger.info("Checking outage for PIN code: %s", pin_code)
+        query = (pin_code or "").strip()
+        matches = [(area_key, None) for area_key in find_areas_by_pin_code(query) or []]
+    
+    outages = []
+    for area_key, block in matches:
+        outage = find_outage_by_key(area_key)
+        if outage:
+            outages.append({**outage_fields(outage), "block": block})
+    
+    DATA_LOOKUPS.inc("location", "hit" if outages else "miss")
+    return {
+        "found": bool(outages),
+        "query": query,
+        "resolved": bool(matches),
+        "outages": outages,
+    }
+
+
+def format_location_outages(result: Dict[str, Any], compact: bool = False) -> str:
+    """Format a structured location result as human-readable text.
+    
+    Args:
+        result: Result from lookup_outage_by_location.
+        compact: If True, omit the call-to-action sentences.
+        
+    Returns:
+        Formatted response string with outage information.
+    """
+    if not result["resolved"]:
+        return f"Error: '{result['query']}' is not within a service area we cover."
+    if not result["found"]:
+        return f"No outages are currently reported at {result['query']}."
+    
+    responses = []
+    for outage in result["outages"]:
+        response = format_outage({"found": True, **outage}, compact=compact)
+        if outage["block"]:
+            response = response.replace("\n", f"\n- Your Block: {outage['block']}\n", 1)
+        responses.append(response)
+    return "\n\n".join(responses)
+
+
+async def check_outage(area: str, compact: bool = False, region: Optional[str] = None) -> str:
+    """Check outage information for a given area.
+    
+    Args:
+        area: Area name to check.
+        compact: If True, omit the call-to-action sentences.
+        region: Region to search, if known.
+        
+    Returns:
+        Formatted response string with outage information.
+    """
+    response = format_outage(await lookup_outage(area, region=region), compact=compact)
+    logger.debug("Generated outage response for area: %s", area)
+    return response
+
+
+def _filters_digest(
+    statuses: Optional[Sequence[str]],
+    region: Optional[str],
+    eta_from: Optional[str],
+    eta_to: Optional[str],
+) -> str:
+    """Fingerprint a listing's filters, so a cursor only resumes the listing it came from."""
+    filters = [sorted(statuses) if statuses else None, region.lower() if region else None, eta_from, eta_to]
+    return hashlib.sha1(json.dumps(filters).encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_cursor(digest: str, eta: str, utility: str, area_key: str) -> str:
+    """Encode the position after which the next page starts."""
+    payload = json.dumps([digest, eta, utility, area_key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, digest: str) -> Optional[Tuple[str, str, str]]:
+    """Decode a cursor into its (ETA, utility, area key) position.
+    
+    Returns:
+        The position, or None if the cursor is malformed or belongs to a
+        listing with different filters.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if (
+        not isinstance(payload, list) or len(payload) != 4
+        or not all(isinstance(part, str) for part in payload) or payload[0] != digest
+    ):
+        return None
+    return payload[1], payload[2], payload[3]
+
+
+def _shard_after(utility: str, position: Optional[Tuple[str, str, str]]) -> Optional[Tuple[str, str]]:
+    """Translate a (ETA, utility, area key) position into one shard's (ETA, area key) position."""
+    if position is None:
+        return None
+    eta, after_utility, area_key = position
+    if utility < after_utility:
+        return eta, LAST_KEY
+    if utility > after_utility:
+        return eta, ""
+    return eta, area_key
+
+
+async def list_outages(
+    statuses: Optional[Sequence[str]] = None,
+    region: Optional[str] = None,
+    eta_from: Optional[str] = None,
+    eta_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """List a page of outages in order of estimated resolution time.
+    
+    Outages are ordered by (ETA, utility, area key) across the selected
+    shards. Each shard returns at most one page past the cursor from its
+    sorted index, so a page costs O(page size) per shard however many
+    outages match.
+    
+    Args:
+        statuses: Only these statuses, if given.
+        region: Only outages in this region, if given.
+        eta_from: Earliest estimated resolution time (ISO-8601, inclusive).
+        eta_to: Latest estimated resolution time (ISO-8601, inclusive).
+        cursor: The "next_cursor" of the previous page, to continue a listing.
+        limit: Maximum number of outages on the page.
+        
+    Returns:
+        A dictionary with the page's "outages", their "count" and a
+        "next_cursor" (None on the last page), or an "error" code
+        ("unknown_region", "invalid_time" or "invalid_cursor").
+    """
+    logger.info("Listing outages: statuses=%s region=%s eta_from=%s eta_to=%s", statuses, region, eta_from, eta_to)
+    
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    router = get_shard_router()
+    if region:
+        shard = router.for_region(region)
+        if shard is None:
+            return {"count": 0, "outages": [], "error": "unknown_region", "valid_regions": router.regions()}
+        shards = [shard]
+    else:
+        shards = router.shards
+    try:
+        eta_from = eta_key(eta_from) if eta_from else None
+        eta_to = eta_key(eta_to) if eta_to else None
+    except ValueError:
+        return {"count": 0, "outages": [], "error": "invalid_time"}
+    
+    digest = _filters_digest(statuses, region, eta_from, eta_to)
+    position = None
+    if cursor:
+        position = _decode_cursor(cursor, digest)
+        if position is None:
+            return {"count": 0, "outages": [], "error": "invalid_cursor"}
+    
+    # One extra row per shard tells whether anything follows this page
+    rows: List[Tuple[str, str, str, Dict[str, str]]] = []
+    
+    async def fetch(shard: Shard) -> None:
+        after = _shard_after(shard.spec.name, position)
+        page = await shard.list_outages(statuses, region, eta_from, eta_to, after, limit + 1)
+        rows.extend((eta, shard.spec.name, key, record) for eta, key, record in page)
+    
+    async with anyio.create_task_group() as tg:
+        for shard in shards:
+            tg.start_soon(fetch, shard)
+    rows.sort(key=lambda row: row[:3])
+    
+    page, more = rows[:limit], len(rows) > limit
+    next_cursor = _encode_cursor(digest, *page[-1][:3]) if more else None
+    DATA_LOOKUPS.inc("outage_list", "hit" if page else "miss")
+    return {
+        "count": len(page),
+        "outages": [
+            {**outage_fields(record), "utility": utility, "region": record.get("region")}
+            for _, utility, _, record in page
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+def format_outage_page(result: Dict[str, Any]) -> List[str]:
+    """Format a page of outages as one text block per outage.
+    
+    Args:
+        result: Result from list_outages.
+        
+    Returns:
+        The text blocks: a summary line, each outage, and the cursor for
+        the next page if there is one.
+    """
+    error = result.get("error")
+    if error == "unknown_region":
+        return [f"Error: Unknown region. Supported regions: {', '.join(result['valid_regions'])}."]
+    if error == "invalid_time":
+        return ["Error: eta_from and eta_to must be ISO-8601 times, e.g. 2025-04-14T16:30:00Z."]
+    if error == "invalid_cursor":
+        return ["Error: The cursor is invalid or belongs to a listing with different filters."]
+    if not result["count"]:
+        return ["No outages match these filters."]
+    
+    blocks = [f"{result['count']} outages, by estimated resolution time:"]
+    for outage in result["outages"]:
+        blocks.append(
+            f"{outage['area']} ({outage['outage_id']}): {outage['status'].upper()}, "
+            f"{outage['reason']}. Blocks: {outage['affected_blocks']}. "
+            f"Estimated resolution: {format_datetime(outage['eta'])}"
+        )
+    if result["next_cursor"]:
+        blocks.append(f"More outages match. Pass cursor \"{result['next_cursor']}\" for the next page.")
+    return blocks
@@ -0,0 +1,161 @@
+"""Service functions for bill estimates and batch bill computation."""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from electricity_service.data.billing_data import BillingStore, format_amount
+from electricity_service.data.tariff_data import TARIFFS, get_tariff
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BillBatch:
+    """Bill components in paise for an array of meters, row-aligned with the input."""
+    
+    energy: np.ndarray
+    fixed: np.ndarray
+    duty: np.ndarray
+    
+    @property
+    def total(self) -> np.ndarray:
+        """The total bill in paise."""
+        return self.energy + self.fixed + self.duty
+
+
+def compute_bills(
+    units: np.ndarray,
+    type_codes: np.ndarray,
+    type_names: Sequence[str],
+    load_kw: Optional[np.ndarray] = None,
+) -> BillBatch:
+    """Compute bills for whole arrays of consumption values.
+    
+    Meters are grouped by connection type and each group is priced with one
+    vectorized pass of its tariff, so the cost is a few array operations per
+    tariff regardless of the number of meters.
+    
+    Args:
+        units: Consumption in units per meter.
+        type_codes: Connection type code per meter, indexing type_names.
+        type_names: Connection type names, e.g. BillingStore.connection_types.
+        load_kw: Sanctioned load per meter; each tariff's default if omitted.
+        
+    Returns:
+        The bill components per meter.
+        
+    Raises:
+        ValueError: If a connection type has no tariff.
+    """
+    units = np.asarray(units, dtype=np.int64)
+    type_codes = np.asarray(type_codes)
+    energy = np.zeros(len(units), dtype=np.int64)
+    fixed = np.zeros(len(units), dtype=np.int64)
+    duty = np.zeros(len(units), dtype=np.int64)
+    for code, name in enumerate(type_names):
+        rows = np.flatnonzero(type_codes == code)
+        if not len(rows):
+            continue
+        tariff = get_tariff(name)
+        loads = tariff.default_load_kw if load_kw is None else np.asarray(load_kw)[rows]
+        energy[rows] = tariff.energy_charges(units[rows])
+        fixed[rows] = tariff.fixed_charges(np.broadcast_to(loads, rows.shape))
+        duty[rows] = tariff.duty(energy[rows])
+    return BillBatch(energy=energy, fixed=fixed, duty=duty)
+
+
+def compute_store_bills(store: BillingStore) -> BillBatch:
+    """Compute every meter's bill from the billing store's recorded consumption.
+    
+    Args:
+        store: The columnar billing store.
+        
+    Returns:
+        The bill components, row-aligned with the store.
+    """
+    return compute_bills(store.consumption_units, store.connection_type, store.connection_types)
+
+
+def estimate_bill(
+    units: int,
+    connection_type: str = "Domestic",
+    load_kw: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Estimate a monthly bill for a consumption as structured data.
+    
+    Args:
+        units: Monthly consumption in units (kWh).
+        connection_type: Connection type, e.g. "Domestic" or "Commercial".
+        load_kw: Sanctioned load in kW; the tariff's default if omitted.
+        
+    Returns:
+        A dictionary with the slab breakdown, fixed charge, duty and total,
+        with amounts both in paise and for display.
+        
+    Raises:
+        ValueError: If the connection type has no tariff.
+    """
+    logger.info("Estimating bill for %s units (%s)", units, connection_type)
+    tariff = get_tariff(connection_type)
+    load = tariff.default_load_kw if load_kw is None else load_kw
+    bill = compute_bills(np.array([units]), np.array([0]), [tariff.name], np.array([load]))
+    energy, fixed, duty, total = (int(bill.energy[0]), int(bill.fixed[0]), int(bill.duty[0]), int(bill.total[0]))
+    return {
+        "units": units,
+        "connection_type": tariff.name,
+        "load_kw": load,
+        "slabs": [
+            {
+                "from_units": start,
+                "to_units": end,
+                "units": slab_units,
+                "rate": format_amount(rate),
+                "amount": format_amount(slab_units * rate),
+            }
+            for start, end, slab_units, rate in tariff.slab_units(units)
+        ],
+        "energy_charge_paise": energy,
+        "fixed_charge_paise": fixed,
+        "duty_paise": duty,
+        "total_paise": total,
+        "energy_charge": format_amount(energy),
+        "fixed_charge": format_amount(fixed),
+        "duty": format_amount(duty),
+        "total": format_amount(total),
+    }
+
+
+def format_estimate(result: Dict[str, Any], compact: bool = False) -> str:
+    """Format a bill estimate as human-readable text.
+    
+    Args:
+        result: Result from estimate_bill.
+        compact: If True, omit the slab breakdown and closing note.
+        
+    Returns:
+        Formatted response string with the estimate.
+    """
+    response = f"Bill Estimate for {result['units']} units ({result['connection_type']}, {result['load_kw']:g} kW)\n"
+    if not compact:
+        for slab in result["slabs"]:
+            to_units = slab["to_units"] if slab["to_units"] is not None else "above"
+            response += (
+                f"  {slab['from_units']}-{to_units}: {slab['units']} units x {slab['rate']} = {slab['amount']}\n"
+            )
+    response += (
+        f"- Energy Charge: {result['energy_charge']}\n"
+        f"- Fixed Charge: {result['fixed_charge']}\n"
+        f"- Electricity Duty: {result['duty']}\n"
+        f"- Estimated Total: {result['total']}\n"
+    )
+    if not compact:
+        response += "\nThis is an estimate; your actual bill may include arrears, rebates or adjustments."
+    return response
+
+
+def get_connection_types() -> Sequence[str]:
+    """Get the connection types that have a tariff."""
+    return list(TARIFFS)
@@ -0,0 +1,72 @@
+"""Account tools: billing and outage status for a meter in one call."""
+
+import mcp.types as types
+
+from electricity_service.server.registry import COMPACT_PROPERTY, TOOLS, ToolContext, ToolResult
+from electricity_service.services.account_service import format_account_summary, lookup_account_summary
+from electricity_service.tools.billing_tools import BILLING_OUTPUT_SCHEMA
+from electricity_service.tools.outage_tools import OUTAGE_OUTPUT_SCHEMA
+
+ACCOUNT_SUMMARY_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["found", "meter_number"],
+    "properties": {
+        "found": {"type": "boolean"},
+        "meter_number": {"type": "string"},
+        "error": BILLING_OUTPUT_SCHEMA["properties"]["error"],
+        "billing": {
+            "type": "object",
+            "properties": {
+                field: schema for field, schema in BILLING_OUTPUT_SCHEMA["properties"].items()
+                if field not in ("found", "meter_number", "error", "service_area")
+            },
+        },
+        "service_area": {"type": ["string", "null"], "description": "Outage area key of the meter's feeder"},
+        "outage": {
+            "type": ["object", "null"],
+            "properties": {
+                field: schema for field, schema in OUTAGE_OUTPUT_SCHEMA["properties"].items()
+                if field not in ("found", "query", "error", "valid_regions")
+            },
+        },
+        "power_status": {
+            "type": "string",
+            "enum": ["ongoing", "scheduled", "resolved", "normal", "unknown"],
+            "description": "Outage status in the meter's service area",
+        },
+    },
+}
+
+
+@TOOLS.tool(
+    name="check_account_summary",
+    description=(
+        "Check a customer's power outage status and billing status together, by meter number. "
+        "Prefer this over separate billing and outage checks when the caller gives a meter number"
+    ),
+    input_schema={
+        "type": "object",
+        "required": ["meter_number"],
+        "properties": {
+            "meter_number": {
+                "type": "string",
+                "description": "10-digit meter number prefixed with the utility code (e.g. UP7284651023)",
+            },
+            "compact": COMPACT_PROPERTY,
+        },
+    },
+    output_schema=ACCOUNT_SUMMARY_OUTPUT_SCHEMA,
+)
+async def check_account_summary(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle check_account_summary tool calls.
+    
+    Args:
+        arguments: The validated arguments for the summary.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await lookup_account_summary(arguments["meter_number"])
+    text = format_account_summary(result, compact=arguments.get("compact", context.compact))
+    return [types.TextContent(type="text", text=text)], result
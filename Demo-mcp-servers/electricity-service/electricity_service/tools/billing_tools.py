@@ -0,0 +1,179 @@
+"""Billing tools: billing status by meter number and billing roll-ups."""
+
+import mcp.types as types
+
+from electricity_service.server.registry import COMPACT_PROPERTY, TOOLS, ToolContext, ToolResult
+from electricity_service.services.billing_service import (
+    format_billing,
+    format_meters_due,
+    format_overdue_summary,
+    lookup_billing,
+    lookup_meters_due,
+    summarize_overdue,
+)
+
+BILLING_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["found", "meter_number"],
+    "properties": {
+        "found": {"type": "boolean"},
+        "meter_number": {"type": "string"},
+        "error": {"type": "string", "enum": ["invalid_meter_number", "unknown_utility", "not_found"]},
+        "customer_name": {"type": "string"},
+        "status": {"type": "string", "enum": ["Pending", "Paid", "Overdue"]},
+        "connection_type": {"type": "string"},
+        "due_amount": {"type": "string"},
+        "due_date": {"type": "string"},
+        "days_until_due": {"type": "integer"},
+        "last_reading": {"type": "string"},
+        "consumption": {"type": "string"},
+        "service_area": {"type": "string", "description": "Outage area key of the feeder serving the meter"},
+    },
+}
+
+OVERDUE_SUMMARY_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["by_connection_type", "meters", "amount_paise", "amount"],
+    "properties": {
+        "by_connection_type": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["connection_type", "meters", "amount_paise", "amount"],
+                "properties": {
+                    "connection_type": {"type": "string"},
+                    "meters": {"type": "integer"},
+                    "amount_paise": {"type": "integer"},
+                    "amount": {"type": "string"},
+                },
+            },
+        },
+        "meters": {"type": "integer"},
+        "amount_paise": {"type": "integer"},
+        "amount": {"type": "string"},
+    },
+}
+
+METERS_DUE_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["days", "total", "truncated", "meters"],
+    "properties": {
+        "days": {"type": "integer"},
+        "connection_type": {"type": ["string", "null"]},
+        "total": {"type": "integer"},
+        "truncated": {"type": "boolean"},
+        "meters": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["meter_number", "due_date"],
+                "properties": {
+                    "meter_number": {"type": "string"},
+                    "utility": {"type": "string"},
+                    "customer_name": {"type": "string"},
+                    "connection_type": {"type": "string"},
+                    "due_amount": {"type": "string"},
+                    "due_date": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+
+@TOOLS.tool(
+    name="check_billing_status",
+    description="Check electricity billing status by meter number",
+    input_schema={
+        "type": "object",
+        "required": ["meter_number"],
+        "properties": {
+            "meter_number": {
+                "type": "string",
+                "description": "10-digit meter number prefixed with the utility code (e.g. UP7284651023)",
+            },
+            "compact": COMPACT_PROPERTY,
+        },
+    },
+    output_schema=BILLING_OUTPUT_SCHEMA,
+)
+async def check_billing_status(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle check_billing_status tool calls.
+    
+    Args:
+        arguments: The validated arguments for the billing check.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await lookup_billing(arguments["meter_number"])
+    text = format_billing(result, compact=arguments.get("compact", context.compact))
+    return [types.TextContent(type="text", text=text)], result
+
+
+@TOOLS.tool(
+    name="billing_overdue_summary",
+    description="Total overdue electricity bills by connection type",
+    input_schema={"type": "object", "required": [], "properties": {}},
+    output_schema=OVERDUE_SUMMARY_OUTPUT_SCHEMA,
+    lane="batch",
+)
+async def billing_overdue_summary(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle billing_overdue_summary tool calls.
+    
+    Args:
+        arguments: The validated arguments (none are accepted).
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await summarize_overdue()
+    return [types.TextContent(type="text", text=format_overdue_summary(result))], result
+
+
+@TOOLS.tool(
+    name="billing_meters_due",
+    description="List meters with unpaid bills falling due in the next N days",
+    input_schema={
+        "type": "object",
+        "required": ["days"],
+        "properties": {
+            "days": {
+                "type": "integer",
+                "minimum": 0,
+                "maximum": 365,
+                "description": "Number of days ahead to look, counted from today",
+            },
+            "connection_type": {
+                "type": "string",
+                "description": "Only include this connection type (e.g. Domestic, Commercial)",
+            },
+            "limit": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 500,
+                "description": "Maximum number of meters to list (default: 50)",
+            },
+        },
+    },
+    output_schema=METERS_DUE_OUTPUT_SCHEMA,
+    lane="batch",
+)
+async def billing_meters_due(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle billing_meters_due tool calls.
+    
+    Args:
+        arguments: The validated arguments for the lookup.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await lookup_meters_due(
+        arguments["days"],
+        connection_type=arguments.get("connection_type"),
+        limit=arguments.get("limit", 50),
+    )
+    return [types.TextContent(type="text", text=format_meters_due(result))], result
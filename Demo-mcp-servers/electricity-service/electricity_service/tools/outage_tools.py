@@ -0,0 +1,231 @@
+"""Outage tools: lookup by area name and by location, and paged listing."""
+
+import mcp.types as types
+
+from electricity_service.server.registry import COMPACT_PROPERTY, TOOLS, ToolContext, ToolResult
+from electricity_service.data.outage_data import OUTAGE_STATUSES
+from electricity_service.services.outage_service import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    lookup_outage,
+    format_outage,
+    lookup_outage_by_location,
+    format_location_outages,
+    list_outages as list_outage_page,
+    format_outage_page,
+)
+
+OUTAGE_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["found"],
+    "properties": {
+        "found": {"type": "boolean"},
+        "query": {"type": "string"},
+        "error": {"type": "string", "enum": ["unknown_region", "not_found"]},
+        "valid_regions": {"type": "array", "items": {"type": "string"}},
+        "outage_id": {"type": "string"},
+        "area": {"type": "string"},
+        "status": {"type": "string", "description": "ongoing, resolved or scheduled"},
+        "reason": {"type": "string"},
+        "affected_blocks": {"type": "string"},
+        "eta": {"type": "string", "description": "Estimated resolution, ISO-8601 UTC"},
+    },
+}
+
+LOCATION_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["found", "query", "resolved", "outages"],
+    "properties": {
+        "found": {"type": "boolean"},
+        "query": {"type": "string"},
+        "resolved": {"type": "boolean", "description": "Whether the location is inside a covered service area"},
+        "outages": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    **{
+                        field: schema for field, schema in OUTAGE_OUTPUT_SCHEMA["properties"].items()
+                        if field not in ("found", "query", "error", "valid_regions")
+                    },
+                    "block": {"type": ["string", "null"]},
+                },
+            },
+        },
+    },
+}
+
+LIST_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["count", "outages"],
+    "properties": {
+        "count": {"type": "integer"},
+        "error": {"type": "string", "enum": ["unknown_region", "invalid_time", "invalid_cursor"]},
+        "valid_regions": {"type": "array", "items": {"type": "string"}},
+        "next_cursor": {"type": ["string", "null"], "description": "Pass as cursor to get the next page"},
+        "outages": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    **{
+                        field: schema for field, schema in OUTAGE_OUTPUT_SCHEMA["properties"].items()
+                        if field not in ("found", "query", "error", "valid_regions")
+                    },
+                    "utility": {"type": "string"},
+                    "region": {"type": ["string", "null"]},
+                },
+            },
+        },
+    },
+}
+
+
+@TOOLS.tool(
+    name="check_outage",
+    description="Check electricity outage status for a given area or locality",
+    input_schema={
+        "type": "object",
+        "required": ["area"],
+        "properties": {
+            "area": {
+                "type": "string",
+                "description": "Area or locality name to check outage status (e.g. Sector 18, Rajendra Nagar)",
+            },
+            "region": {
+                "type": "string",
+                "description": "Region or city served by the utility (e.g. Noida); optional",
+            },
+            "compact": COMPACT_PROPERTY,
+        },
+    },
+    output_schema=OUTAGE_OUTPUT_SCHEMA,
+)
+async def check_outage(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle check_outage tool calls.
+    
+    Args:
+        arguments: The validated arguments for the outage check.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await lookup_outage(arguments["area"], region=arguments.get("region"))
+    text = format_outage(result, compact=arguments.get("compact", context.compact))
+    return [types.TextContent(type="text", text=text)], result
+
+
+@TOOLS.tool(
+    name="check_outage_by_location",
+    description="Check electricity outages at a caller's coordinates or PIN code",
+    input_schema={
+        "type": "object",
+        "required": [],
+        "properties": {
+            "latitude": {
+                "type": "number",
+                "minimum": -90,
+                "maximum": 90,
+                "description": "Latitude in decimal degrees (e.g. 28.5705)",
+            },
+            "longitude": {
+                "type": "number",
+                "minimum": -180,
+                "maximum": 180,
+                "description": "Longitude in decimal degrees (e.g. 77.3210)",
+            },
+            "pin_code": {
+                "type": "string",
+                "pattern": "^[0-9]{6}$",
+                "description": "Six-digit PIN code (e.g. 201301)",
+            },
+            "compact": COMPACT_PROPERTY,
+        },
+        "anyOf": [
+            {"required": ["latitude", "longitude"]},
+            {"required": ["pin_code"]},
+        ],
+    },
+    output_schema=LOCATION_OUTPUT_SCHEMA,
+)
+async def check_outage_by_location(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle check_outage_by_location tool calls.
+    
+    Args:
+        arguments: The validated arguments for the location check.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    has_point = "latitude" in arguments and "longitude" in arguments
+    result = await lookup_outage_by_location(
+        latitude=arguments["latitude"] if has_point else None,
+        longitude=arguments["longitude"] if has_point else None,
+        pin_code=arguments.get("pin_code"),
+    )
+    text = format_location_outages(result, compact=arguments.get("compact", context.compact))
+    return [types.TextContent(type="text", text=text)], result
+
+
+@TOOLS.tool(
+    name="list_outages",
+    description="List reported electricity outages page by page, ordered by estimated resolution time",
+    input_schema={
+        "type": "object",
+        "required": [],
+        "properties": {
+            "status": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(OUTAGE_STATUSES)},
+                "description": "Only outages with these statuses (e.g. [\"ongoing\", \"scheduled\"])",
+            },
+            "region": {
+                "type": "string",
+                "description": "Only outages in this region or city (e.g. Noida)",
+            },
+            "eta_from": {
+                "type": "string",
+                "description": "Only outages estimated to be resolved at or after this ISO-8601 time",
+            },
+            "eta_to": {
+                "type": "string",
+                "description": "Only outages estimated to be resolved at or before this ISO-8601 time",
+            },
+            "cursor": {
+                "type": "string",
+                "description": "next_cursor from the previous page, with the same filters",
+            },
+            "limit": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": MAX_PAGE_SIZE,
+                "description": f"Maximum number of outages per page (default: {DEFAULT_PAGE_SIZE})",
+            },
+        },
+    },
+    output_schema=LIST_OUTPUT_SCHEMA,
+)
+async def list_outages(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle list_outages tool calls.
+    
+    Each outage is returned as its own text content block, so a page is
+    never concatenated into one large string.
+    
+    Args:
+        arguments: The validated arguments for the listing.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = await list_outage_page(
+        statuses=arguments.get("status") or None,
+        region=arguments.get("region"),
+        eta_from=arguments.get("eta_from"),
+        eta_to=arguments.get("eta_to"),
+        cursor=arguments.get("cursor"),
+        limit=arguments.get("limit", DEFAULT_PAGE_SIZE),
+    )
+    return [types.TextContent(type="text", text=block) for block in format_outage_page(result)], result
@@ -0,0 +1,85 @@
+"""Tariff tools: monthly bill estimates."""
+
+import mcp.types as types
+
+from electricity_service.server.registry import COMPACT_PROPERTY, TOOLS, ToolContext, ToolResult
+from electricity_service.services.tariff_service import estimate_bill, format_estimate, get_connection_types
+
+ESTIMATE_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": ["units", "connection_type", "load_kw", "slabs", "total_paise", "total"],
+    "properties": {
+        "units": {"type": "integer"},
+        "connection_type": {"type": "string"},
+        "load_kw": {"type": "number"},
+        "slabs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "from_units": {"type": "integer"},
+                    "to_units": {"type": ["integer", "null"]},
+                    "units": {"type": "integer"},
+                    "rate": {"type": "string"},
+                    "amount": {"type": "string"},
+                },
+            },
+        },
+        "energy_charge_paise": {"type": "integer"},
+        "fixed_charge_paise": {"type": "integer"},
+        "duty_paise": {"type": "integer"},
+        "total_paise": {"type": "integer"},
+        "energy_charge": {"type": "string"},
+        "fixed_charge": {"type": "string"},
+        "duty": {"type": "string"},
+        "total": {"type": "string"},
+    },
+}
+
+
+@TOOLS.tool(
+    name="estimate_bill",
+    description="Estimate a monthly electricity bill for a given consumption in units (kWh)",
+    input_schema={
+        "type": "object",
+        "required": ["units"],
+        "properties": {
+            "units": {
+                "type": "integer",
+                "minimum": 0,
+                "maximum": 1000000,
+                "description": "Monthly consumption in units (kWh)",
+            },
+            "connection_type": {
+                "type": "string",
+                "enum": get_connection_types(),
+                "description": "Connection type (default: Domestic)",
+            },
+            "sanctioned_load_kw": {
+                "type": "number",
+                "minimum": 0,
+                "maximum": 10000,
+                "description": "Sanctioned load in kW (default depends on the connection type)",
+            },
+            "compact": COMPACT_PROPERTY,
+        },
+    },
+    output_schema=ESTIMATE_OUTPUT_SCHEMA,
+)
+async def estimate_bill_tool(arguments: dict, context: ToolContext) -> ToolResult:
+    """Handle estimate_bill tool calls.
+    
+    Args:
+        arguments: The validated arguments for the estimate.
+        context: Server-wide tool settings.
+        
+    Returns:
+        The text content together with the structured content.
+    """
+    result = estimate_bill(
+        arguments["units"],
+        connection_type=arguments.get("connection_type", "Domestic"),
+        load_kw=arguments.get("sanctioned_load_kw"),
+    )
+    text = format_estimate(result, compact=arguments.get("compact", context.compact))
+    return [types.TextContent(type="text", text=text)], result
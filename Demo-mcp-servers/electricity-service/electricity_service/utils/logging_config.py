@@ -0,0 +1,211 @@
+"""Non-blocking logging for the electricity service.
+
+Records are handed to a bounded in-memory queue and written by a background
+thread, so a slow or blocked stderr never stalls the event loop. As with
+QueueHandler, a record's arguments are merged into its message, and its
+traceback rendered, at the call site; only laying out the line and writing
+it happen in the writer thread. Log with %-style arguments, not f-strings,
+so records below the level are never rendered. When the queue is full new
+records are dropped and counted rather than waiting for space.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from electricity_service.utils.metrics import LOG_RECORDS_DROPPED
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+# Distinct message templates tracked for sampling before the counts restart
+_MAX_SAMPLED_TEMPLATES = 4096
+
+# Renders tracebacks when records are queued; the writer's formatters lay out the line
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line.
+
+    The object holds the time, level, logger name and message, any fields
+    passed with ``extra``, the sampling rate of sampled records and the
+    formatted traceback when there is one.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as a JSON line.
+
+        Args:
+            record: The record to format.
+
+        Returns:
+            The JSON text.
+        """
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every ``rate`` INFO records of each message template.
+
+    The first record of each template always passes, so one-off messages
+    are never lost, and records at any other level are never sampled. Kept
+    records carry a ``sample_rate`` attribute so readers can scale counts
+    back up.
+    """
+
+    def __init__(self, rate: int):
+        """Initialize the filter.
+
+        Args:
+            rate: Keep one in this many INFO records per template (1 keeps all).
+        """
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counts: Dict[Tuple[str, Any], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether to keep a record.
+
+        Args:
+            record: The record to check.
+
+        Returns:
+            True if the record should be logged.
+        """
+        if self.rate == 1 or record.levelno != logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= _MAX_SAMPLED_TEMPLATES:
+                self._counts.clear()
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.rate:
+            LOG_RECORDS_DROPPED.inc("sampled")
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue records for the writer thread without ever blocking."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render a copy of the record's message and traceback for the writer.
+
+        As in QueueHandler, the arguments are merged into the message and the
+        exception is rendered to ``exc_text``, so the queued record no longer
+        refers to objects the caller may change. Unlike QueueHandler, the line
+        itself is formatted in the writer thread.
+
+        Args:
+            record: The record to queue.
+
+        Returns:
+            The prepared copy.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue a record, dropping it if the queue is full.
+
+        Args:
+            record: The record to queue.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc("queue_full")
+
+
+class LogWriter(QueueListener):
+    """Queue listener whose stop gives up on a stuck stream instead of hanging."""
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write the queued records and stop the writer thread.
+
+        Args:
+            timeout: Seconds to wait for queue space and for the writer to finish.
+        """
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            # The writer's daemon thread is abandoned with whatever it still holds
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = False,
+    sample_rate: int = 1,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None,
+) -> LogWriter:
+    """Route all logging through a bounded queue and a writer thread.
+
+    Replaces the root logger's handlers. The writer is stopped, flushing
+    queued records, at interpreter exit, waiting a few seconds at most.
+
+    Args:
+        level: Root logging level name.
+        json_format: If True, write JSON lines instead of text.
+        sample_rate: Keep one in this many INFO records per message template.
+        queue_size: Records that may wait for the writer before new ones are dropped.
+        stream: Stream to write to; defaults to stderr, which stdio transport leaves free.
+
+    Returns:
+        The started writer.
+    """
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    if sample_rate > 1:
+        handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level))
+
+    writer = LogWriter(handler.queue, output, respect_handler_level=True)
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
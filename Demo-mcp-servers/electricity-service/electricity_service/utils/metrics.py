@@ -0,0 +1,262 @@
+"""Prometheus-style metrics for the electricity service.
+
+Metrics are updated from the event loop and from worker threads, so every
+read-modify-write of a value holds the metric's lock. Rendering works on
+copies so it can run from another thread.
+"""
+
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# The HTTP exporter is optional, so http.server is imported when it starts
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow backends
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str], extra: str = "") -> str:
+    """Format a label set as ``{name="value",...}``."""
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in zip(labelnames, labels)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """A monotonically increasing counter, optionally labelled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter for a label set."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Get the current value for a label set."""
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        """Render the counter's samples."""
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, optionally labelled."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """Decrement the gauge for a label set."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge for a label set."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """A histogram of observations in fixed buckets, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bucket], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation for a label set."""
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            counts[bucket] += 1
+            self._sums[labels] = self._sums.get(labels, 0.0) + value
+
+    def samples(self) -> List[str]:
+        """Render the histogram's cumulative buckets, sum and count."""
+        lines = []
+        with self._lock:
+            copies = [(labels, list(counts), self._sums.get(labels, 0.0)) for labels, counts in self._counts.items()]
+        for labels, counts, total in copies:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="{}"'.format("+Inf" if bound == float("inf") else repr(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+# A collector returns (name, kind, documentation, {labels: value}) families at render time
+Collector = Callable[[], Iterable[Tuple[str, str, str, Dict[Tuple[Tuple[str, str], ...], float]]]]
+
+
+class Registry:
+    """A set of metrics and collectors rendered together."""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric):
+        """Register a metric and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> Collector:
+        """Register a function producing metric families at render time."""
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collector in self._collectors:
+            for name, kind, documentation, values in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values.items():
+                    labelnames = [label for label, _ in labels]
+                    labelvalues = [str(v) for _, v in labels]
+                    lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_REQUESTS = REGISTRY.register(Counter(
+    "electricity_tool_requests_total", "Tool calls received.", ["tool"]
+))
+TOOL_ERRORS = REGISTRY.register(Counter(
+    "electricity_tool_errors_total", "Tool calls that failed, by error type.", ["tool", "error"]
+))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "electricity_tool_latency_seconds", "Tool call handling latency.", ["tool"]
+))
+TOOLS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "electricity_tool_in_flight", "Tool calls currently being handled.", ["tool"]
+))
+DATA_LOOKUPS = REGISTRY.register(Counter(
+    "electricity_data_lookups_total", "Data-layer lookups, by dataset and result.", ["dataset", "result"]
+))
+
+RESOURCE_SUBSCRIPTIONS = REGISTRY.register(Gauge(
+    "electricity_resource_subscriptions", "Live outage resource subscriptions."
+))
+RESOURCE_NOTIFICATIONS = REGISTRY.register(Counter(
+    "electricity_resource_notifications_total", "Resource notifications pushed, by result.", ["result"]
+))
+
+READINGS_INGESTED = REGISTRY.register(Counter(
+    "electricity_readings_total", "Meter readings ingested, by result.", ["result"]
+))
+READINGS_PENDING = REGISTRY.register(Gauge(
+    "electricity_readings_pending", "Meter readings logged but not yet applied."
+))
+READING_APPLY_LATENCY = REGISTRY.register(Histogram(
+    "electricity_reading_apply_seconds", "Time to apply one micro-batch of meter readings."
+))
+
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "electricity_admission_rejections_total", "Tool calls shed by admission control.", ["lane", "reason"]
+))
+ADMISSION_QUEUE = REGISTRY.register(Gauge(
+    "electricity_admission_queue_length", "Tool calls waiting for an execution slot.", ["lane"]
+))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "electricity_admission_wait_seconds", "Time queued tool calls waited for a slot.", ["lane"]
+))
+
+DB_QUERIES = REGISTRY.register(Counter(
+    "electricity_db_queries_total", "Database queries, by query and result.", ["query", "result"]
+))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "electricity_db_query_seconds", "Database query latency, including waiting for a connection.", ["query"]
+))
+
+STARTUP_SECONDS = REGISTRY.register(Gauge(
+    "electricity_startup_seconds", "Time from process start to the end of each startup phase.", ["phase"]
+))
+
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "electricity_log_records_dropped_total", "Log records discarded before being written, by reason.", ["reason"]
+))
+
+
+@REGISTRY.register_collector
+def _collect_process_metrics():
+    """Expose the server process's CPU time, e.g. for benchmark.py to measure a load window."""
+    return [
+        ("process_cpu_seconds_total", "counter", "User and system CPU time of the server process.",
+         {(): time.process_time()}),
+    ]
+
+
+def start_http_exporter(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> "ThreadingHTTPServer":
+    """Serve ``/metrics`` over HTTP from a daemon thread.
+
+    Args:
+        port: Port to listen on.
+        host: Interface to bind; defaults to localhost only.
+        registry: The registry to expose.
+
+    Returns:
+        The running HTTP server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the server's stderr log
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
@@ -1,6 +1,7 @@
 """Validation utilities for electricity service."""
 
-from typing import Pattern, Dict, Any, Tuple, Optional
+import re
+from typing import Pattern, Dict, Any, Tuple, Optional, Callable, List
 
 # This can be extended with more validation functions as needed
 
@@ -31,4 +32,152 @@ def validate_pattern(value: str, pattern: Pattern) -> bool:
     Returns:
         True if valid, False otherwise.
     """
-    return bool(pattern.match(value))
\ No newline at end of file
+    return bool(pattern.match(value))
+
+
+# Validates a value, returning an error message or None
+Validator = Callable[[Any], Optional[str]]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+# Keywords compile_schema checks, and annotations it accepts without checking
+_SUPPORTED_KEYWORDS = frozenset({
+    "type", "enum", "pattern", "minLength", "maxLength", "minimum", "maximum",
+    "properties", "required", "additionalProperties", "items", "anyOf",
+})
+_ANNOTATION_KEYWORDS = frozenset({"description", "title", "default", "examples"})
+
+
+def compile_schema(schema: Dict[str, Any], path: str = "") -> Validator:
+    """Compile a JSON Schema into a validator function.
+    
+    Supports the keywords used by the tool schemas: type, enum, pattern,
+    minLength, maxLength, minimum, maximum, properties, required,
+    additionalProperties (true or false), items and anyOf, plus the
+    annotations description, title, default and examples. Any other keyword
+    is rejected rather than silently left unchecked. All schema walking
+    happens here, once, so validating a value only runs the precompiled
+    checks.
+    
+    Args:
+        schema: The JSON Schema to compile.
+        path: Location of this schema in the value, used in error messages.
+        
+    Returns:
+        A function returning an error message for an invalid value, or
+        None for a valid one.
+        
+    Raises:
+        ValueError: If the schema uses an unsupported keyword or type.
+    """
+    checks: List[Validator] = []
+    where = f" at '{path}'" if path else ""
+
+    unsupported = sorted(set(schema) - _SUPPORTED_KEYWORDS - _ANNOTATION_KEYWORDS)
+    if unsupported:
+        raise ValueError(f"Unsupported JSON Schema keywords{where}: {', '.join(unsupported)}")
+    if schema.get("additionalProperties", True) not in (True, False):
+        raise ValueError(f"Only true or false is supported for additionalProperties{where}")
+
+    if "type" in schema:
+        type_names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        unknown = [t for t in type_names if t not in _TYPE_CHECKS]
+        if unknown:
+            raise ValueError(f"Unsupported JSON Schema type{where}: {', '.join(map(str, unknown))}")
+        type_checks = [_TYPE_CHECKS[t] for t in type_names]
+        expected = " or ".join(type_names)
+        checks.append(
+            lambda v: None if any(check(v) for check in type_checks) else f"{v!r} is not of type {expected}{where}"
+        )
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append(lambda v: None if v in allowed else f"{v!r} is not one of {allowed}{where}")
+
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+        checks.append(
+            lambda v: None if not isinstance(v, str) or regex.search(v)
+            else f"{v!r} does not match '{regex.pattern}'{where}"
+        )
+
+    for keyword, compare, message in (
+        ("minLength", lambda v, n: len(v) >= n, "is too short"),
+        ("maxLength", lambda v, n: len(v) <= n, "is too long"),
+    ):
+        if keyword in schema:
+            checks.append(
+                lambda v, n=schema[keyword], compare=compare, message=message:
+                None if not isinstance(v, str) or compare(v, n) else f"{v!r} {message}{where}"
+            )
+
+    for keyword, compare, message in (
+        ("minimum", lambda v, n: v >= n, "is less than the minimum of"),
+        ("maximum", lambda v, n: v <= n, "is greater than the maximum of"),
+    ):
+        if keyword in schema:
+            checks.append(
+                lambda v, n=schema[keyword], compare=compare, message=message:
+                None if not _TYPE_CHECKS["number"](v) or compare(v, n) else f"{v!r} {message} {n}{where}"
+            )
+
+    if "required" in schema and schema["required"]:
+        required = list(schema["required"])
+        checks.append(
+            lambda v: None if not isinstance(v, dict)
+            else next((f"'{key}' is a required property{where}" for key in required if key not in v), None)
+        )
+
+    if "properties" in schema or schema.get("additionalProperties") is False:
+        properties = {
+            key: compile_schema(subschema, f"{path}.{key}" if path else key)
+            for key, subschema in schema.get("properties", {}).items()
+        }
+        closed = schema.get("additionalProperties") is False
+
+        def check_properties(v: Any) -> Optional[str]:
+            if not isinstance(v, dict):
+                return None
+            for key, value in v.items():
+                validator = properties.get(key)
+                if validator is None:
+                    if closed:
+                        return f"Additional property '{key}' is not allowed{where}"
+                    continue
+                error = validator(value)
+                if error:
+                    return error
+            return None
+
+        checks.append(check_properties)
+
+    if "items" in schema:
+        item_validator = compile_schema(schema["items"], f"{path}[]")
+        checks.append(
+            lambda v: None if not isinstance(v, list)
+            else next((error for error in map(item_validator, v) if error), None)
+        )
+
+    if "anyOf" in schema:
+        options = [compile_schema(option, path) for option in schema["anyOf"]]
+        checks.append(
+            lambda v: None if any(option(v) is None for option in options)
+            else f"{v!r} is not valid under any of the given schemas{where}"
+        )
+
+    def validate(value: Any) -> Optional[str]:
+        for check in checks:
+            error = check(value)
+            if error:
+                return error
+        return None
+
+    return validate
@@ -1,23 +1,129 @@
-"""Main entry point for the electricity service."""
+"""Main entry point for the electricity service.
+
+Every stdio client spawns its own server process, so startup is on the
+caller's critical path: only click is imported here, the server stack is
+imported once options are parsed, optional features import their modules
+when enabled, and data is loaded on first use unless --prewarm is given.
+"""
+
+import time
+
+# Taken before any other import so reported startup times include them
+STARTED_AT = time.perf_counter()
 
 import sys
 import click
-from electricity_service.server.server import create_server, run_server
 
 @click.command()
 @click.option("--port", default=8000, help="Port value (unused for stdio transport)")
 @click.option("--transport", type=click.Choice(["stdio"]), default="stdio", help="Transport mechanism")
 @click.option("--log-level", type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"]), default="INFO", help="Logging level")
-def serve(port: int, transport: str, log_level: str):
+@click.option("--log-format", envvar="LOG_FORMAT", type=click.Choice(["text", "json"]), default="text", help="Log line format")
+@click.option("--log-sample", type=click.IntRange(min=1), default=1, help="Keep one in N INFO log records per message")
+@click.option("--log-queue-size", type=click.IntRange(min=1), default=10000, help="Log records buffered before new ones are dropped")
+@click.option("--outage-feed", envvar="OUTAGE_FEED_PATH", default=None, help="File or directory of outage delta JSON to watch")
+@click.option("--compact", is_flag=True, default=False, help="Omit call-to-action sentences from tool text output")
+@click.option("--negative-cache-ttl", type=float, default=0.0, help="Seconds to remember lookup misses (0 disables)")
+@click.option("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this local HTTP port")
+@click.option("--readings-dir", envvar="READINGS_DIR", default=None, help="Directory for the meter-reading log; enables ingestion")
+@click.option("--readings-file", default=None, help="Tail this file for meter-reading lines")
+@click.option("--readings-port", type=int, default=None, help="Accept meter-reading lines on this local TCP port")
+@click.option("--shards", envvar="SHARDS_CONFIG", default=None, help="JSON file listing additional utility shards")
+@click.option("--shard-workers", is_flag=True, default=False, help="Run every configured shard in its own process")
+@click.option("--max-concurrent", type=int, default=64, help="Tool calls executing at once across all clients")
+@click.option("--max-batch", type=int, default=32, help="Execution slots batch-lane calls may hold")
+@click.option("--max-per-session", type=int, default=8, help="Tool calls in flight per client session")
+@click.option("--session-rate", type=float, default=0.0, help="Tool calls per second per session (0 disables)")
+@click.option("--session-burst", type=float, default=20.0, help="Burst allowance for --session-rate")
+@click.option("--queue-size", type=int, default=128, help="Calls that may wait for a slot, per lane")
+@click.option("--queue-timeout", type=float, default=2.0, help="Seconds a call may wait for a slot")
+@click.option("--batch-clients", default="", help="Comma-separated client names whose calls use the batch lane")
+@click.option("--data-snapshot", envvar="DATA_SNAPSHOT", type=click.Path(exists=True, file_okay=False), default=None,
+              help="Load the built-in dataset from this prebuilt binary snapshot directory")
+@click.option("--prewarm", is_flag=True, default=False, help="Load data and build indexes before accepting requests")
+def serve(port: int, transport: str, log_level: str, log_format: str, log_sample: int, log_queue_size: int, outage_feed: str, compact: bool, negative_cache_ttl: float,
+          metrics_port: int, readings_dir: str, readings_file: str, readings_port: int, shards: str,
+          shard_workers: bool, max_concurrent: int, max_batch: int, max_per_session: int, session_rate: float,
+          session_burst: float, queue_size: int, queue_timeout: float, batch_clients: str, data_snapshot: str,
+          prewarm: bool):
     """Start the electricity service server."""
     # Configure logging
-    import logging
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    from electricity_service.utils.logging_config import configure_logging
+    configure_logging(
+        level=log_level,
+        json_format=log_format == "json",
+        sample_rate=log_sample,
+        queue_size=log_queue_size,
+    )
+    
+    from electricity_service.server.admission import AdmissionController, AdmissionLimits
+    from electricity_service.server.server import create_server, run_server
+    from electricity_service.server.subscriptions import OutageSubscriptions
+    from electricity_service.services.billing_service import BILLING_LOOKUPS
+    from electricity_service.services.outage_service import OUTAGE_LOOKUPS
+    from electricity_service.utils.metrics import STARTUP_SECONDS
+    
+    STARTUP_SECONDS.set(time.perf_counter() - STARTED_AT, "imports")
+    
+    if data_snapshot:
+        from electricity_service.data.billing_data import set_billing_loader
+        from electricity_service.data.outage_data import set_outage_loader
+        from electricity_service.data.snapshot import load_billing_snapshot, load_outage_snapshot, read_manifest
+        read_manifest(data_snapshot)
+        set_billing_loader(lambda: load_billing_snapshot(data_snapshot))
+        set_outage_loader(lambda: load_outage_snapshot(data_snapshot))
+    
+    OUTAGE_LOOKUPS.negative_ttl = negative_cache_ttl
+    BILLING_LOOKUPS.negative_ttl = negative_cache_ttl
+    
+    if metrics_port:
+        from electricity_service.utils.metrics import start_http_exporter
+        start_http_exporter(metrics_port)
+    
+    router = None
+    if shards:
+        from electricity_service.data.shards import configure_shards
+        router = configure_shards(shards, workers=shard_workers)
+    
+    ingestor = None
+    if readings_dir:
+        from electricity_service.data.meter_readings import ReadingIngestor
+        ingestor = ReadingIngestor(readings_dir)
+        if readings_file:
+            ingestor.add_file_source(readings_file)
+        if readings_port:
+            ingestor.add_socket_source(readings_port)
+    elif readings_file or readings_port:
+        raise click.UsageError("--readings-file and --readings-port require --readings-dir")
+    
+    admission = AdmissionController(
+        AdmissionLimits(
+            max_concurrent=max_concurrent,
+            max_batch=max_batch,
+            max_per_session=max_per_session,
+            session_rate=session_rate,
+            session_burst=session_burst,
+            queue_size=queue_size,
+            queue_timeout=queue_timeout,
+        ),
+        batch_clients=[name.strip() for name in batch_clients.split(",") if name.strip()],
     )
     
-    app = create_server()
-    return run_server(app)
+    subscriptions = OutageSubscriptions()
+    app = create_server(compact=compact, subscriptions=subscriptions, admission=admission)
+    try:
+        return run_server(
+            app,
+            outage_feed=outage_feed,
+            subscriptions=subscriptions,
+            ingestor=ingestor,
+            prewarm_data=prewarm,
+            started_at=STARTED_AT,
+        )
+    finally:
+        if router is not None:
+            router.close()
 
-sys.exit(serve())
\ No newline at end of file
+# Guarded so shard worker processes can import this module without starting a server
+if __name__ == "__main__":
+    sys.exit(serve())
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""Tests for single-flight coalescing and the negative cache, against a stand-in backend."""
+
+import anyio
+import pytest
+
+from electricity_service.data import outage_data
+from electricity_service.services.coalescing import SingleFlight
+from electricity_service.services.outage_service import OUTAGE_LOOKUPS, lookup_outage
+
+
+class StandInBackend:
+    """A backend whose fetches block until released and count how often they ran."""
+
+    def __init__(self, records=None):
+        self.records = records or {}
+        self.fetches = 0
+        self.release = anyio.Event()
+
+    async def fetch(self, key):
+        self.fetches += 1
+        await self.release.wait()
+        return self.records.get(key)
+
+
+def test_concurrent_lookups_share_one_fetch():
+    group = SingleFlight("test-share")
+    backend = StandInBackend({"sector-18": {"status": "ongoing"}})
+    results = []
+
+    async def lookup():
+        results.append(await group.do("sector-18", lambda: backend.fetch("sector-18")))
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            for _ in range(10):
+                tg.start_soon(lookup)
+            await anyio.wait_all_tasks_blocked()
+            backend.release.set()
+
+    anyio.run(main)
+    assert backend.fetches == 1
+    assert results == [{"status": "ongoing"}] * 10
+    assert group.stats.calls == 10
+    assert group.stats.coalesced == 9
+
+
+def test_errors_are_shared_with_followers():
+    group = SingleFlight("test-errors")
+    release = anyio.Event()
+    errors = []
+
+    async def failing_fetch():
+        await release.wait()
+        raise RuntimeError("backend down")
+
+    async def lookup():
+        try:
+            await group.do("key", failing_fetch)
+        except RuntimeError as e:
+            errors.append(e)
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(lookup)
+            await anyio.wait_all_tasks_blocked()
+            release.set()
+
+    anyio.run(main)
+    assert len(errors) == 3
+    assert group.stats.errors == 1
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    group = SingleFlight("test-cancel")
+    backend = StandInBackend({"key": "value"})
+    results = []
+
+    scopes = []
+
+    async def leader():
+        with anyio.CancelScope() as scope:
+            scopes.append(scope)
+            await group.do("key", lambda: backend.fetch("key"))
+
+    async def follower():
+        results.append(await group.do("key", lambda: backend.fetch("key")))
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(leader)
+            await anyio.wait_all_tasks_blocked()
+            tg.start_soon(follower)
+            await anyio.wait_all_tasks_blocked()
+            scopes[0].cancel()
+            await anyio.wait_all_tasks_blocked()
+            backend.release.set()
+
+    anyio.run(main)
+    # The follower retried as the new leader rather than inheriting the cancellation
+    assert results == ["value"]
+    assert backend.fetches == 2
+
+
+def test_negative_cache_remembers_misses_until_expiry_or_clear():
+    group = SingleFlight("test-negative", negative_ttl=0.2)
+    backend = StandInBackend()
+    backend.release.set()
+
+    async def main():
+        assert await group.do("atlantis", lambda: backend.fetch("atlantis")) is None
+        assert await group.do("atlantis", lambda: backend.fetch("atlantis")) is None
+        assert backend.fetches == 1
+        assert group.stats.negative_hits == 1
+
+        group.clear()
+        await group.do("atlantis", lambda: backend.fetch("atlantis"))
+        assert backend.fetches == 2
+
+        await anyio.sleep(0.25)
+        await group.do("atlantis", lambda: backend.fetch("atlantis"))
+        assert backend.fetches == 3
+
+    anyio.run(main)
+
+
+def test_negative_cache_is_bounded():
+    group = SingleFlight("test-bounded", negative_ttl=60, max_misses=3)
+    backend = StandInBackend()
+    backend.release.set()
+
+    async def main():
+        for i in range(10):
+            await group.do(f"missing-{i}", lambda: backend.fetch(None))
+
+    anyio.run(main)
+    assert list(group._misses) == ["missing-7", "missing-8", "missing-9"]
+
+
+@pytest.fixture
+def negative_outage_cache():
+    OUTAGE_LOOKUPS.negative_ttl = 60
+    OUTAGE_LOOKUPS.clear()
+    yield
+    OUTAGE_LOOKUPS.negative_ttl = 0.0
+    OUTAGE_LOOKUPS.clear()
+    outage_data.set_outage_loader(outage_data._load_builtin_snapshot)
+
+
+def test_published_outage_is_not_hidden_by_cached_miss(negative_outage_cache):
+    async def main():
+        assert (await lookup_outage("Atlantis"))["found"] is False
+        outage_data.apply_outage_update({
+            "atlantis": {
+                "status": "ongoing",
+                "reason": "Flooding",
+                "eta": "2025-04-14T18:00:00Z",
+                "area": "Atlantis",
+                "affected_blocks": "All",
+                "outage_id": "OUT-25041499",
+            },
+        })
+        result = await lookup_outage("Atlantis")
+        assert result["found"] is True
+        assert result["outage_id"] == "OUT-25041499"
+
+    anyio.run(main)
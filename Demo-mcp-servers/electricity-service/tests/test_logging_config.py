@@ -0,0 +1,40 @@
+"""Tests for the queued log writer."""
+
+import io
+import json
+import logging
+
+import pytest
+
+from electricity_service.utils.logging_config import configure_logging
+
+
+@pytest.fixture
+def log_output():
+    stream = io.StringIO()
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    writer = configure_logging(json_format=True, stream=stream)
+    yield writer, stream
+    writer.stop()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_records_are_rendered_when_queued(log_output):
+    writer, stream = log_output
+    logger = logging.getLogger("test.queue")
+    state = {"status": "pending"}
+    logger.info("Outage state: %s", state)
+    # Changing an argument after the call must not change the logged line
+    state["status"] = "resolved"
+    try:
+        raise RuntimeError("backend down")
+    except RuntimeError:
+        logger.exception("Lookup failed for %s", "sector-18")
+    writer.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["message"] == "Outage state: {'status': 'pending'}"
+    assert lines[1]["message"] == "Lookup failed for sector-18"
+    assert "RuntimeError: backend down" in lines[1]["exc_info"]
@@ -0,0 +1,51 @@
+"""Tests for meter-reading ingestion from a tailed file across restarts."""
+
+import anyio
+import pytest
+
+from electricity_service.data import billing_data
+from electricity_service.data.meter_readings import ReadingIngestor
+
+
+@pytest.fixture
+def meter():
+    yield next(iter(billing_data.BILLING_DATABASE))
+    billing_data.set_billing_loader(billing_data._load_builtin_store)
+
+
+def tail_once(directory, source, compact_every=1_000_000):
+    ingestor = ReadingIngestor(str(directory), apply_interval=0.02, compact_every=compact_every)
+    ingestor.add_file_source(str(source), poll_interval=0.02)
+    ingestor.recover()
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(ingestor.run)
+            await anyio.sleep(0.3)
+            tg.cancel_scope.cancel()
+
+    anyio.run(main)
+    return ingestor
+
+
+def last_reading(meter):
+    return billing_data.get_billing_store().record(meter)["last_reading"]
+
+
+@pytest.mark.parametrize("compact_every", [1_000_000, 1])
+def test_tailing_resumes_from_logged_offset(tmp_path, meter, compact_every):
+    source = tmp_path / "readings.txt"
+    source.write_text(f"{meter},100000\n")
+    tail_once(tmp_path / "wal", source, compact_every)
+    assert last_reading(meter) == "100000"
+
+    # Lines appended while the service is down are read after the restart
+    with open(source, "a") as f:
+        f.write(f"{meter},100500\n")
+    ingestor = tail_once(tmp_path / "wal", source, compact_every)
+    assert last_reading(meter) == "100500"
+    assert ingestor.source_offsets == {str(source): source.stat().st_size}
+
+    restarted = ReadingIngestor(str(tmp_path / "wal"))
+    restarted.recover()
+    assert restarted.source_offsets == {str(source): source.stat().st_size}
@@ -0,0 +1,50 @@
+"""Tests for the metrics registry and the outage feed's snapshot metrics."""
+
+import threading
+
+from electricity_service.data import outage_data, outage_feed
+from electricity_service.utils.metrics import Counter, Gauge, Histogram
+
+
+def test_concurrent_updates_are_not_lost():
+    counter = Counter("test_total", "Test counter.", ["kind"])
+    gauge = Gauge("test_gauge", "Test gauge.")
+    histogram = Histogram("test_seconds", "Test histogram.")
+
+    def update():
+        for _ in range(20000):
+            counter.inc("a")
+            gauge.inc()
+            gauge.dec(amount=2)
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=update) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value("a") == 80000
+    assert gauge.value() == -80000
+    assert histogram.samples()[-1] == "test_seconds_count 80000"
+
+
+def test_snapshot_size_is_computed_once_per_publish(monkeypatch):
+    sized = []
+    measure = outage_feed._snapshot_bytes
+    monkeypatch.setattr(outage_feed, "_snapshot_bytes", lambda snapshot: sized.append(snapshot) or measure(snapshot))
+
+    try:
+        outage_feed.push_outage_delta({"upsert": {"sector-18": {"status": "resolved"}}})
+        for _ in range(3):
+            outage_feed._collect_feed_metrics()
+        assert len(sized) == 1
+
+        # A publish that bypasses the feed is measured at the next scrape only
+        outage_data.apply_outage_update(removals=["sector-18"])
+        families = {name: values for name, _, _, values in outage_feed._collect_feed_metrics()}
+        outage_feed._collect_feed_metrics()
+        assert len(sized) == 2
+        assert families["electricity_outage_snapshot_bytes"][()] == measure(outage_data.get_outage_snapshot())
+    finally:
+        outage_data.set_outage_loader(outage_data._load_builtin_snapshot)
@@ -0,0 +1,22 @@
+"""Tests for building and updating outage snapshots."""
+
+from electricity_service.data.outage_data import OutageSnapshot
+
+RECORD = {
+    "status": "ongoing",
+    "reason": "Cable fault",
+    "eta": "2025-04-14T18:00:00Z",
+    "area": "Connaught Place",
+    "affected_blocks": "A-F",
+    "outage_id": "OUT-25041401",
+}
+
+
+def test_updates_keep_the_snapshot_keywords():
+    snapshot = OutageSnapshot.build({"connaught-place": RECORD}, version=1, keywords={"cp": "connaught-place"})
+
+    updated = snapshot.apply({"connaught-place": {"status": "resolved"}})
+
+    assert updated.version == 2
+    assert updated.find("CP")["status"] == "resolved"
+    assert dict(updated.keywords) == {"cp": "connaught-place"}
@@ -0,0 +1,95 @@
+"""Tests for shard routing and the billing roll-ups across shards."""
+
+import json
+from datetime import date, timedelta
+
+import anyio
+import pytest
+
+from electricity_service.data import shards
+from electricity_service.data.repository import create_database
+from electricity_service.data.shards import Shard, ShardRouter, ShardSpec, configure_shards
+from electricity_service.services.billing_service import lookup_meters_due, summarize_overdue
+
+
+def bill(days, status="Pending", amount="₹100.00", connection_type="Domestic"):
+    return {
+        "customer_name": f"Customer {days}",
+        "due_amount": amount,
+        "due_date": (date.today() + timedelta(days=days)).isoformat(),
+        "status": status,
+        "last_reading": "1000",
+        "consumption": "100 units",
+        "connection_type": connection_type,
+    }
+
+
+@pytest.fixture
+def router(tmp_path):
+    """The default shard, a JSON-backed Delhi shard and a database-backed Mumbai shard."""
+    delhi = {
+        "DL0000000001": bill(3),
+        "DL0000000002": bill(1, amount="₹250.50"),
+        "DL0000000003": bill(-5, amount="₹40.00", connection_type="Commercial"),
+        "DL0000000004": bill(2, status="Paid"),
+    }
+    mumbai = {
+        "MH0000000001": bill(2),
+        "MH0000000002": bill(0),
+        "MH0000000003": bill(-1, status="Overdue", amount="₹1,000.00"),
+    }
+    (tmp_path / "delhi.json").write_text(json.dumps(delhi), encoding="utf-8")
+    create_database(str(tmp_path / "mumbai.db"), mumbai, {})
+    (tmp_path / "shards.json").write_text(json.dumps({"shards": [
+        {"name": "delhi", "meter_prefixes": ["DL"], "regions": ["delhi"], "billing_path": "delhi.json"},
+        {"name": "mumbai", "meter_prefixes": ["MH"], "regions": ["mumbai"], "database_path": "mumbai.db"},
+    ]}), encoding="utf-8")
+
+    previous = shards._router
+    configured = configure_shards(str(tmp_path / "shards.json"))
+    yield configured
+    configured.close()
+    shards._router = previous
+
+
+def test_overdue_summary_adds_up_every_shard(router):
+    default = router.default.billing_store().overdue_by_connection_type()
+    result = anyio.run(summarize_overdue)
+    by_type = {row["connection_type"]: (row["meters"], row["amount_paise"]) for row in result["by_connection_type"]}
+    domestic_count, domestic_paise = default.get("Domestic", (0, 0))
+    commercial_count, commercial_paise = default.get("Commercial", (0, 0))
+    assert by_type["Domestic"] == (domestic_count + 1, domestic_paise + 100000)
+    assert by_type["Commercial"] == (commercial_count + 1, commercial_paise + 4000)
+
+
+def test_meters_due_merges_shards_by_due_date_before_the_limit(router):
+    result = anyio.run(lambda: lookup_meters_due(3, limit=3))
+    assert result["total"] == 4
+    assert result["truncated"] is True
+    assert [(row["meter_number"], row["utility"]) for row in result["meters"]] == [
+        ("MH0000000002", "mumbai"),
+        ("DL0000000002", "delhi"),
+        ("MH0000000001", "mumbai"),
+    ]
+    # Records come from the shard that matched them
+    assert result["meters"][1]["due_amount"] == "₹250.50"
+
+    commercial = anyio.run(lambda: lookup_meters_due(3, connection_type="Commercial"))
+    assert commercial["total"] == 0
+
+
+@pytest.mark.parametrize("prefix", ["UPX", "U", "U1"])
+def test_meter_prefixes_must_be_two_letters(prefix):
+    default = Shard(ShardSpec(name="default", meter_prefixes=("UP",)))
+    other = Shard(ShardSpec(name="other", meter_prefixes=(prefix,)))
+    with pytest.raises(ValueError, match="two letters"):
+        ShardRouter([default, other])
+
+
+def test_regions_match_whole_words():
+    default = Shard(ShardSpec(name="default", meter_prefixes=("UP",)))
+    delhi = Shard(ShardSpec(name="delhi", meter_prefixes=("DL",), regions=("delhi", "new delhi")))
+    router = ShardRouter([default, delhi])
+    assert router.for_area("Saket, Delhi") == (delhi, "saket")
+    assert router.for_area("Connaught Place, New Delhi") == (delhi, "connaught place")
+    assert router.for_area("Delhigate Market") == (default, "Delhigate Market")
@@ -0,0 +1,35 @@
+"""Tests for compiling JSON Schemas into validators."""
+
+import pytest
+
+from electricity_service.utils.validators import compile_schema
+
+
+def test_supported_schema_validates_values():
+    validate = compile_schema({
+        "type": "object",
+        "title": "Lookup",
+        "properties": {
+            "area": {"type": "string", "minLength": 1, "description": "Area name", "examples": ["Sector 18"]},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 50, "default": 10},
+        },
+        "required": ["area"],
+        "additionalProperties": False,
+    })
+    assert validate({"area": "Sector 18", "limit": 5}) is None
+    assert validate({"limit": 5}) == "'area' is a required property"
+    assert validate({"area": "Sector 18", "limit": 99}) == "99 is greater than the maximum of 50 at 'limit'"
+    assert validate({"area": "Sector 18", "page": 2}) == "Additional property 'page' is not allowed"
+
+
+@pytest.mark.parametrize("schema, message", [
+    ({"type": "string", "format": "date"}, "Unsupported JSON Schema keywords: format"),
+    ({"type": "object", "properties": {"ids": {"type": "array", "uniqueItems": True}}},
+     "Unsupported JSON Schema keywords at 'ids': uniqueItems"),
+    ({"type": "object", "additionalProperties": {"type": "string"}},
+     "Only true or false is supported for additionalProperties"),
+    ({"type": "date"}, "Unsupported JSON Schema type: date"),
+])
+def test_unsupported_schema_is_rejected_at_compile_time(schema, message):
+    with pytest.raises(ValueError, match=message):
+        compile_schema(schema)
@@ -1,7 +1,11 @@
+import logging
+import os
+import time
+
 from dotenv import load_dotenv
 
 from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions
+from livekit.agents import AgentSession, Agent, AgentStateChangedEvent, RoomInputOptions
 from livekit.plugins import (
     openai,
     cartesia,
@@ -11,7 +15,13 @@ from livekit.plugins import (
 )
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from telemetry import CallTelemetry, JsonlSink
+from tts_cache import CachedTTS
+from worker_load import WorkerLoad
+
 load_dotenv()
+logger = logging.getLogger("inbound-agent")
+logger.setLevel(logging.INFO)
 
 
 class Assistant(Agent):
@@ -19,16 +29,48 @@ class Assistant(Agent):
         super().__init__(instructions="You are a helpful voice AI assistant.")
 
 
+def prewarm(proc: agents.JobProcess):
+    # load the VAD once per worker process, before any job arrives, instead of on
+    # every call; the turn detector's model already runs in the worker's shared
+    # inference process, so each session only creates a lightweight handle to it
+    started = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    logger.info(f"prewarmed worker process in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def log_time_to_first_audio(session: AgentSession, started: float, label: str):
+    """Log the time from `started` until the agent first starts speaking"""
+
+    def on_agent_state_changed(ev: AgentStateChangedEvent):
+        if ev.new_state == "speaking":
+            session.off("agent_state_changed", on_agent_state_changed)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"{label}: {elapsed_ms:.0f}ms", extra={"setup_ms": round(elapsed_ms)})
+
+    session.on("agent_state_changed", on_agent_state_changed)
+
+
 async def entrypoint(ctx: agents.JobContext):
+    started = time.perf_counter()
     await ctx.connect()
 
     session = AgentSession(
         stt=deepgram.STT(model="nova-3", language="multi"),
         llm=openai.LLM(model="gpt-4.1-nano"),
-        tts=cartesia.TTS(),
-        vad=silero.VAD.load(),
+        # repeated sentences, such as the greeting, play from a disk cache
+        tts=CachedTTS(cartesia.TTS()),
+        vad=ctx.proc.userdata["vad"],
         turn_detection=MultilingualModel(),
     )
+    log_time_to_first_audio(session, started, f"call setup for room {ctx.room.name}, job start to first audio")
+    # per-turn latencies go to a JSONL file; a summary is written when the call ends
+    telemetry = CallTelemetry(
+        session,
+        JsonlSink(os.getenv("TELEMETRY_PATH", "telemetry.jsonl")),
+        call_id=ctx.room.name,
+        agent="my-telephony-agent",
+    )
+    ctx.add_shutdown_callback(telemetry.aclose)
 
     await session.start(
         room=ctx.room,
@@ -47,8 +89,19 @@ async def entrypoint(ctx: agents.JobContext):
 #     agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
 
 if __name__ == "__main__":
+    # stop taking calls before the CPU is saturated, so the calls already running stay responsive
+    worker_load = WorkerLoad(
+        max_calls=int(os.getenv("MAX_CONCURRENT_CALLS", "4")),
+        load_threshold=float(os.getenv("LOAD_THRESHOLD", "0.75")),
+        metrics_port=int(os.getenv("WORKER_METRICS_PORT") or 0) or None,
+        metrics_host=os.getenv("WORKER_METRICS_HOST", "127.0.0.1"),
+    )
     agents.cli.run_app(agents.WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        load_fnc=worker_load.load,
+        load_threshold=worker_load.load_threshold,
+        request_fnc=worker_load.request,
 
         # agent_name is required for explicit dispatch
         agent_name="my-telephony-agent"
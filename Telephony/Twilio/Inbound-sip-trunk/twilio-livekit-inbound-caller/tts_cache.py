@@ -0,0 +1,393 @@
+"""Disk-backed cache for synthesized speech.
+
+`CachedTTS` wraps a TTS plugin such as `cartesia.TTS()` and keeps the audio of
+the fixed sentences it synthesizes on local disk, keyed by the normalized
+text, the wrapped TTS's voice settings and its audio format. Repeated phrases
+such as greetings, transfer notices and the voicemail message then play from
+disk in milliseconds without a provider request.
+
+A streamed reply is split into sentences. A sentence found in the cache
+plays from disk; the others are streamed from the wrapped TTS as they arrive,
+each started as soon as its sentence is complete, and are cached once the
+whole sentence has been received. A reply whose first sentence is a stock
+phrase therefore starts playing at once even when the rest is new.
+
+Only fixed phrases are cached. A sentence with a digit (times, dates, phone
+numbers), a weekday or month name, or one of the `private_terms` the agent
+knows about, such as the callee's name, is synthesized every time and never
+written to disk. The cache is not encrypted: entries not played for
+`max_age_days` are deleted, and the least recently used entries are evicted
+once the cache outgrows its size limit. Audio is stored as raw 16-bit PCM in
+the wrapped TTS's sample rate, so hits are not decoded; several worker
+processes can share one cache directory.
+
+    tts=CachedTTS(cartesia.TTS(), private_terms=[patient_name])
+
+Run `python tts_cache.py` to compare a miss with a hit using an offline fake TTS.
+"""
+
+from __future__ import annotations
+
+import array
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections.abc import Iterable
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions, tokenize, tts, utils
+
+logger = logging.getLogger("tts-cache")
+
+# Option fields of the wrapped TTS that do not change the audio
+_IGNORED_OPTIONS = ("api_key", "base_url", "word_tokenizer", "http_session")
+
+# Sentences that are likely to be about one caller: digits, weekdays and months.
+# "May" is left out, since "May I..." is a stock phrase.
+_PERSONAL = re.compile(
+    r"\d|\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|today|tomorrow|tonight|"
+    r"january|february|march|april|june|july|august|september|october|november|december)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Text as used in cache keys: Unicode NFC with whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def voice_settings(wrapped: tts.TTS) -> dict:
+    """The wrapped TTS's options that shape its audio, such as model, voice and speed."""
+    options = getattr(wrapped, "_opts", None)
+    if options is None or not dataclasses.is_dataclass(options):
+        return {}
+    return {
+        field.name: getattr(options, field.name)
+        for field in dataclasses.fields(options)
+        if field.name not in _IGNORED_OPTIONS
+    }
+
+
+class AudioCache:
+    """PCM files in a directory, evicted least recently used first and deleted after `max_age` unused seconds."""
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            if time.time() - os.stat(self.path(key)).st_mtime > self.max_age:
+                os.remove(self.path(key))
+                return None
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+            # the modification time orders entries for eviction
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete expired entries, then the least recently used ones until the cache is at 90% of its limit.
+
+        The directory is rescanned because other processes share it.
+        """
+        entries = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".pcm")
+        )
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        expired = time.time() - self.max_age
+        for mtime, size, path in entries:
+            if self._size <= target and mtime >= expired:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+class CachedTTS(tts.TTS):
+    def __init__(
+        self,
+        wrapped: tts.TTS,
+        *,
+        cache_dir: str | None = None,
+        max_mb: float | None = None,
+        max_age_days: float | None = None,
+        max_text_chars: int = 300,
+        private_terms: Iterable[str] = (),
+        sentence_tokenizer: tokenize.SentenceTokenizer | None = None,
+    ):
+        """Cache the audio of a TTS on disk.
+
+        Args:
+            wrapped: The TTS to synthesize cache misses with.
+            cache_dir: Cache directory (default: TTS_CACHE_DIR or .tts-cache).
+            max_mb: Cache size limit in megabytes (default: TTS_CACHE_MAX_MB or 200).
+            max_age_days: Entries not played for this long are deleted (default: TTS_CACHE_MAX_AGE_DAYS or 30).
+            max_text_chars: Longer texts are synthesized but not cached.
+            private_terms: Texts containing any of these, such as the callee's name, are not cached.
+            sentence_tokenizer: Splits streamed replies into the sentences that are cached.
+        """
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=True),
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self._wrapped = wrapped
+        if max_age_days is None:
+            max_age_days = float(os.getenv("TTS_CACHE_MAX_AGE_DAYS", "30"))
+        self._cache = AudioCache(
+            cache_dir or os.getenv("TTS_CACHE_DIR", ".tts-cache"),
+            int((max_mb if max_mb is not None else float(os.getenv("TTS_CACHE_MAX_MB", "200"))) * 1024 * 1024),
+            max_age_days * 86400,
+        )
+        self._max_text_chars = max_text_chars
+        self._private_terms = [term.lower() for term in private_terms if term and term.strip()]
+        self._sentence_tokenizer = sentence_tokenizer or tokenize.basic.SentenceTokenizer()
+        self._settings = json.dumps(
+            {
+                "tts": type(wrapped).__module__ + "." + type(wrapped).__qualname__,
+                "sample_rate": wrapped.sample_rate,
+                "num_channels": wrapped.num_channels,
+                **voice_settings(wrapped),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._settings}\n{normalize_text(text)}".encode()).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        """Whether a normalized text is a fixed phrase: short, without digits, dates or private terms."""
+        if not 0 < len(text) <= self._max_text_chars or _PERSONAL.search(text):
+            return False
+        lowered = text.lower()
+        return not any(term in lowered for term in self._private_terms)
+
+    async def _lookup(self, text: str) -> tuple[str | None, bytes | None]:
+        """The cache key of a fixed phrase, or None, and its cached audio, if any."""
+        if not self.cacheable(text):
+            self.misses += 1
+            return None, None
+        key = self.cache_key(text)
+        audio = await asyncio.to_thread(self._cache.get, key)
+        if audio is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.debug(f"tts cache hit for {text!r}")
+        return key, audio
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CachedChunkedStream:
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> CachedSynthesizeStream:
+        return CachedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    def _synthesize_miss(self, text: str, conn_options: APIConnectOptions) -> tts.ChunkedStream | tts.SynthesizeStream:
+        """Start synthesizing a sentence with the wrapped TTS, streaming when it can."""
+        if not self._wrapped.capabilities.streaming:
+            return self._wrapped.synthesize(text, conn_options=conn_options)
+        stream = self._wrapped.stream(conn_options=conn_options)
+        stream.push_text(text)
+        stream.end_input()
+        return stream
+
+    def prewarm(self) -> None:
+        self._wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        await self._wrapped.aclose()
+
+
+class CachedChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._tts: CachedTTS = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+        )
+        key, audio = await cached_tts._lookup(normalize_text(self.input_text))
+        if audio is not None:
+            output_emitter.push(audio)
+            output_emitter.flush()
+            return
+
+        audio = bytearray()
+        async with cached_tts._wrapped.synthesize(self.input_text, conn_options=self._conn_options) as stream:
+            async for synthesized in stream:
+                data = synthesized.frame.data.tobytes()
+                output_emitter.push(data)
+                audio.extend(data)
+        output_emitter.flush()
+        if key and audio:
+            await asyncio.to_thread(cached_tts._cache.put, key, bytes(audio))
+
+
+class CachedSynthesizeStream(tts.SynthesizeStream):
+    def __init__(self, *, tts: CachedTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=conn_options)
+        self._tts: CachedTTS = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+        sentences = cached_tts._sentence_tokenizer.stream()
+        # the reply's sentences in order: cached audio, or a wrapped stream and the key to cache it under
+        queue: asyncio.Queue[tuple[bytes | tts.ChunkedStream | tts.SynthesizeStream, str | None] | None] = (
+            asyncio.Queue()
+        )
+        started: set[tts.ChunkedStream | tts.SynthesizeStream] = set()
+
+        async def forward_input():
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    sentences.flush()
+                else:
+                    sentences.push_text(data)
+            sentences.end_input()
+
+        async def look_up():
+            async for sentence in sentences:
+                text = normalize_text(sentence.token)
+                if not text:
+                    continue
+                key, audio = await cached_tts._lookup(text)
+                if audio is not None:
+                    queue.put_nowait((audio, None))
+                else:
+                    # synthesis starts now, while the sentences before it are still playing
+                    stream = cached_tts._synthesize_miss(sentence.token, self._conn_options)
+                    started.add(stream)
+                    queue.put_nowait((stream, key))
+            queue.put_nowait(None)
+
+        async def play():
+            while (item := await queue.get()) is not None:
+                source, key = item
+                if isinstance(source, bytes):
+                    output_emitter.push(source)
+                    continue
+                audio = bytearray()
+                async for synthesized in source:
+                    data = synthesized.frame.data.tobytes()
+                    output_emitter.push(data)
+                    audio.extend(data)
+                started.discard(source)
+                await source.aclose()
+                # only whole sentences are cached
+                if key and audio:
+                    await asyncio.to_thread(cached_tts._cache.put, key, bytes(audio))
+
+        tasks = [asyncio.create_task(forward_input()), asyncio.create_task(look_up()), asyncio.create_task(play())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await utils.aio.cancel_and_wait(*tasks)
+            await asyncio.gather(*(stream.aclose() for stream in started))
+        output_emitter.end_input()
+
+
+class FakeTTS(tts.TTS):
+    """Offline stand-in for a TTS provider: a tone as long as the text would take to say, after a delay."""
+
+    def __init__(self, *, sample_rate: int = 24000, delay: float = 0.4):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=sample_rate, num_channels=1)
+        self.delay = delay
+        self.requests = 0
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> FakeChunkedStream:
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: FakeTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._tts: FakeTTS = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        fake = self._tts
+        fake.requests += 1
+        await asyncio.sleep(fake.delay)
+        output_emitter.initialize(
+            request_id=utils.shortuuid(), sample_rate=fake.sample_rate, num_channels=1, mime_type="audio/pcm"
+        )
+        # about 60ms per character, as a 220Hz tone
+        samples = int(fake.sample_rate * 0.06 * len(self.input_text))
+        tone = array.array(
+            "h", (int(8000 * math.sin(2 * math.pi * 220 * i / fake.sample_rate)) for i in range(samples))
+        )
+        output_emitter.push(tone.tobytes())
+        output_emitter.flush()
+
+
+async def _compare_miss_and_hit(cache_dir: str):
+    cached = CachedTTS(FakeTTS(), cache_dir=cache_dir)
+    text = "Hello! I'm calling from the dental practice to confirm your appointment."
+    for label in ("miss", "hit"):
+        started = time.perf_counter()
+        first_frame_ms = None
+        stream = cached.stream()
+        stream.push_text(text)
+        stream.end_input()
+        async for _ in stream:
+            if first_frame_ms is None:
+                first_frame_ms = (time.perf_counter() - started) * 1000
+        await stream.aclose()
+        print(f"{label}: first audio after {first_frame_ms:.1f}ms")
+    print(f"provider requests: {cached._wrapped.requests}, hits: {cached.hits}, misses: {cached.misses}")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        asyncio.run(_compare_miss_and_hit(cache_dir))
@@ -0,0 +1,188 @@
+"""Load-aware admission for the inbound worker.
+
+Every call runs VAD and turn detection on the worker's CPU, so a worker that
+keeps accepting jobs slows down every call on the box, not just the new one.
+`WorkerLoad` gives the worker:
+
+- a load function for `WorkerOptions.load_fnc`: the higher of the measured
+  CPU utilization and the share of call slots in use, scaled so that a
+  worker running `max_calls` calls is exactly at `load_threshold`. LiveKit
+  stops sending jobs to a worker whose load reaches the threshold.
+- a request function for `WorkerOptions.request_fnc` that rejects a job when
+  the worker already runs `max_calls` calls or its CPU is over the
+  threshold. The dispatcher then offers the call to another worker. This
+  covers the seconds between load reports, when a burst of calls could
+  otherwise all land on the same worker.
+
+Load is logged once a minute and on every rejection. If `metrics_port` is
+set, it is also served as JSON at http://<metrics_host>:<port>/load; the
+host defaults to 127.0.0.1, so the endpoint is not exposed to the network.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+import psutil
+
+if TYPE_CHECKING:
+    from livekit.agents import JobRequest, Worker
+
+logger = logging.getLogger("worker-load")
+
+# an accepted job that has not shown up among the worker's active jobs after this long is forgotten
+_PENDING_TIMEOUT = 10.0
+
+
+class WorkerLoad:
+    def __init__(
+        self,
+        *,
+        max_calls: int,
+        load_threshold: float = 0.75,
+        metrics_port: int | None = None,
+        metrics_host: str = "127.0.0.1",
+        cpu_interval: float = 0.5,
+        cpu_samples: int = 6,
+        log_interval: float = 60.0,
+    ):
+        """Track a worker's CPU and calls and decide whether it takes another one.
+
+        Args:
+            max_calls: Most concurrent calls this worker runs.
+            load_threshold: Load, from 0 to 1, at which the worker is full;
+                pass the same value to `WorkerOptions.load_threshold`.
+            metrics_port: Serve the load as JSON on this port, if set.
+            metrics_host: Address to serve the load on.
+            cpu_interval: Seconds between CPU samples.
+            cpu_samples: CPU utilization is averaged over this many samples.
+            log_interval: Seconds between load log lines.
+
+        Raises:
+            ValueError: If `max_calls` is less than 1.
+        """
+        if max_calls < 1:
+            raise ValueError(f"max_calls must be at least 1, got {max_calls}; set MAX_CONCURRENT_CALLS accordingly")
+        self.max_calls = max_calls
+        self.load_threshold = load_threshold
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.accepted = 0
+        self.rejected = 0
+        self._cpu_interval = cpu_interval
+        self._cpu = collections.deque(maxlen=cpu_samples)
+        self._log_interval = log_interval
+        self._last_log = 0.0
+        self._worker: Worker | None = None
+        self._pending: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        """Start sampling CPU and, if configured, serving metrics; called on first use."""
+        if self._started:
+            return
+        self._started = True
+        psutil.cpu_percent()
+        threading.Thread(target=self._sample_cpu, name="worker-load-cpu", daemon=True).start()
+        if self.metrics_port:
+            server = ThreadingHTTPServer((self.metrics_host, self.metrics_port), self._handler())
+            threading.Thread(target=server.serve_forever, name="worker-load-http", daemon=True).start()
+            logger.info(f"serving worker load on http://{self.metrics_host}:{self.metrics_port}/load")
+
+    @property
+    def cpu(self) -> float:
+        """Average CPU utilization over the last samples, from 0 to 1."""
+        with self._lock:
+            return sum(self._cpu) / len(self._cpu) if self._cpu else 0.0
+
+    @property
+    def active_calls(self) -> int:
+        """Running calls plus accepted ones that have not started yet."""
+        running = {job.job.id for job in self._worker.active_jobs} if self._worker is not None else set()
+        now = time.monotonic()
+        with self._lock:
+            for job_id, accepted_at in list(self._pending.items()):
+                if job_id in running or now - accepted_at > _PENDING_TIMEOUT:
+                    del self._pending[job_id]
+            return len(running | self._pending.keys())
+
+    def load(self, worker: Worker) -> float:
+        """Load function for `WorkerOptions.load_fnc`."""
+        self._worker = worker
+        self.start()
+        if time.monotonic() - self._last_log >= self._log_interval:
+            self._last_log = time.monotonic()
+            self._log_load("worker load")
+        return self._load(self.cpu, self.active_calls)
+
+    async def request(self, req: JobRequest) -> None:
+        """Request function for `WorkerOptions.request_fnc`."""
+        self.start()
+        active, cpu = self.active_calls, self.cpu
+        if active >= self.max_calls or cpu >= self.load_threshold:
+            self.rejected += 1
+            self._log_load(f"rejecting job {req.id} for room {req.room.name}")
+            await req.reject()
+            return
+        with self._lock:
+            self._pending[req.id] = time.monotonic()
+        self.accepted += 1
+        await req.accept()
+
+    def snapshot(self) -> dict[str, Any]:
+        active = self.active_calls
+        cpu = self.cpu
+        return {
+            "load": round(self._load(cpu, active), 3),
+            "cpu": round(cpu, 3),
+            "active_calls": active,
+            "max_calls": self.max_calls,
+            "load_threshold": self.load_threshold,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
+
+    def _load(self, cpu: float, active_calls: int) -> float:
+        return min(max(cpu, self.load_threshold * active_calls / self.max_calls), 1.0)
+
+    def _log_load(self, message: str) -> None:
+        snapshot = self.snapshot()
+        logger.info(
+            f"{message}: load {snapshot['load']:.2f}, cpu {snapshot['cpu']:.0%}, "
+            f"{snapshot['active_calls']}/{self.max_calls} calls",
+            extra=snapshot,
+        )
+
+    def _sample_cpu(self) -> None:
+        while True:
+            # blocks for the interval and returns the utilization over it
+            sample = psutil.cpu_percent(interval=self._cpu_interval) / 100
+            with self._lock:
+                self._cpu.append(sample)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        worker_load = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/load":
+                    self.send_error(404)
+                    return
+                body = json.dumps(worker_load.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -5,19 +5,59 @@ import logging
 from dotenv import load_dotenv
 import json
 import os
+import time
 from typing import Any
 
 from livekit import rtc, api
-from livekit.agents import AgentSession, Agent, JobContext, function_tool, RunContext, get_job_context, cli, WorkerOptions
+from livekit.agents import AgentSession, Agent, AgentStateChangedEvent, JobContext, JobProcess, function_tool, RunContext, get_job_context, cli, WorkerOptions
 from livekit.plugins import deepgram, openai, cartesia, silero
 from livekit.plugins.turn_detector.english import EnglishModel
 
+from amd import AnsweringMachineDetector
+from availability import AvailabilityIndex, format_time, parse_date, parse_time, relevant_dates
+from telemetry import CallTelemetry, JsonlSink
+from tts_cache import CachedTTS
+
 # load environment variables, this is optional, only used for local development
 load_dotenv(dotenv_path=".env.local")
 logger = logging.getLogger("outbound-caller")
 logger.setLevel(logging.INFO)
 
 outbound_trunk_id = os.getenv("SIP_OUTBOUND_TRUNK_ID")
+calendars_path = os.getenv("AVAILABILITY_CALENDARS", "calendars.json")
+reservations_path = os.getenv("AVAILABILITY_DB", "reservations.db")
+# what to do when the callee's audio sounds like voicemail: leave the message, hang up, or "off" to leave it to the LLM
+amd_action = os.getenv("AMD_ACTION", "message")
+voicemail_message = os.getenv(
+    "VOICEMAIL_MESSAGE",
+    "Hello, this is the dental practice calling about your upcoming appointment. "
+    "Please call us back to confirm it. Thank you, and have a great day!",
+)
+# seconds of the callee's audio to wait for a decision, and for a voicemail greeting to end
+amd_timeout = float(os.getenv("AMD_TIMEOUT", "40"))
+
+
+async def report_call(lkapi: api.LiveKitAPI, room_name: str, outcome: str, *, ended: bool = False, **details: Any):
+    """Report how the call is going in the room metadata, where the campaign dispatcher polls for it"""
+    report = {"outcome": outcome, **details}
+    if ended:
+        report["ended"] = True
+    try:
+        await lkapi.room.update_room_metadata(
+            api.UpdateRoomMetadataRequest(room=room_name, metadata=json.dumps(report))
+        )
+    except Exception as e:
+        logger.warning(f"error reporting call outcome: {e}")
+
+
+def sip_outcome(e: api.TwirpError) -> str:
+    """Classify a call that was never answered by its SIP status, for the dispatcher's retry policy"""
+    status = e.metadata.get("sip_status_code")
+    if status in ("486", "600", "603"):
+        return "busy"
+    if status in ("408", "480", "487"):
+        return "no_answer"
+    return "failed"
 
 
 class OutboundCaller(Agent):
@@ -27,6 +67,7 @@ class OutboundCaller(Agent):
         name: str,
         appointment_time: str,
         dial_info: dict[str, Any],
+        availability: AvailabilityIndex,
     ):
         super().__init__(
             instructions=f"""
@@ -36,25 +77,41 @@ class OutboundCaller(Agent):
 
             When the user would like to be transferred to a human agent, first confirm with them. upon confirmation, use the transfer_call tool.
             The customer's name is {name}. His appointment is on {appointment_time}.
+            Today is {availability.today():%A, %Y-%m-%d}. Pass dates to the tools in YYYY-MM-DD format.
             """
         )
         # keep reference to the participant for transfers
         self.participant: rtc.RemoteParticipant | None = None
 
         self.dial_info = dial_info
+        self.availability = availability
+        self.patient_id = dial_info.get("patient_id") or dial_info["phone_number"]
+        # how the call went, reported to the campaign dispatcher
+        self.outcome = "answered"
 
     def set_participant(self, participant: rtc.RemoteParticipant):
         self.participant = participant
 
+    async def set_outcome(self, outcome: str, *, ended: bool = False):
+        """Record how the call went and report it to the campaign dispatcher"""
+        self.outcome = outcome
+        job_ctx = get_job_context()
+        await report_call(job_ctx.api, job_ctx.room.name, outcome, ended=ended)
+
     async def hangup(self):
-        """Helper function to hang up the call by deleting the room"""
+        """Helper function to hang up the call by removing the callee and leaving the room"""
 
         job_ctx = get_job_context()
-        await job_ctx.api.room.delete_room(
-            api.DeleteRoomRequest(
+        await self.set_outcome(self.outcome, ended=True)
+        # the room closes once everyone has left; deleting it outright could
+        # remove the final report before the dispatcher reads it
+        await job_ctx.api.room.remove_participant(
+            api.RoomParticipantIdentity(
                 room=job_ctx.room.name,
+                identity=self.participant.identity,
             )
         )
+        job_ctx.shutdown()
 
     @function_tool()
     async def transfer_call(self, ctx: RunContext):
@@ -80,6 +137,7 @@ class OutboundCaller(Agent):
             )
 
             logger.info(f"transferred call to {transfer_to}")
+            await self.set_outcome("transferred", ended=True)
         except Exception as e:
             logger.error(f"error transferring call: {e}")
             await ctx.session.generate_reply(instructions="there was an error transferring the call.")
@@ -106,12 +164,17 @@ class OutboundCaller(Agent):
         """Called when the user asks about alternative appointment availability
 
         Args:
-            date: The date of the appointment to check availability for
+            date: The date to check availability for, in YYYY-MM-DD format
         """
         logger.info(f"looking up availability for {self.participant.identity} on {date}")
-        await asyncio.sleep(3)
+        day = parse_date(date, self.availability.today())
+        if day is None:
+            return "could not understand the date, ask the user for a specific date"
+        # usually answered from memory, but a date outside the prefetched week reads the ledger
+        free = await asyncio.to_thread(self.availability.free_slots, day)
         return {
-            "available_times": ["1pm", "2pm", "3pm"],
+            "date": day.isoformat(),
+            "available_times": [format_time(start) for start in free],
         }
 
     @function_tool()
@@ -125,20 +188,108 @@ class OutboundCaller(Agent):
         Use this tool only when they are certain about the date and time.
 
         Args:
-            date: The date of the appointment
+            date: The date of the appointment, in YYYY-MM-DD format
             time: The time of the appointment
         """
         logger.info(f"confirming appointment for {self.participant.identity} on {date} at {time}")
-        return "reservation confirmed"
+        day = parse_date(date, self.availability.today())
+        start = parse_time(time)
+        if day is None or start is None:
+            return "could not understand the date or time, ask the user to repeat them"
+        reservation = await asyncio.to_thread(self.availability.reserve, day, start, self.patient_id)
+        if reservation is None:
+            free = await asyncio.to_thread(self.availability.free_slots, day)
+            available = [format_time(slot) for slot in free]
+            return {"reservation": "that time is not available", "available_times": available}
+        await self.set_outcome("confirmed")
+        return f"reservation confirmed with {reservation.provider_name}"
 
     @function_tool()
     async def detected_answering_machine(self, ctx: RunContext):
         """Called when the call reaches voicemail. Use this tool AFTER you hear the voicemail greeting"""
         logger.info(f"detected answering machine for {self.participant.identity}")
+        self.outcome = "voicemail"
         await self.hangup()
 
 
+async def screen_answering_machine(
+    session: AgentSession, agent: OutboundCaller, participant: rtc.RemoteParticipant
+) -> bool:
+    """Classify the first seconds of the callee's audio, and handle voicemail without the LLM.
+
+    The agent session does not hear the callee while this runs, so a machine's greeting
+    costs no STT or LLM time. Returns True if the call reached voicemail and was ended.
+    """
+    detector = AnsweringMachineDetector(16000)
+    session.input.set_audio_enabled(False)
+    stream = rtc.AudioStream.from_participant(
+        participant=participant,
+        track_source=rtc.TrackSource.SOURCE_MICROPHONE,
+        sample_rate=16000,
+        num_channels=1,
+    )
+
+    async def listen():
+        async for ev in stream:
+            decision = detector.push(ev.frame.data)
+            if decision is None:
+                continue
+            # to leave a message, keep listening until the greeting is over
+            if decision.label != "machine" or amd_action != "message" or detector.greeting_ended:
+                return
+
+    try:
+        await asyncio.wait_for(listen(), amd_timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await stream.aclose()
+
+    decision = detector.finish()
+    logger.info(
+        f"answering machine detection for {participant.identity}: {decision.label} ({decision.reason}) "
+        f"after {decision.at:.2f}s of audio",
+        extra={"amd": decision.label, "amd_reason": decision.reason, "amd_seconds": decision.at},
+    )
+    if decision.label != "machine":
+        session.input.set_audio_enabled(True)
+        # the callee's greeting was not heard by the session, so the agent speaks first
+        session.generate_reply(instructions="the patient has answered the phone, greet them and introduce yourself")
+        return False
+
+    agent.outcome = "voicemail"
+    if amd_action == "message":
+        # a fixed text, so after the first call it plays from the TTS cache
+        handle = session.say(voicemail_message, allow_interruptions=False, add_to_chat_ctx=False)
+        await handle.wait_for_playout()
+    await agent.hangup()
+    return True
+
+
+def prewarm(proc: JobProcess):
+    # load the VAD and calendars once per worker process, before any job arrives,
+    # rather than on every call; the turn detector's model already runs in the
+    # worker's shared inference process, so each session only creates a handle to it
+    started = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["availability"] = AvailabilityIndex.load(calendars_path, reservations_path)
+    logger.info(f"prewarmed worker process in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def log_time_to_first_audio(session: AgentSession, started: float, label: str):
+    """Log the time from `started` until the agent first starts speaking"""
+
+    def on_agent_state_changed(ev: AgentStateChangedEvent):
+        if ev.new_state == "speaking":
+            session.off("agent_state_changed", on_agent_state_changed)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"{label}: {elapsed_ms:.0f}ms", extra={"setup_ms": round(elapsed_ms)})
+
+    session.on("agent_state_changed", on_agent_state_changed)
+
+
 async def entrypoint(ctx: JobContext):
+    started = time.perf_counter()
     logger.info(f"connecting to room {ctx.room.name}")
     await ctx.connect()
 
@@ -147,30 +298,52 @@ async def entrypoint(ctx: JobContext):
     # dial_info is a dict with the following keys:
     # - phone_number: the phone number to dial
     # - transfer_to: the phone number to transfer the call to when requested
+    # calls dispatched by campaign.py also carry the patient's name and appointment_time
+    # and the sip_trunk_id to dial out on
     dial_info = json.loads(ctx.job.metadata)
     phone_number = dial_info["phone_number"]
     participant_identity = phone_number
 
+    # load the dates this call is likely to ask about while the phone rings
+    availability: AvailabilityIndex = ctx.proc.userdata["availability"]
+    prefetched = asyncio.create_task(
+        asyncio.to_thread(availability.prefetch, relevant_dates(dial_info, availability.today()))
+    )
+
     # look up the user's phone number and appointment details
+    name = dial_info.get("name") or "Jayden"
+    appointment_time = dial_info.get("appointment_time") or "next Tuesday at 3pm"
     agent = OutboundCaller(
-        name="Jayden",
-        appointment_time="next Tuesday at 3pm",
+        name=name,
+        appointment_time=appointment_time,
         dial_info=dial_info,
+        availability=availability,
     )
 
     # the following uses GPT-4o, Deepgram and Cartesia
     session = AgentSession(
         turn_detection=EnglishModel(),
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata["vad"],
         stt=deepgram.STT(),
-        # you can also use OpenAI's TTS with openai.TTS()
-        tts=cartesia.TTS(),
+        # you can also use OpenAI's TTS with openai.TTS(); repeated sentences
+        # are played from a disk cache instead of being synthesized again,
+        # except those naming the patient or their appointment
+        tts=CachedTTS(cartesia.TTS(), private_terms=[name, appointment_time]),
         # you can change this OpenAI's model
         llm=openai.LLM(model="gpt-4.1-nano"),
         # you can also use a speech-to-speech model like OpenAI's Realtime API
         # llm=openai.realtime.RealtimeModel()
     )
 
+    # per-turn latencies go to a JSONL file; a summary is written when the call ends
+    telemetry = CallTelemetry(
+        session,
+        JsonlSink(os.getenv("TELEMETRY_PATH", "telemetry.jsonl")),
+        call_id=ctx.room.name,
+        agent="outbound-caller",
+    )
+    ctx.add_shutdown_callback(telemetry.aclose)
+
     # start the session first before dialing, to ensure that when the user picks up
     # the agent does not miss anything the user says
     session_started = asyncio.create_task(
@@ -179,13 +352,16 @@ async def entrypoint(ctx: JobContext):
             room=ctx.room,
         )
     )
+    session_started.add_done_callback(
+        lambda _: logger.info(f"agent session ready {(time.perf_counter() - started) * 1000:.0f}ms after job start")
+    )
 
     # `create_sip_participant` starts dialing the user
     try:
         await ctx.api.sip.create_sip_participant(
             api.CreateSIPParticipantRequest(
                 room_name=ctx.room.name,
-                sip_trunk_id=outbound_trunk_id,
+                sip_trunk_id=dial_info.get("sip_trunk_id") or outbound_trunk_id,
                 sip_call_to=phone_number,
                 participant_identity=participant_identity,
                 # function blocks until user answers the call, or if the call fails
@@ -195,15 +371,24 @@ async def entrypoint(ctx: JobContext):
 
         # wait for the agent session start and participant join
         await session_started
+        await prefetched
         participant = await ctx.wait_for_participant(identity=participant_identity)
         logger.info(f"participant joined: {participant.identity}")
+        # the silence the callee hears before the agent's first words
+        log_time_to_first_audio(session, time.perf_counter(), f"call answered to first audio for {participant.identity}")
 
         agent.set_participant(participant)
+        await report_call(ctx.api, ctx.room.name, "answered")
+        if amd_action != "off":
+            await screen_answering_machine(session, agent, participant)
 
     except api.TwirpError as e:
         logger.error(
             f"error creating SIP participant: {e.message}, " f"SIP status: {e.metadata.get('sip_status_code')} " f"{e.metadata.get('sip_status')}"
         )
+        await report_call(
+            ctx.api, ctx.room.name, sip_outcome(e), ended=True, sip_status=e.metadata.get("sip_status_code")
+        )
         ctx.shutdown()
 
 
@@ -211,6 +396,7 @@ if __name__ == "__main__":
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
             agent_name="outbound-caller",
         )
     )
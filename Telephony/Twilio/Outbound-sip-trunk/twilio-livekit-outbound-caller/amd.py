@@ -0,0 +1,261 @@
+"""Answering machine detection from the first seconds of a call's audio.
+
+`AnsweringMachineDetector` classifies the callee's audio as it arrives, in
+20ms frames, without STT or an LLM:
+
+- an energy VAD, relative to the line's noise floor, splits the audio into
+  words: bursts of speech separated by short pauses
+- a person answers with a short greeting ("Hello?") and then waits; a
+  greeting that ends in a pause before `max_human_greeting` seconds is human
+- a voicemail greeting runs on: a greeting longer than that, or with more
+  than `max_human_words` words before a pause, is a machine
+- a beep, a pure tone of at least `beep_min` seconds, is a machine
+
+After a machine decision the detector keeps listening until the greeting
+ends, at the beep or after `message_silence` seconds of silence, which is
+when a message can be left. The decision is "unknown" when the callee says
+nothing; the caller should then treat the call as answered by a person.
+
+Classify recorded calls (16-bit PCM WAV) with:
+
+    python amd.py fixtures/human/*.wav fixtures/machine/*.wav
+
+Files in a directory named human or machine are scored against that label.
+The synthetic recordings in fixtures/ are made by fixtures/make_fixtures.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import wave
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+FRAME_SECONDS = 0.02
+LABELS = ("human", "machine")
+
+
+@dataclass
+class AmdSettings:
+    # frames this far above the noise floor, and above min_speech_db, are speech
+    noise_margin_db: float = 12.0
+    min_speech_db: float = -45.0
+    # bursts shorter than this are clicks, pauses shorter than word_gap do not split words
+    min_word: float = 0.1
+    word_gap: float = 0.15
+    # a greeting this short, followed by this much silence, is a person waiting for a reply
+    max_human_greeting: float = 2.0
+    max_human_words: int = 5
+    human_silence: float = 0.8
+    # undecided this long after answering, or without speech for max_initial_silence
+    max_initial_silence: float = 3.0
+    max_analysis: float = 5.0
+    # a tone between these frequencies, this long and this pure, is a beep
+    beep_min_hz: float = 300.0
+    beep_max_hz: float = 3000.0
+    beep_min: float = 0.14
+    beep_tonality: float = 0.85
+    # a machine greeting has ended after this much silence, or at the latest after max_greeting
+    message_silence: float = 1.5
+    max_greeting: float = 30.0
+
+
+@dataclass
+class Decision:
+    label: str
+    reason: str
+    # seconds of audio after which the decision was made
+    at: float
+    words: int
+    greeting: float
+    beep_at: float | None = None
+
+
+class AnsweringMachineDetector:
+    def __init__(self, sample_rate: int, settings: AmdSettings | None = None):
+        """Classify a call's 16-bit mono PCM audio at `sample_rate`, pushed as it arrives."""
+        self.sample_rate = sample_rate
+        self.settings = settings or AmdSettings()
+        self.frames = 0
+        self.words: list[tuple[float, float]] = []
+        self.beep_at: float | None = None
+        self.decision: Decision | None = None
+        self.greeting_ended_at: float | None = None
+        self._frame_len = int(sample_rate * FRAME_SECONDS)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._window = np.hanning(self._frame_len)
+        self._freqs = np.fft.rfftfreq(self._frame_len, 1 / sample_rate)
+        self._voice_band = (self._freqs >= 200) & (self._freqs <= 3400)
+        # start the floor just below the quietest speech, so a callee talking from the first
+        # frame is not taken for the line's noise
+        self._noise_db = self.settings.min_speech_db - self.settings.noise_margin_db
+        self._first_speech: float | None = None
+        self._last_speech: float | None = None
+        self._word_start: float | None = None
+        self._tone_frames = 0
+        self._tone_hz: float | None = None
+
+    @property
+    def now(self) -> float:
+        """Seconds of audio processed."""
+        return self.frames * FRAME_SECONDS
+
+    @property
+    def greeting_ended(self) -> bool:
+        """Whether a machine's greeting is over, so a message left now is recorded."""
+        return self.greeting_ended_at is not None
+
+    def push(self, pcm: bytes | memoryview | np.ndarray) -> Decision | None:
+        """Process more audio and return the decision, once there is one."""
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self._frame_len
+        for i in range(count):
+            self._process(samples[i * self._frame_len:(i + 1) * self._frame_len])
+        self._pending = samples[count * self._frame_len:]
+        return self.decision
+
+    def finish(self) -> Decision:
+        """The decision at the end of the audio; "unknown" if it was too short to decide."""
+        if self.decision is None:
+            self._decide("unknown", "end of audio")
+        return self.decision
+
+    def _process(self, frame: np.ndarray) -> None:
+        settings = self.settings
+        x = frame.astype(np.float64) / 32768
+        self.frames += 1
+        end = self.now
+        start = end - FRAME_SECONDS
+
+        energy_db = 10 * math.log10(max(float(np.mean(x * x)), 1e-12))
+        if energy_db < self._noise_db:
+            self._noise_db = energy_db
+        else:
+            # follow a rising floor slowly, so speech does not become the floor
+            self._noise_db += 0.02
+        speech = energy_db >= max(settings.min_speech_db, self._noise_db + settings.noise_margin_db)
+
+        self._track_tone(x if speech else None, end)
+        if speech:
+            if self._word_start is None:
+                self._word_start = start
+            self._last_speech = end
+            if self._first_speech is None and end - self._word_start >= settings.min_word:
+                self._first_speech = self._word_start
+        elif self._word_start is not None and end - self._last_speech >= settings.word_gap:
+            if self._last_speech - self._word_start >= settings.min_word:
+                self.words.append((self._word_start, self._last_speech))
+            self._word_start = None
+
+        if self.decision is None:
+            self._classify()
+        elif self.decision.label == "machine" and self.greeting_ended_at is None:
+            beep_over = self.beep_at is not None and self._tone_frames == 0
+            silent = self._last_speech is None or end - self._last_speech >= settings.message_silence
+            if beep_over or silent or end - self.decision.at >= settings.max_greeting:
+                self.greeting_ended_at = round(end, 2)
+
+    def _track_tone(self, x: np.ndarray | None, end: float) -> None:
+        """Count consecutive frames of one pure tone; a long enough run is a beep."""
+        settings = self.settings
+        hz = None
+        if x is not None:
+            spectrum = np.abs(np.fft.rfft(x * self._window)) ** 2
+            peak = int(np.argmax(np.where(self._voice_band, spectrum, 0)))
+            total = float(spectrum[self._voice_band].sum())
+            tonality = float(spectrum[max(peak - 2, 0):peak + 3].sum()) / total if total else 0.0
+            if tonality >= settings.beep_tonality and settings.beep_min_hz <= self._freqs[peak] <= settings.beep_max_hz:
+                hz = float(self._freqs[peak])
+        bin_hz = self._freqs[1]
+        if hz is not None and self._tone_hz is not None and abs(hz - self._tone_hz) <= 2 * bin_hz:
+            self._tone_frames += 1
+        else:
+            self._tone_frames = 1 if hz is not None else 0
+            self._tone_hz = hz
+        if self.beep_at is None and self._tone_frames * FRAME_SECONDS >= settings.beep_min:
+            self.beep_at = round(end - self._tone_frames * FRAME_SECONDS, 2)
+
+    def _classify(self) -> None:
+        settings = self.settings
+        now = self.now
+        if self.beep_at is not None:
+            self._decide("machine", "beep")
+        elif self._first_speech is None:
+            if now >= settings.max_initial_silence:
+                self._decide("unknown", "silence")
+        elif self._last_speech - self._first_speech > settings.max_human_greeting:
+            self._decide("machine", "long greeting")
+        elif self._word_count() > settings.max_human_words:
+            self._decide("machine", "many words")
+        elif now - self._last_speech >= settings.human_silence:
+            self._decide("human", "short greeting")
+        if self.decision is None and now >= settings.max_analysis:
+            self._decide("unknown", "undecided")
+
+    def _word_count(self) -> int:
+        current = self._word_start is not None and self._last_speech - self._word_start >= self.settings.min_word
+        return len(self.words) + int(current)
+
+    def _decide(self, label: str, reason: str) -> None:
+        greeting = self._last_speech - self._first_speech if self._first_speech is not None else 0.0
+        self.decision = Decision(
+            label=label,
+            reason=reason,
+            at=round(self.now, 2),
+            words=self._word_count(),
+            greeting=round(greeting, 2),
+            beep_at=self.beep_at,
+        )
+
+
+def classify_wav(path: str, settings: AmdSettings | None = None) -> Decision:
+    """Classify a recorded call; the first channel of a 16-bit PCM WAV file is used."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM, got {8 * f.getsampwidth()}-bit samples")
+        channels = f.getnchannels()
+        detector = AnsweringMachineDetector(f.getframerate(), settings)
+        while detector.decision is None:
+            data = f.readframes(f.getframerate() // 10)
+            if not data:
+                break
+            detector.push(np.frombuffer(data, dtype=np.int16)[::channels])
+    return detector.finish()
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Classify recorded calls as answered by a human or a machine.")
+    parser.add_argument("files", nargs="+", help="16-bit PCM WAV files")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per file")
+    args = parser.parse_args(argv)
+
+    scored = correct = 0
+    for path in args.files:
+        decision = classify_wav(path)
+        expected = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        if expected in LABELS:
+            scored += 1
+            correct += decision.label == expected
+        if args.json:
+            print(json.dumps({"file": path, **asdict(decision)}))
+            continue
+        beep = f", beep at {decision.beep_at:.2f}s" if decision.beep_at is not None else ""
+        mark = "" if expected not in LABELS else ("  ok" if decision.label == expected else f"  expected {expected}")
+        print(
+            f"{path}: {decision.label} ({decision.reason}) after {decision.at:.2f}s, "
+            f"{decision.words} words over {decision.greeting:.2f}s{beep}{mark}"
+        )
+    if scored and not args.json:
+        print(f"{correct}/{scored} labelled files classified correctly")
+    return 0 if correct == scored else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
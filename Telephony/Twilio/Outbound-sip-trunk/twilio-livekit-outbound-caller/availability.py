@@ -0,0 +1,383 @@
+"""Appointment availability for the outbound caller.
+
+Provider calendars are loaded into an in-memory interval index when the
+worker starts, so availability questions are answered without a round trip
+while the patient waits on the line. The index keeps, per provider and
+date, the sorted busy intervals and the free slot start times derived from
+them.
+
+Appointments booked on calls are written to a SQLite reservation ledger
+shared by every job process on the machine. Slots are aligned to a fixed
+grid and a reservation is a row keyed by provider, date and start, so when
+two calls confirm the same slot only one insert succeeds: a slot can never
+be double-booked. When a patient whose appointment comes from the calendars
+books a new time, the calendar booking is recorded as released in the same
+transaction and its slot is offered again. Reservations and releases made by
+other processes are merged into the index when a call prefetches its dates
+and again before every reservation.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("availability")
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    provider_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start_minute INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL,
+    patient_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (provider_id, day, start_minute)
+);
+CREATE INDEX IF NOT EXISTS reservations_by_patient ON reservations (patient_id);
+CREATE TABLE IF NOT EXISTS released (
+    provider_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start_minute INTEGER NOT NULL,
+    patient_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (provider_id, day, start_minute)
+);
+"""
+
+
+@dataclass(frozen=True)
+class Provider:
+    provider_id: str
+    name: str
+    # working intervals in minutes after midnight, by weekday (0 is Monday)
+    hours: dict[int, tuple[tuple[int, int], ...]]
+    closed: frozenset[date]
+
+
+@dataclass(frozen=True)
+class Booking:
+    start: int
+    end: int
+    patient_id: str
+
+
+@dataclass(frozen=True)
+class Reservation:
+    provider_id: str
+    provider_name: str
+    day: date
+    start: int
+    end: int
+    # True when the slot was already the patient's own appointment
+    existing: bool = False
+
+
+class AvailabilityIndex:
+    """Free appointment slots of every provider, answered from memory."""
+
+    def __init__(
+        self,
+        providers: list[Provider],
+        bookings: dict[tuple[str, date], list[Booking]],
+        *,
+        timezone: str,
+        slot_minutes: int,
+        ledger_path: str,
+    ):
+        self.providers = {provider.provider_id: provider for provider in providers}
+        self.timezone = ZoneInfo(timezone)
+        self.slot_minutes = slot_minutes
+        # bookings from the calendars, and from the ledger as last synced, sorted by start
+        self._calendar = {key: sorted(items, key=lambda b: b.start) for key, items in bookings.items()}
+        self._calendar_by_patient: dict[str, list[tuple[str, date, Booking]]] = {}
+        for (provider_id, day), items in self._calendar.items():
+            for booking in items:
+                if booking.patient_id:
+                    self._calendar_by_patient.setdefault(booking.patient_id, []).append((provider_id, day, booking))
+        self._reserved: dict[tuple[str, date], list[Booking]] = {}
+        # starts of calendar bookings released by rescheduling, as last synced
+        self._released: dict[tuple[str, date], frozenset[int]] = {}
+        self._free: dict[tuple[str, date], list[int]] = {}
+        self._synced: set[date] = set()
+        self._lock = threading.Lock()
+        self._ledger = sqlite3.connect(ledger_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        _use_wal(self._ledger, timeout=5.0)
+        self._ledger.executescript(LEDGER_SCHEMA)
+
+    @classmethod
+    def load(cls, calendars_path: str, ledger_path: str) -> AvailabilityIndex:
+        """Build the index from a calendars JSON file (see calendars-example.json)."""
+        started = time.perf_counter()
+        with open(calendars_path, encoding="utf-8") as f:
+            calendars = json.load(f)
+        providers = []
+        bookings: dict[tuple[str, date], list[Booking]] = {}
+        for entry in calendars["providers"]:
+            hours = {
+                WEEKDAYS.index(day): tuple(_parse_interval(interval) for interval in intervals)
+                for day, intervals in entry.get("hours", {}).items()
+            }
+            closed = frozenset(date.fromisoformat(day) for day in entry.get("closed", []))
+            providers.append(Provider(entry["id"], entry.get("name", entry["id"]), hours, closed))
+            for booked in entry.get("booked", []):
+                start, end = datetime.fromisoformat(booked["start"]), datetime.fromisoformat(booked["end"])
+                bookings.setdefault((entry["id"], start.date()), []).append(
+                    Booking(_minutes(start), _minutes(end), booked.get("patient_id", ""))
+                )
+        index = cls(
+            providers,
+            bookings,
+            timezone=calendars.get("timezone", "UTC"),
+            slot_minutes=calendars.get("slot_minutes", 30),
+            ledger_path=ledger_path,
+        )
+        logger.info(
+            f"loaded {len(providers)} provider calendars in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return index
+
+    def today(self) -> date:
+        return datetime.now(self.timezone).date()
+
+    def prefetch(self, days: Iterable[date]) -> None:
+        """Sync the ledger for these dates and compute their free slots ahead of the questions."""
+        with self._lock:
+            for day in days:
+                self._sync(day)
+                for provider_id in self.providers:
+                    self._free_for(provider_id, day)
+
+    def free_slots(self, day: date) -> list[int]:
+        """Start times, in minutes after midnight, at which any provider is free on a date."""
+        with self._lock:
+            if day not in self._synced:
+                self._sync(day)
+            starts = sorted({start for provider_id in self.providers for start in self._free_for(provider_id, day)})
+        now = datetime.now(self.timezone)
+        if day < now.date():
+            return []
+        if day == now.date():
+            starts = starts[bisect.bisect_right(starts, _minutes(now)):]
+        return starts
+
+    def reserve(self, day: date, start: int, patient_id: str) -> Reservation | None:
+        """Book the slot starting at `start` for a patient, or return None if it is taken.
+
+        A patient holds at most one appointment: reserving a new slot deletes
+        their previous reservation from the ledger and records their upcoming
+        calendar bookings as released, in the same transaction.
+        """
+        own = self._own_booking(day, start, patient_id)
+        if own is not None:
+            return own
+        now = datetime.now(self.timezone)
+        if (day, start) <= (now.date(), _minutes(now)):
+            return None
+        with self._lock:
+            self._sync(day)
+            candidates = [
+                provider_id for provider_id in self.providers
+                if _contains(self._free_for(provider_id, day), start)
+            ]
+        end = start + self.slot_minutes
+        today = now.date()
+        calendar = [
+            (booked_provider, booked_day, booking)
+            for booked_provider, booked_day, booking in self._calendar_by_patient.get(patient_id, [])
+            if booked_day >= today
+        ]
+        for provider_id in candidates:
+            with self._lock:
+                try:
+                    self._ledger.execute("BEGIN IMMEDIATE")
+                    previous = self._ledger.execute(
+                        "SELECT provider_id, day FROM reservations WHERE patient_id = ?", (patient_id,)
+                    ).fetchall()
+                    self._ledger.execute("DELETE FROM reservations WHERE patient_id = ?", (patient_id,))
+                    self._ledger.executemany(
+                        "INSERT OR IGNORE INTO released VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (booked_provider, booked_day.isoformat(), booking.start, patient_id, time.time())
+                            for booked_provider, booked_day, booking in calendar
+                        ],
+                    )
+                    self._ledger.execute(
+                        "INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?)",
+                        (provider_id, day.isoformat(), start, end, patient_id, time.time()),
+                    )
+                    self._ledger.execute("COMMIT")
+                except sqlite3.IntegrityError:
+                    # another call booked this provider's slot first
+                    self._ledger.execute("ROLLBACK")
+                    continue
+                except BaseException:
+                    self._ledger.execute("ROLLBACK")
+                    raise
+                for _, previous_day in previous:
+                    self._sync(date.fromisoformat(previous_day))
+                for _, booked_day, _ in calendar:
+                    self._sync(booked_day)
+                self._sync(day)
+            provider = self.providers[provider_id]
+            return Reservation(provider_id, provider.name, day, start, end)
+        return None
+
+    def _own_booking(self, day: date, start: int, patient_id: str) -> Reservation | None:
+        """The patient's existing appointment at this time, if it is one."""
+        with self._lock:
+            if day not in self._synced:
+                self._sync(day)
+            for provider_id, provider in self.providers.items():
+                key = (provider_id, day)
+                for booking in self._bookings(key):
+                    if booking.patient_id == patient_id and booking.start == start:
+                        return Reservation(provider_id, provider.name, day, start, booking.end, existing=True)
+        return None
+
+    def _sync(self, day: date) -> None:
+        """Reload a date's reservations and releases from the ledger; the caller holds the lock."""
+        rows = self._ledger.execute(
+            "SELECT provider_id, start_minute, end_minute, patient_id FROM reservations WHERE day = ? "
+            "ORDER BY start_minute",
+            (day.isoformat(),),
+        ).fetchall()
+        reserved: dict[str, list[Booking]] = {}
+        for provider_id, start, end, patient_id in rows:
+            reserved.setdefault(provider_id, []).append(Booking(start, end, patient_id))
+        released: dict[str, set[int]] = {}
+        for provider_id, start in self._ledger.execute(
+            "SELECT provider_id, start_minute FROM released WHERE day = ?", (day.isoformat(),)
+        ):
+            released.setdefault(provider_id, set()).add(start)
+        for provider_id in self.providers:
+            key = (provider_id, day)
+            bookings = reserved.get(provider_id, [])
+            starts = frozenset(released.get(provider_id, ()))
+            if bookings != self._reserved.get(key, []) or starts != self._released.get(key, frozenset()):
+                self._reserved[key] = bookings
+                self._released[key] = starts
+                self._free.pop(key, None)
+        self._synced.add(day)
+
+    def _bookings(self, key: tuple[str, date]) -> list[Booking]:
+        """A provider's bookings on a date, without released calendar bookings; the caller holds the lock."""
+        released = self._released.get(key, frozenset())
+        calendar = [booking for booking in self._calendar.get(key, []) if booking.start not in released]
+        return calendar + self._reserved.get(key, [])
+
+    def _free_for(self, provider_id: str, day: date) -> list[int]:
+        """A provider's free slot starts on a date, computed once per change; the caller holds the lock."""
+        key = (provider_id, day)
+        free = self._free.get(key)
+        if free is None:
+            provider = self.providers[provider_id]
+            busy = sorted(self._bookings(key), key=lambda b: b.start)
+            busy_starts = [booking.start for booking in busy]
+            free = []
+            if day not in provider.closed:
+                for open_at, close_at in provider.hours.get(day.weekday(), ()):
+                    for start in range(open_at, close_at - self.slot_minutes + 1, self.slot_minutes):
+                        if not _overlaps(busy, busy_starts, start, start + self.slot_minutes):
+                            free.append(start)
+            self._free[key] = free
+        return free
+
+
+def _use_wal(ledger: sqlite3.Connection, timeout: float) -> None:
+    """Switch the ledger to WAL mode, retrying while another process has it locked.
+
+    Switching does not wait on the busy handler, so several job processes
+    opening a fresh ledger at once would otherwise fail with "database is locked".
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            ledger.execute("PRAGMA journal_mode=WAL")
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _overlaps(busy: list[Booking], busy_starts: list[int], start: int, end: int) -> bool:
+    """Whether [start, end) overlaps any of the bookings, which are sorted by start."""
+    i = bisect.bisect_left(busy_starts, end)
+    return any(booking.end > start for booking in busy[:i])
+
+
+def _contains(starts: list[int], start: int) -> bool:
+    i = bisect.bisect_left(starts, start)
+    return i < len(starts) and starts[i] == start
+
+
+def _minutes(when: datetime) -> int:
+    return when.hour * 60 + when.minute
+
+
+def _parse_interval(value: str) -> tuple[int, int]:
+    start, _, end = value.partition("-")
+    return _minutes(datetime.strptime(start.strip(), "%H:%M")), _minutes(datetime.strptime(end.strip(), "%H:%M"))
+
+
+def parse_date(text: str, today: date) -> date | None:
+    """Find a date in text such as "2025-06-03", "tomorrow" or "next Tuesday at 3pm"."""
+    text = text.lower()
+    match = re.search(r"\d{4}-\d{2}-\d{2}", text)
+    if match:
+        try:
+            return date.fromisoformat(match.group())
+        except ValueError:
+            return None
+    if "today" in text:
+        return today
+    if "tomorrow" in text:
+        return today + timedelta(days=1)
+    for weekday, name in enumerate(WEEKDAY_NAMES):
+        if re.search(rf"\b({name}|{name[:3]})\b", text):
+            return today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1)
+    return None
+
+
+def parse_time(text: str) -> int | None:
+    """Minutes after midnight for a time such as "3pm", "3:30 PM" or "15:00"."""
+    match = re.search(r"\b(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\b\.?|\b(\d{1,2}):(\d{2})\b", text.lower())
+    if not match:
+        return None
+    if match.group(4):
+        hour, minute = int(match.group(4)), int(match.group(5))
+    else:
+        hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+        if match.group(3) == "p":
+            hour += 12
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def format_time(minutes: int) -> str:
+    """Format minutes after midnight the way they are spoken, e.g. "1pm" or "2:30pm"."""
+    hour, minute = divmod(minutes, 60)
+    suffix = "am" if hour < 12 else "pm"
+    hour = hour % 12 or 12
+    return f"{hour}{suffix}" if minute == 0 else f"{hour}:{minute:02d}{suffix}"
+
+
+def relevant_dates(dial_info: dict[str, Any], today: date, days: int = 7) -> list[date]:
+    """The dates a call is likely to ask about: the week from the current appointment, or from today."""
+    start = parse_date(dial_info.get("appointment_time") or "", today) or today
+    start = max(start, today)
+    return [start + timedelta(days=offset) for offset in range(days)]
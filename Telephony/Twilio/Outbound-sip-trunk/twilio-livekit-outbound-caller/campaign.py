@@ -0,0 +1,656 @@
+"""Outbound calling campaign dispatcher.
+
+Reads a list of patients from a CSV file or SQLite database and dispatches
+the `outbound-caller` agent to call each of them. At most --max-concurrent
+calls are live at once, and dispatches on each SIP trunk are paced to the
+trunk's calls-per-second limit. The agent reports how each call went in its
+room's metadata and marks its last report as ended. No-answer, busy and
+failed calls are retried with exponential backoff, inside the calling
+window in the patient's time zone. Every attempt and its outcome is
+recorded in the campaign database, so a stopped campaign resumes where it
+left off.
+
+    python campaign.py run --patients patients.csv --db campaign.db --trunk ST_xxxx=5
+    python campaign.py report --db campaign.db
+
+Pass --simulate to run against a local stand-in of the LiveKit API and agent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Iterable, Protocol
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env.local")
+logger = logging.getLogger("outbound-campaign")
+
+# Outcomes worth another attempt: the callee never answered (the first three, as
+# reported by the agent), the call was never dispatched, or no agent reported in time
+RETRYABLE_OUTCOMES = {"no_answer", "busy", "failed", "dispatch_error", "timeout"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id TEXT PRIMARY KEY,
+    phone_number TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    appointment_time TEXT NOT NULL DEFAULT '',
+    transfer_to TEXT NOT NULL DEFAULT '',
+    timezone TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS patients_due ON patients (status, next_attempt_at);
+CREATE TABLE IF NOT EXISTS calls (
+    room TEXT PRIMARY KEY,
+    patient_id TEXT NOT NULL REFERENCES patients (id),
+    attempt INTEGER NOT NULL,
+    trunk_id TEXT NOT NULL,
+    dispatched_at REAL NOT NULL,
+    ended_at REAL,
+    outcome TEXT,
+    sip_status TEXT
+);
+"""
+
+PATIENT_FIELDS = ("id", "phone_number", "name", "appointment_time", "transfer_to", "timezone")
+
+
+class BackendError(Exception):
+    """The LiveKit API refused a request or could not be reached."""
+
+
+class DispatchError(BackendError):
+    """A call's room or agent dispatch could not be created."""
+
+
+@dataclass(frozen=True)
+class CallingWindow:
+    """Local time of day during which patients may be called; `end` is exclusive."""
+
+    start: dtime
+    end: dtime
+
+    @classmethod
+    def parse(cls, value: str) -> CallingWindow:
+        """Parse a window such as "09:00-19:00"; "24:00" ends it at midnight."""
+        start, _, end = value.partition("-")
+        window = cls(_parse_time(start), _parse_time(end))
+        if window.start >= window.end:
+            raise ValueError(f"calling window must end after it starts: {value}")
+        return window
+
+    def contains(self, when: datetime) -> bool:
+        return self.start <= when.time() < self.end
+
+    def next_open(self, when: datetime) -> datetime:
+        """The first time at or after `when` that is inside the window."""
+        if self.contains(when):
+            return when
+        day = when.date() if when.time() < self.start else when.date() + timedelta(days=1)
+        return datetime.combine(day, self.start, tzinfo=when.tzinfo)
+
+
+def _parse_time(value: str) -> dtime:
+    value = value.strip()
+    if value == "24:00":
+        return dtime.max
+    return dtime.fromisoformat(value)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how soon unanswered calls are tried again."""
+
+    max_attempts: int = 3
+    backoff: float = 900.0  # seconds before the first retry, doubling after each attempt
+    factor: float = 2.0
+    max_backoff: float = 4 * 3600.0
+    jitter: float = 0.1  # spreads retries of calls that failed together
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.backoff * self.factor ** (attempt - 1), self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+@dataclass
+class Trunk:
+    """An outbound SIP trunk and its dispatch pacing."""
+
+    trunk_id: str
+    cps: float
+    next_slot: float = 0.0
+
+    @classmethod
+    def parse(cls, value: str) -> Trunk:
+        """Parse "TRUNK_ID=CPS"; the rate defaults to one call per second."""
+        trunk_id, _, cps = value.partition("=")
+        trunk = cls(trunk_id.strip(), float(cps) if cps else 1.0)
+        if not trunk.trunk_id or trunk.cps <= 0:
+            raise ValueError(f"invalid trunk: {value}")
+        return trunk
+
+    def reserve(self, now: float) -> float:
+        """Reserve the trunk's next dispatch slot and return its (monotonic) time."""
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + 1.0 / self.cps
+        return slot
+
+
+@dataclass
+class ActiveCall:
+    patient_id: str
+    attempt: int
+    timezone: ZoneInfo
+    dispatched_at: float
+    report: dict[str, Any] = field(default_factory=dict)
+
+
+class CampaignStore:
+    """Patients, their call attempts and outcomes in a SQLite database."""
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def import_patients(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Add patients not already in the campaign; returns how many were added."""
+        added = 0
+        with self.db:
+            for row in rows:
+                phone_number = (row.get("phone_number") or "").strip()
+                if not phone_number:
+                    raise ValueError(f"patient without a phone_number: {row}")
+                values = {name: str(row.get(name) or "").strip() for name in PATIENT_FIELDS}
+                values["id"] = values["id"] or phone_number
+                if values["timezone"]:
+                    ZoneInfo(values["timezone"])
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO patients (id, phone_number, name, appointment_time, transfer_to, timezone) "
+                    "VALUES (:id, :phone_number, :name, :appointment_time, :transfer_to, :timezone)",
+                    values,
+                )
+                added += cursor.rowcount
+        return added
+
+    def recover(self, now: float) -> int:
+        """Requeue patients whose calls were in flight when a previous run stopped."""
+        with self.db:
+            self.db.execute(
+                "UPDATE calls SET outcome = 'interrupted', ended_at = ? WHERE outcome IS NULL", (now,)
+            )
+            return self.db.execute("UPDATE patients SET status = 'pending' WHERE status = 'dialing'").rowcount
+
+    def next_due(self, now: float) -> tuple[sqlite3.Row | None, float | None]:
+        """The pending patient due soonest, or None and the seconds until one is due."""
+        row = self.db.execute(
+            "SELECT * FROM patients WHERE status = 'pending' ORDER BY next_attempt_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None, None
+        if row["next_attempt_at"] <= now:
+            return row, None
+        return None, row["next_attempt_at"] - now
+
+    def reschedule(self, patient_id: str, at: float):
+        with self.db:
+            self.db.execute("UPDATE patients SET next_attempt_at = ? WHERE id = ?", (at, patient_id))
+
+    def start_call(self, patient_id: str, attempt: int, room: str, trunk_id: str, now: float):
+        with self.db:
+            self.db.execute(
+                "UPDATE patients SET status = 'dialing', attempts = ? WHERE id = ?", (attempt, patient_id)
+            )
+            self.db.execute(
+                "INSERT INTO calls (room, patient_id, attempt, trunk_id, dispatched_at) VALUES (?, ?, ?, ?, ?)",
+                (room, patient_id, attempt, trunk_id, now),
+            )
+
+    def finish_call(
+        self, room: str, patient_id: str, outcome: str, sip_status: str | None, now: float, retry_at: float | None
+    ):
+        """Record a call's outcome and either requeue the patient or close them out."""
+        with self.db:
+            self.db.execute(
+                "UPDATE calls SET ended_at = ?, outcome = ?, sip_status = ? WHERE room = ?",
+                (now, outcome, sip_status, room),
+            )
+            if retry_at is None:
+                self.db.execute("UPDATE patients SET status = ? WHERE id = ?", (outcome, patient_id))
+            else:
+                self.db.execute(
+                    "UPDATE patients SET status = 'pending', next_attempt_at = ? WHERE id = ?", (retry_at, patient_id)
+                )
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        def counts(query: str) -> dict[str, int]:
+            return {key: count for key, count in self.db.execute(query)}
+
+        return {
+            "patients": counts("SELECT status, COUNT(*) FROM patients GROUP BY status ORDER BY COUNT(*) DESC"),
+            "calls": counts(
+                "SELECT COALESCE(outcome, 'in progress'), COUNT(*) FROM calls GROUP BY 1 ORDER BY COUNT(*) DESC"
+            ),
+            "attempts": counts("SELECT attempts, COUNT(*) FROM patients GROUP BY attempts ORDER BY attempts"),
+        }
+
+
+def read_patients(path: str) -> list[dict[str, Any]]:
+    """Read patients from a CSV file or from the `patients` table of a SQLite database."""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in db.execute("SELECT * FROM patients")]
+    finally:
+        db.close()
+
+
+class CallBackend(Protocol):
+    async def dispatch(self, room: str, metadata: dict[str, Any]) -> None:
+        """Create the call's room and dispatch the agent to it; raises DispatchError."""
+
+    async def room_reports(self, rooms: list[str]) -> dict[str, dict[str, Any]]:
+        """The agent's latest report for each of the rooms that still exists; raises BackendError."""
+
+    async def close_room(self, room: str) -> None:
+        """Close a call's room; a room that is already gone is not an error."""
+
+    async def aclose(self) -> None: ...
+
+
+def _parse_report(metadata: str) -> dict[str, Any]:
+    try:
+        report = json.loads(metadata) if metadata else {}
+    except json.JSONDecodeError:
+        return {}
+    return report if isinstance(report, dict) else {}
+
+
+class LiveKitBackend:
+    """Dispatches calls through the LiveKit server API."""
+
+    # Rooms named per ListRooms request
+    LIST_BATCH = 100
+
+    def __init__(self, agent_name: str, empty_timeout: int = 60):
+        import aiohttp
+        from livekit import api
+
+        self.api = api
+        self.agent_name = agent_name
+        self.empty_timeout = empty_timeout
+        self.lkapi = api.LiveKitAPI()
+        # refusals by the server, and connections that failed or timed out
+        self.errors = (api.TwirpError, aiohttp.ClientError, asyncio.TimeoutError)
+
+    def _describe(self, error: Exception) -> str:
+        if isinstance(error, self.api.TwirpError):
+            return f"{error.code}: {error.message}"
+        return f"{type(error).__name__}: {error}"
+
+    async def dispatch(self, room: str, metadata: dict[str, Any]) -> None:
+        api = self.api
+        try:
+            await self.lkapi.room.create_room(api.CreateRoomRequest(name=room, empty_timeout=self.empty_timeout))
+            await self.lkapi.agent_dispatch.create_dispatch(
+                api.CreateAgentDispatchRequest(agent_name=self.agent_name, room=room, metadata=json.dumps(metadata))
+            )
+        except self.errors as e:
+            raise DispatchError(self._describe(e)) from e
+
+    async def room_reports(self, rooms: list[str]) -> dict[str, dict[str, Any]]:
+        reports = {}
+        for i in range(0, len(rooms), self.LIST_BATCH):
+            try:
+                response = await self.lkapi.room.list_rooms(
+                    self.api.ListRoomsRequest(names=rooms[i:i + self.LIST_BATCH])
+                )
+            except self.errors as e:
+                raise BackendError(f"listing rooms failed: {self._describe(e)}") from e
+            for room in response.rooms:
+                reports[room.name] = _parse_report(room.metadata)
+        return reports
+
+    async def close_room(self, room: str) -> None:
+        try:
+            await self.lkapi.room.delete_room(self.api.DeleteRoomRequest(room=room))
+        except self.errors as e:
+            if isinstance(e, self.api.TwirpError) and e.code == "not_found":
+                return  # already gone
+            # the server closes the room once it has been empty for empty_timeout
+            logger.warning(f"closing room {room} failed: {self._describe(e)}")
+
+    async def aclose(self) -> None:
+        await self.lkapi.aclose()
+
+
+class StandInBackend:
+    """Local stand-in for the LiveKit API and the agent, for trying out campaigns.
+
+    Each dispatched room is updated the way the agent would: after ringing,
+    the call is answered, unanswered, busy or failed. Answered calls end a
+    few seconds later with a final outcome. Rooms close a little after the
+    agent leaves unless the dispatcher closes them first. The stand-in also
+    measures the concurrency and per-trunk pacing it sees.
+    """
+
+    RING_OUTCOMES = {"answered": 0.6, "no_answer": 0.2, "busy": 0.12, "failed": 0.08}
+    CALL_OUTCOMES = {"confirmed": 0.7, "voicemail": 0.2, "transferred": 0.1}
+
+    def __init__(self, ring_seconds=(0.5, 3.0), talk_seconds=(1.0, 6.0), departure_timeout=2.0,
+                 dispatch_error_rate=0.02):
+        self.ring_seconds = ring_seconds
+        self.talk_seconds = talk_seconds
+        self.departure_timeout = departure_timeout
+        self.dispatch_error_rate = dispatch_error_rate
+        self.rooms: dict[str, dict[str, Any]] = {}
+        self.tasks: set[asyncio.Task] = set()
+        self.peak_rooms = 0
+        self.dispatch_times: dict[str, deque] = {}
+        self.peak_cps: dict[str, int] = {}
+
+    async def dispatch(self, room: str, metadata: dict[str, Any]) -> None:
+        await asyncio.sleep(0.01)
+        if random.random() < self.dispatch_error_rate:
+            raise DispatchError("unavailable: stand-in dispatch failure")
+        trunk = metadata["sip_trunk_id"]
+        now = time.monotonic()
+        recent = self.dispatch_times.setdefault(trunk, deque())
+        recent.append(now)
+        while recent[0] <= now - 1.0:
+            recent.popleft()
+        self.peak_cps[trunk] = max(self.peak_cps.get(trunk, 0), len(recent))
+        self.rooms[room] = {}
+        self.peak_rooms = max(self.peak_rooms, len(self.rooms))
+        task = asyncio.create_task(self._call(room))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _call(self, room: str):
+        await asyncio.sleep(random.uniform(*self.ring_seconds))
+        outcome = _weighted_choice(self.RING_OUTCOMES)
+        if outcome == "answered":
+            self.rooms[room] = {"outcome": "answered"}
+            await asyncio.sleep(random.uniform(*self.talk_seconds))
+            report = {"outcome": _weighted_choice(self.CALL_OUTCOMES), "ended": True}
+        else:
+            report = {"outcome": outcome, "sip_status": {"busy": "486", "no_answer": "480"}.get(outcome), "ended": True}
+        if room in self.rooms:
+            self.rooms[room] = report
+        await asyncio.sleep(self.departure_timeout)
+        self.rooms.pop(room, None)
+
+    async def room_reports(self, rooms: list[str]) -> dict[str, dict[str, Any]]:
+        return {room: dict(self.rooms[room]) for room in rooms if room in self.rooms}
+
+    async def close_room(self, room: str) -> None:
+        self.rooms.pop(room, None)
+
+    async def aclose(self) -> None:
+        for task in list(self.tasks):
+            task.cancel()
+
+
+def _weighted_choice(weights: dict[str, float]) -> str:
+    return random.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class Campaign:
+    """Dispatches calls for every pending patient until none are left."""
+
+    def __init__(
+        self,
+        store: CampaignStore,
+        backend: CallBackend,
+        trunks: list[Trunk],
+        *,
+        max_concurrent: int = 20,
+        retry: RetryPolicy = RetryPolicy(),
+        window: CallingWindow = CallingWindow(dtime(9), dtime(20)),
+        timezone: str = "UTC",
+        answer_timeout: float = 120.0,
+        poll_interval: float = 1.0,
+    ):
+        if not trunks:
+            raise ValueError("at least one outbound trunk is required")
+        self.store = store
+        self.backend = backend
+        self.trunks = trunks
+        self.retry = retry
+        self.window = window
+        self.timezone = ZoneInfo(timezone)
+        self.answer_timeout = answer_timeout
+        self.poll_interval = poll_interval
+        self.active: dict[str, ActiveCall] = {}
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._zones: dict[str, ZoneInfo] = {}
+
+    async def run(self):
+        requeued = self.store.recover(time.time())
+        if requeued:
+            logger.warning(f"requeued {requeued} patients whose calls were in flight when the last run stopped")
+        dispatcher = asyncio.create_task(self._dispatch_loop())
+        try:
+            # calls already dispatched are followed to the end even if dispatching fails
+            while not dispatcher.done() or self.active:
+                await asyncio.sleep(self.poll_interval)
+                await self._poll()
+            dispatcher.result()
+        finally:
+            dispatcher.cancel()
+
+    def _zone(self, patient: sqlite3.Row) -> ZoneInfo:
+        name = patient["timezone"]
+        if not name:
+            return self.timezone
+        if name not in self._zones:
+            self._zones[name] = ZoneInfo(name)
+        return self._zones[name]
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._slots.acquire()
+            patient = await self._next_patient()
+            if patient is None:
+                self._slots.release()
+                return
+            await self._dispatch(patient)
+
+    async def _next_patient(self) -> sqlite3.Row | None:
+        """Wait for a patient who is due and inside their calling window."""
+        while True:
+            now = time.time()
+            patient, wait = self.store.next_due(now)
+            if patient is not None:
+                local = datetime.fromtimestamp(now, self._zone(patient))
+                if self.window.contains(local):
+                    return patient
+                self.store.reschedule(patient["id"], self.window.next_open(local).timestamp())
+                continue
+            if wait is None and not self.active:
+                return None
+            # retries are scheduled as live calls finish, so check again at least every poll
+            await asyncio.sleep(min(wait or self.poll_interval, self.poll_interval))
+
+    async def _dispatch(self, patient: sqlite3.Row):
+        trunk = min(self.trunks, key=lambda t: t.next_slot)
+        delay = trunk.reserve(time.monotonic()) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        now = time.time()
+        attempt = patient["attempts"] + 1
+        room = f"outbound-{uuid.uuid4().hex[:12]}"
+        call = ActiveCall(patient["id"], attempt, self._zone(patient), now)
+        self.store.start_call(patient["id"], attempt, room, trunk.trunk_id, now)
+        # any failure is recorded on the call, so one bad dispatch does not stop the campaign
+        try:
+            await self.backend.dispatch(
+                room,
+                {
+                    "phone_number": patient["phone_number"],
+                    "transfer_to": patient["transfer_to"],
+                    "name": patient["name"],
+                    "appointment_time": patient["appointment_time"],
+                    "sip_trunk_id": trunk.trunk_id,
+                    "patient_id": patient["id"],
+                    "attempt": attempt,
+                },
+            )
+        except DispatchError as e:
+            logger.warning(f"dispatch to {room} failed: {e}")
+            self._finish(room, call, "dispatch_error")
+            return
+        except Exception:
+            logger.exception(f"dispatch to {room} failed")
+            self._finish(room, call, "dispatch_error")
+            return
+        self.active[room] = call
+
+    async def _poll(self):
+        if not self.active:
+            return
+        try:
+            reports = await self.backend.room_reports(list(self.active))
+        except Exception as e:
+            logger.warning(f"error polling call rooms: {e}")
+            return
+        now = time.time()
+        for room, call in list(self.active.items()):
+            report = reports.get(room)
+            if report is None:
+                # the room closed before the agent's last report was seen; one
+                # closed without any report means the agent never got to dial
+                outcome = call.report.get("outcome")
+                self._finish(room, call, "completed" if outcome == "answered" else outcome or "failed")
+                continue
+            call.report = report
+            outcome = report.get("outcome")
+            if report.get("ended"):
+                self._finish(room, call, "completed" if outcome == "answered" else outcome or "failed")
+                await self._close_room(room)
+            elif outcome is None and now - call.dispatched_at > self.answer_timeout:
+                self._finish(room, call, "timeout")
+                await self._close_room(room)
+
+    async def _close_room(self, room: str):
+        # the call is already recorded; a room left open must not stop this poll
+        try:
+            await self.backend.close_room(room)
+        except Exception:
+            logger.exception(f"error closing room {room}")
+
+    def _finish(self, room: str, call: ActiveCall, outcome: str):
+        self.active.pop(room, None)
+        now = time.time()
+        retry_at = None
+        if outcome in RETRYABLE_OUTCOMES and call.attempt < self.retry.max_attempts:
+            earliest = datetime.fromtimestamp(now + self.retry.delay(call.attempt), call.timezone)
+            retry_at = self.window.next_open(earliest).timestamp()
+        self.store.finish_call(room, call.patient_id, outcome, call.report.get("sip_status"), now, retry_at)
+        self._slots.release()
+        logger.info(
+            f"call {room} to patient {call.patient_id} (attempt {call.attempt}): {outcome}"
+            + (f", retrying in {retry_at - now:.0f}s" if retry_at else "")
+        )
+
+
+async def run_campaign(args: argparse.Namespace):
+    store = CampaignStore(args.db)
+    if args.patients:
+        added = store.import_patients(read_patients(args.patients))
+        logger.info(f"imported {added} new patients from {args.patients}")
+    trunks = [Trunk.parse(value) for value in args.trunk]
+    if not trunks and os.getenv("SIP_OUTBOUND_TRUNK_ID"):
+        trunks = [Trunk(os.environ["SIP_OUTBOUND_TRUNK_ID"], 1.0)]
+    backend: CallBackend = StandInBackend() if args.simulate else LiveKitBackend(args.agent_name)
+    campaign = Campaign(
+        store,
+        backend,
+        trunks,
+        max_concurrent=args.max_concurrent,
+        retry=RetryPolicy(max_attempts=args.max_attempts, backoff=args.retry_backoff),
+        window=CallingWindow.parse(args.window),
+        timezone=args.timezone,
+        answer_timeout=args.answer_timeout,
+        poll_interval=args.poll_interval,
+    )
+    started = time.monotonic()
+    try:
+        await campaign.run()
+    finally:
+        await backend.aclose()
+    elapsed = time.monotonic() - started
+    print_summary(store)
+    calls = sum(store.summary()["calls"].values())
+    print(f"\n{calls} calls in {elapsed:.1f}s")
+    if isinstance(backend, StandInBackend):
+        print(f"peak live calls: {backend.peak_rooms}, peak dispatches per second by trunk: {backend.peak_cps}")
+    store.close()
+
+
+def print_summary(store: CampaignStore):
+    for section, counts in store.summary().items():
+        print(f"{section}:")
+        for key, count in counts.items():
+            print(f"  {key}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound calling campaign dispatcher")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="dispatch calls until every patient is done")
+    run.add_argument("--db", default="campaign.db", help="campaign database (created if missing)")
+    run.add_argument("--patients", help="CSV file or SQLite database of patients to add to the campaign")
+    run.add_argument(
+        "--trunk", action="append", default=[], metavar="TRUNK_ID=CPS",
+        help="outbound trunk and its calls per second; repeat for several trunks (default: SIP_OUTBOUND_TRUNK_ID=1)",
+    )
+    run.add_argument("--agent-name", default="outbound-caller")
+    run.add_argument("--max-concurrent", type=int, default=20, help="calls live at once")
+    run.add_argument("--max-attempts", type=int, default=3, help="attempts per patient")
+    run.add_argument("--retry-backoff", type=float, default=900.0, help="seconds before the first retry; doubles per attempt")
+    run.add_argument("--window", default="09:00-20:00", help="local time of day calls may be placed")
+    run.add_argument("--timezone", default=os.getenv("CAMPAIGN_TIMEZONE", "UTC"), help="time zone of patients without one")
+    run.add_argument("--answer-timeout", type=float, default=120.0, help="seconds to wait for the agent's first report")
+    run.add_argument("--poll-interval", type=float, default=1.0, help="seconds between call status polls")
+    run.add_argument("--simulate", action="store_true", help="use a local stand-in for LiveKit and the agent")
+
+    report = commands.add_parser("report", help="print campaign progress")
+    report.add_argument("--db", default="campaign.db")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "run":
+        asyncio.run(run_campaign(args))
+    else:
+        store = CampaignStore(args.db)
+        print_summary(store)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
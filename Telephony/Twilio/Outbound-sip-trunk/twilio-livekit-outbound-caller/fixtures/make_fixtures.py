@@ -0,0 +1,81 @@
+"""Make the synthetic recordings amd.py is tested with.
+
+Speech is a voiced tone, 140Hz with its harmonics, in word-long bursts; a
+beep is a pure 1kHz tone. The recordings are 8kHz 16-bit mono, as on a
+phone line, with a little background noise:
+
+- human/hello.wav: a short "Hello?" after half a second, then silence
+- human/hello_at_answer.wav: "Hello?" from the first frame, then silence
+- machine/greeting.wav: a voicemail greeting running on for 4 seconds
+- machine/greeting_at_answer.wav: the same greeting from the first frame
+- machine/beep.wav: silence, then a beep
+
+Run it from anywhere to rewrite the files next to it:
+
+    python fixtures/make_fixtures.py
+"""
+
+from __future__ import annotations
+
+import os
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 8000
+FIXTURES = os.path.dirname(os.path.abspath(__file__))
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(SAMPLE_RATE * seconds))
+
+
+def word(seconds: float, f0: float = 140.0) -> np.ndarray:
+    """A voiced burst: harmonics of `f0`, at full level within 20ms, with a syllable-rate envelope."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 15))
+    ramp = np.minimum(1, np.minimum(t, seconds - t) / 0.02)
+    envelope = ramp * (0.75 + 0.25 * np.cos(2 * np.pi * 4 * t))
+    return 0.15 * voiced / np.max(np.abs(voiced)) * envelope
+
+
+def greeting(words: int) -> np.ndarray:
+    """Words separated by pauses too short to end the greeting."""
+    parts = []
+    for i in range(words):
+        parts += [word(0.3, f0=130 + 10 * (i % 3)), silence(0.08)]
+    return np.concatenate(parts)
+
+
+def beep(seconds: float, hz: float = 1000.0) -> np.ndarray:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return 0.3 * np.sin(2 * np.pi * hz * t)
+
+
+def write(path: str, *parts: np.ndarray) -> None:
+    rng = np.random.default_rng(len(path))
+    audio = np.concatenate(parts)
+    audio = audio + rng.normal(0, 0.003, len(audio))
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def main() -> None:
+    recordings = {
+        "human/hello.wav": (silence(0.5), word(0.5), silence(2.0)),
+        "human/hello_at_answer.wav": (word(0.5), silence(2.0)),
+        "machine/greeting.wav": (silence(0.4), greeting(10), silence(0.5)),
+        "machine/greeting_at_answer.wav": (greeting(10), silence(0.5)),
+        "machine/beep.wav": (silence(1.0), beep(0.5), silence(0.5)),
+    }
+    for name, parts in recordings.items():
+        write(os.path.join(FIXTURES, name), *parts)
+
+
+if __name__ == "__main__":
+    main()
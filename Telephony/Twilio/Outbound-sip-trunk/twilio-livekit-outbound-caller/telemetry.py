@@ -0,0 +1,306 @@
+"""Per-turn voice pipeline latency telemetry.
+
+`CallTelemetry` listens to an AgentSession's events and records, for every
+agent turn, how long each stage took:
+
+- eou_delay: end of user speech to the end-of-turn decision
+- transcription_delay: end of user speech to the final transcript
+- llm_ttft: LLM time to first token
+- tts_ttfb: TTS time to first audio byte
+- response_latency: end of user speech to the agent's audio starting to play,
+  measured from the session's user and agent state changes
+- tool_seconds: time spent running the function tools the LLM called
+
+Records are appended to a JSONL file by a background task, so the call never
+waits on disk. When the call ends a summary record is written with p50/p95
+latencies, interruptions and tool time. To aggregate across calls:
+
+    python telemetry.py telemetry.jsonl [more.jsonl ...]
+
+The report needs only the standard library; livekit is imported when a
+CallTelemetry is created.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import logging
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from livekit.agents import AgentSession
+
+logger = logging.getLogger("telemetry")
+
+STAGES = ("eou_delay", "transcription_delay", "llm_ttft", "tts_ttfb")
+# stages that add up to the time until the agent's first audio
+CRITICAL_PATH = ("eou_delay", "llm_ttft", "tts_ttfb")
+
+
+def percentile(values: Iterable[float], q: float) -> float | None:
+    """Nearest-rank percentile, or None without values."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _summary(values: list[float]) -> dict[str, Any]:
+    return {
+        "count": len(values),
+        "p50": _round(percentile(values, 50)),
+        "p95": _round(percentile(values, 95)),
+    }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 4)
+
+
+class JsonlSink:
+    """Appends records to a JSONL file from a background task.
+
+    Records are batched into one write per wakeup. If the writer falls
+    behind by more than `max_pending` records, new ones are dropped and
+    counted instead of being queued.
+    """
+
+    def __init__(self, path: str, max_pending: int = 1000):
+        self.path = path
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(max_pending)
+        self._task: asyncio.Task | None = None
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def aclose(self) -> None:
+        """Write the queued records and stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            records = [record for record in batch if record is not None]
+            if records:
+                lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+                try:
+                    await asyncio.to_thread(self._append, lines)
+                except OSError as e:
+                    logger.warning(f"error writing telemetry: {e}")
+            if None in batch:
+                return
+
+    def _append(self, lines: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class CallTelemetry:
+    """Collects a call's per-turn latencies from its AgentSession events."""
+
+    def __init__(self, session: AgentSession, sink: JsonlSink, *, call_id: str, agent: str):
+        from livekit.agents import metrics
+
+        self._metrics = metrics
+        self.session = session
+        self.sink = sink
+        self.call_id = call_id
+        self.agent = agent
+        self.started_at = time.time()
+        self.turns: dict[str, dict[str, Any]] = {}
+        self.completed: list[dict[str, Any]] = []
+        self.interruptions = 0
+        self.tool_seconds = 0.0
+        self.usage = metrics.UsageCollector()
+        self._user_stopped_at: float | None = None
+        self._last_llm: tuple[str, float] | None = None
+
+        session.on("metrics_collected", self._on_metrics_collected)
+        session.on("user_state_changed", self._on_user_state_changed)
+        session.on("agent_state_changed", self._on_agent_state_changed)
+        session.on("speech_created", self._on_speech_created)
+        session.on("function_tools_executed", self._on_function_tools_executed)
+
+    def _turn(self, speech_id: str) -> dict[str, Any]:
+        turn = self.turns.get(speech_id)
+        if turn is None:
+            turn = self.turns[speech_id] = {"type": "turn", "call_id": self.call_id, "speech_id": speech_id}
+        return turn
+
+    def _on_metrics_collected(self, ev) -> None:
+        m = ev.metrics
+        metrics = self._metrics
+        self.usage.collect(m)
+        if isinstance(m, metrics.EOUMetrics) and m.speech_id:
+            turn = self._turn(m.speech_id)
+            turn["eou_delay"] = m.end_of_utterance_delay
+            turn["transcription_delay"] = m.transcription_delay
+        elif isinstance(m, metrics.LLMMetrics) and m.speech_id:
+            turn = self._turn(m.speech_id)
+            # a turn that calls tools makes more than one LLM request; keep the first
+            turn.setdefault("llm_ttft", m.ttft)
+            turn["llm_duration"] = turn.get("llm_duration", 0.0) + m.duration
+            turn["completion_tokens"] = turn.get("completion_tokens", 0) + m.completion_tokens
+            self._last_llm = (m.speech_id, time.time())
+        elif isinstance(m, metrics.TTSMetrics) and m.speech_id:
+            # sentences are synthesized one at a time; the first decides when audio starts
+            self._turn(m.speech_id).setdefault("tts_ttfb", m.ttfb)
+
+    def _on_user_state_changed(self, ev) -> None:
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            self._user_stopped_at = getattr(ev, "created_at", None) or time.time()
+
+    def _on_agent_state_changed(self, ev) -> None:
+        if ev.new_state != "speaking" or self._user_stopped_at is None:
+            return
+        speech = self.session.current_speech
+        if speech is not None:
+            started_at = getattr(ev, "created_at", None) or time.time()
+            self._turn(speech.id)["response_latency"] = started_at - self._user_stopped_at
+        self._user_stopped_at = None
+
+    def _on_speech_created(self, ev) -> None:
+        speech = ev.speech_handle
+        speech.add_done_callback(lambda handle: self._finish_turn(handle.id, handle.interrupted))
+
+    def _on_function_tools_executed(self, ev) -> None:
+        # tools run between the LLM request that called them and this event
+        if self._last_llm is None:
+            return
+        speech_id, llm_done_at = self._last_llm
+        elapsed = time.time() - llm_done_at
+        turn = self._turn(speech_id)
+        turn["tool_seconds"] = turn.get("tool_seconds", 0.0) + elapsed
+        self.tool_seconds += elapsed
+        self._last_llm = None
+
+    def _finish_turn(self, speech_id: str, interrupted: bool) -> None:
+        turn = self.turns.pop(speech_id, None) or {"type": "turn", "call_id": self.call_id, "speech_id": speech_id}
+        turn["interrupted"] = interrupted
+        if interrupted:
+            self.interruptions += 1
+        self.completed.append(turn)
+        self.sink.write({key: _round(value) if isinstance(value, float) else value for key, value in turn.items()})
+
+    def summary(self) -> dict[str, Any]:
+        turns = self.completed + list(self.turns.values())
+        summary = {
+            "type": "call",
+            "call_id": self.call_id,
+            "agent": self.agent,
+            "started_at": self.started_at,
+            "duration": _round(time.time() - self.started_at),
+            "turns": len(turns),
+            "interruptions": self.interruptions,
+            "tool_seconds": _round(self.tool_seconds),
+            "response_latency": _summary([t["response_latency"] for t in turns if "response_latency" in t]),
+        }
+        for stage in STAGES:
+            summary[stage] = _summary([t[stage] for t in turns if stage in t])
+        summary["usage"] = dataclasses.asdict(self.usage.get_summary())
+        summary["dropped_records"] = self.sink.dropped
+        return summary
+
+    async def aclose(self) -> None:
+        """Write the call summary and flush the sink; use as a job shutdown callback."""
+        summary = self.summary()
+        latency = summary["response_latency"]
+        logger.info(
+            f"call {self.call_id}: {summary['turns']} turns, response latency p50 {latency['p50']}s "
+            f"p95 {latency['p95']}s, {self.interruptions} interruptions, {summary['tool_seconds']}s in tools"
+        )
+        self.sink.write(summary)
+        await self.sink.aclose()
+
+
+def aggregate(records: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Combine turn and call records from many calls into one report."""
+    stages: dict[str, list[float]] = defaultdict(list)
+    calls = []
+    turns = 0
+    for record in records:
+        if record.get("type") == "turn":
+            turns += 1
+            for stage in (*STAGES, "response_latency", "tool_seconds"):
+                if record.get(stage) is not None:
+                    stages[stage].append(record[stage])
+        elif record.get("type") == "call":
+            calls.append(record)
+
+    report: dict[str, Any] = {
+        "calls": len(calls),
+        "turns": turns,
+        "stages": {
+            stage: {**_summary(values), "mean": _round(sum(values) / len(values))}
+            for stage, values in stages.items()
+        },
+    }
+    means = {stage: report["stages"][stage]["mean"] for stage in CRITICAL_PATH if stage in report["stages"]}
+    total = sum(means.values())
+    if total:
+        report["critical_path_share"] = {stage: round(mean / total, 3) for stage, mean in means.items()}
+        report["dominant_stage"] = max(means, key=means.get)
+    if calls:
+        call_p95 = [c["response_latency"]["p95"] for c in calls if c["response_latency"]["p95"] is not None]
+        report["per_call_p95_response_latency"] = _summary(call_p95)
+        report["interruptions_per_call"] = _round(sum(c["interruptions"] for c in calls) / len(calls))
+        report["tool_seconds_per_call"] = _round(sum(c["tool_seconds"] for c in calls) / len(calls))
+    return report
+
+
+def _read_records(paths: list[str]):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] in ("-h", "--help"):
+        print("usage: python telemetry.py [--json] FILE.jsonl [FILE.jsonl ...]")
+        return 0 if argv else 2
+    as_json = argv[0] == "--json"
+    report = aggregate(_read_records(argv[1:] if as_json else argv))
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['calls']} calls, {report['turns']} turns")
+    print(f"{'stage':<22}{'count':>7}{'p50':>9}{'p95':>9}{'mean':>9}")
+    for stage, values in report["stages"].items():
+        print(f"{stage:<22}{values['count']:>7}{values['p50']:>9.3f}{values['p95']:>9.3f}{values['mean']:>9.3f}")
+    if "dominant_stage" in report:
+        shares = ", ".join(f"{stage} {share:.0%}" for stage, share in report["critical_path_share"].items())
+        print(f"\ntime to first audio by stage: {shares}; dominated by {report['dominant_stage']}")
+    if report["calls"]:
+        per_call = report["per_call_p95_response_latency"]
+        print(f"per-call p95 response latency: median {per_call['p50']}s, p95 {per_call['p95']}s")
+        print(f"interruptions per call: {report['interruptions_per_call']}, "
+              f"tool time per call: {report['tool_seconds_per_call']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
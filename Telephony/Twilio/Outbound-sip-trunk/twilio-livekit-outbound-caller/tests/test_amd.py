@@ -0,0 +1,43 @@
+"""Tests for answering machine detection, against the synthetic recordings in fixtures/."""
+
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from amd import AmdSettings, AnsweringMachineDetector, classify_wav  # noqa: E402
+
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "fixtures", "*", "*.wav")))
+
+
+def test_fixtures_cover_both_labels():
+    labels = {os.path.basename(os.path.dirname(path)) for path in FIXTURES}
+    assert labels == {"human", "machine"}
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda path: os.path.relpath(path, ROOT))
+def test_fixture_is_classified_as_its_directory(path):
+    decision = classify_wav(path)
+    assert decision.label == os.path.basename(os.path.dirname(path))
+
+
+def test_beep_is_found_where_it_starts():
+    decision = classify_wav(os.path.join(ROOT, "fixtures", "machine", "beep.wav"))
+    assert decision.reason == "beep"
+    assert decision.beep_at == pytest.approx(1.0, abs=0.04)
+
+
+def test_speech_from_the_first_frame_is_not_taken_for_noise():
+    decision = classify_wav(os.path.join(ROOT, "fixtures", "human", "hello_at_answer.wav"))
+    assert decision.words == 1
+    assert decision.greeting == pytest.approx(0.5, abs=0.06)
+
+
+def test_silence_is_unknown():
+    detector = AnsweringMachineDetector(8000, AmdSettings())
+    detector.push(bytes(2 * 8000 * 4))
+    assert detector.finish().label == "unknown"
@@ -0,0 +1,93 @@
+"""Tests for the reservation ledger shared by the job processes of a worker."""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from availability import AvailabilityIndex, Booking, Provider  # noqa: E402
+
+NINE, TEN, ELEVEN = 9 * 60, 10 * 60, 11 * 60
+HOURS = {weekday: ((NINE, 17 * 60),) for weekday in range(7)}
+
+
+def make_index(ledger_path, bookings=None):
+    """An index with one provider who works every day, as each job process builds it."""
+    return AvailabilityIndex(
+        [Provider("dr-patel", "Dr. Patel", HOURS, frozenset())],
+        bookings or {},
+        timezone="UTC",
+        slot_minutes=30,
+        ledger_path=ledger_path,
+    )
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    return str(tmp_path / "reservations.db")
+
+
+@pytest.fixture
+def day(ledger_path):
+    return make_index(ledger_path).today() + timedelta(days=3)
+
+
+def test_a_slot_taken_in_one_process_is_refused_in_another(ledger_path, day):
+    first, second = make_index(ledger_path), make_index(ledger_path)
+    assert TEN in second.free_slots(day)
+
+    assert first.reserve(day, TEN, "p-1") is not None
+    assert second.reserve(day, TEN, "p-2") is None
+    assert TEN not in second.free_slots(day)
+
+
+def test_concurrent_reservations_of_one_slot_book_it_once(ledger_path, day):
+    indexes = [make_index(ledger_path) for _ in range(8)]
+    for index in indexes:
+        index.prefetch([day])
+
+    with ThreadPoolExecutor(len(indexes)) as pool:
+        results = list(pool.map(lambda i: indexes[i].reserve(day, TEN, f"p-{i}"), range(len(indexes))))
+
+    assert sum(result is not None for result in results) == 1
+
+
+def test_rescheduling_releases_the_previous_reservation(ledger_path, day):
+    first, second = make_index(ledger_path), make_index(ledger_path)
+    assert first.reserve(day, TEN, "p-1") is not None
+
+    assert second.reserve(day, ELEVEN, "p-1") is not None
+    first.prefetch([day])
+    assert TEN in first.free_slots(day)
+    assert ELEVEN not in first.free_slots(day)
+    assert first.reserve(day, TEN, "p-2") is not None
+
+
+def test_rescheduling_releases_a_calendar_booking(ledger_path, day):
+    bookings = {("dr-patel", day): [Booking(NINE, NINE + 30, "p-1")]}
+    first, second = make_index(ledger_path, bookings), make_index(ledger_path, bookings)
+    assert NINE not in second.free_slots(day)
+
+    assert first.reserve(day, TEN, "p-1") is not None
+    second.prefetch([day])
+    assert NINE in second.free_slots(day)
+    assert second.reserve(day, NINE, "p-2") is not None
+
+
+def test_confirming_the_existing_appointment_reserves_nothing(ledger_path, day):
+    bookings = {("dr-patel", day): [Booking(NINE, NINE + 30, "p-1")]}
+    index = make_index(ledger_path, bookings)
+
+    reservation = index.reserve(day, NINE, "p-1")
+    assert reservation.existing
+    assert index.reserve(day, TEN, "p-2") is not None
+
+
+def test_many_indexes_can_open_a_fresh_ledger_at_once(ledger_path):
+    with ThreadPoolExecutor(8) as pool:
+        indexes = list(pool.map(lambda _: make_index(ledger_path), range(8)))
+    assert len(indexes) == 8